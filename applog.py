@@ -0,0 +1,90 @@
+"""Leveled logging for the app, cheap enough for the audio and theory paths.
+
+Messages go through the stdlib ``logging`` module with %-style arguments,
+so nothing is formatted unless a handler will actually emit it.  Hot paths
+additionally guard their calls with the module-level ``debug_enabled``
+flag, which makes a disabled debug statement cost one attribute read:
+
+    if applog.debug_enabled:
+        applog.debug("play_chord_tone %s", notes)
+
+Debug events can also be kept in an in-memory ring buffer (``--debug-ring
+N``).  Records are stored unformatted in a bounded deque, whose appends are
+atomic, so the audio and playback threads never take a lock; they are only
+formatted when the buffer is dumped.
+"""
+import logging
+import signal
+import sys
+import threading
+import time
+from collections import deque
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+DEFAULT_LEVEL = "INFO"
+DEFAULT_RING_SIZE = 2048
+
+log = logging.getLogger("chordtool")
+
+# True when debug() does anything at all: debug level on, or the ring enabled
+debug_enabled = False
+_debug_logged = False
+_ring = None
+
+
+def configure(level=DEFAULT_LEVEL, ring_size=0, stream=None):
+    """Set the console level and, if ring_size > 0, start recording debug events."""
+    global debug_enabled, _debug_logged, _ring
+    if not log.handlers:
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.propagate = False
+    log.setLevel(level.upper() if isinstance(level, str) else level)
+    _debug_logged = log.isEnabledFor(logging.DEBUG)
+    _ring = deque(maxlen=ring_size) if ring_size > 0 else None
+    debug_enabled = _debug_logged or _ring is not None
+
+
+def debug(msg, *args):
+    if _ring is not None:
+        _ring.append((time.time(), threading.current_thread().name, msg, args))
+    if _debug_logged:
+        log.debug(msg, *args)
+
+
+def info(msg, *args):
+    log.info(msg, *args)
+
+
+def warning(msg, *args):
+    log.warning(msg, *args)
+
+
+def error(msg, *args):
+    log.error(msg, *args)
+
+
+def dump_ring(file=None):
+    """Write the buffered debug events, oldest first; returns how many were written."""
+    file = file or sys.stderr
+    if _ring is None:
+        print("Debug ring is disabled; start with --debug-ring N", file=file)
+        return 0
+    records = list(_ring)
+    print(f"--- last {len(records)} debug events ---", file=file)
+    for stamp, thread, msg, args in records:
+        try:
+            text = msg % args if args else msg
+        except (TypeError, ValueError):
+            text = f"{msg} {args!r}"
+        clock = time.strftime("%H:%M:%S", time.localtime(stamp))
+        print(f"{clock}.{int(stamp % 1 * 1000):03d} [{thread}] {text}", file=file)
+    file.flush()
+    return len(records)
+
+
+def install_dump_signal():
+    """Dump the ring on SIGUSR1, where the platform has it."""
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: dump_ring())
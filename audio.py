@@ -0,0 +1,282 @@
+"""Streaming audio output on one persistent sounddevice.OutputStream.
+
+The stream stays open for the whole session.  Its callback pulls
+fixed-size blocks from a ChordScheduler, which starts each chord on a beat
+grid kept on the stream's sample clock, so chords land with sample
+accuracy and no per-chord device setup.
+"""
+import time
+from collections import deque
+
+from synth import DEFAULT_FS
+from telemetry import telemetry
+from timeline import OnsetLog, grid_frames
+
+DEFAULT_BLOCKSIZE = 512
+DEFAULT_LATENCY = "low"
+
+
+def count_status(status, time_info):
+    """Count what the device reports for this callback, and whether it started too late."""
+    if status.output_underflow:
+        telemetry.count("underruns")
+    if status.output_overflow:
+        telemetry.count("overruns")
+    # Some host APIs report 0 for both times
+    due = getattr(time_info, "outputBufferDacTime", 0)
+    now = getattr(time_info, "currentTime", 0)
+    if due and now and now > due:
+        telemetry.count("late_blocks")
+
+
+class ChordScheduler:
+    """Queue of rendered chords that the audio callback drains block by block.
+
+    Chords start on an absolute beat grid kept on the sample clock (frames
+    written so far).  The length of each beat is taken from
+    ``beat_frames`` when the chord starts, so a tempo change applies from
+    the next beat on; a chord that arrives after its onset is started part
+    way through instead of pushing every later beat back.  Buffers longer
+    than their beat are cut, shorter ones padded with silence.
+
+    The GUI and playback threads only append to the queue and bump the
+    generation and timeline counters; everything else happens on the audio
+    thread, so no lock is held while the callback runs.
+    """
+
+    def __init__(self, fs=DEFAULT_FS):
+        self.fs = fs
+        # Beat length in (fractional) frames; None plays each buffer in full
+        self.beat_frames = None
+        self.clock = 0
+        self.onset_log = OnsetLog()
+        self._queue = deque()
+        self._generation = 0
+        self._timeline = 0
+        self._active_timeline = None
+        self._origin = None
+        # Next onset in fractional frames from the first beat of the timeline
+        self._grid = None
+        self._current = None
+        self._current_generation = None
+        self._pos = 0
+        self._end = 0
+        self._preview = None
+        # (ideal, actual) sample clock frames of the latest onset, for on_start callbacks
+        self.last_onset = None
+
+    def schedule(self, audio, on_start=None):
+        """Queue a chord for the next beat; on_start is called from the audio thread at its onset."""
+        self._queue.append((self._generation, self._timeline, audio, on_start))
+
+    def restart_timeline(self):
+        """Start a new beat grid: the next chord queued plays as soon as it arrives."""
+        self._timeline += 1
+
+    def set_tempo(self, bpm):
+        self.beat_frames = self.fs * 60.0 / bpm
+
+    def seconds_until_next_onset(self):
+        """Time until the current chord ends and the next beat is due (0 if idle)."""
+        origin, grid = self._origin, self._grid
+        if grid is None or self._current is None:
+            return 0.0
+        return max(origin[0] + round(grid) - self.clock, 0.0) / self.fs
+
+    def grid_position(self):
+        """Fractional frames from the first beat to the next onset (0.0 before the first beat)."""
+        grid = self._grid
+        if grid is None or self._active_timeline != self._timeline:
+            return 0.0
+        return grid
+
+    def next_chord_frames(self):
+        """Length in frames of the beat after the current chord, at the current tempo."""
+        beat = self.beat_frames
+        if beat is None:
+            return None
+        # Matches how fill() will place it, so the buffer ends exactly on the grid
+        return grid_frames(self.grid_position(), beat)
+
+    def preview(self, audio):
+        """Mix a one-shot buffer over whatever is playing, replacing any earlier preview."""
+        # [buffer, generation, read position]; replaced wholesale so the
+        # audio thread never sees a half-updated preview
+        self._preview = [audio, self._generation, 0]
+
+    def stop(self):
+        """Drop the playing chord, everything queued and any preview."""
+        self._generation += 1
+        self._preview = None
+
+    @property
+    def busy(self):
+        return self._current is not None or bool(self._queue)
+
+    def _start_next(self, now, generation, out_time):
+        """Start the next queued chord if its onset has come; return frames to wait otherwise."""
+        while self._queue and self._queue[0][0] != generation:
+            self._queue.popleft()
+        if not self._queue:
+            return None
+        _, timeline, audio, on_start = self._queue[0]
+        if timeline != self._active_timeline:
+            self._active_timeline = timeline
+            self._grid = 0.0
+            # Sample clock and stream time of the first beat
+            self._origin = (now, out_time if out_time is not None else now / self.fs)
+        origin_frame, origin_time = self._origin
+        onset = origin_frame + round(self._grid)
+        if onset > now:
+            return onset - now
+        self._queue.popleft()
+        self.last_onset = (onset, now)
+        actual = out_time if out_time is not None else now / self.fs
+        self.onset_log.record(self._grid / self.fs, actual - origin_time)
+        self._grid += self.beat_frames or len(audio)
+        end = origin_frame + round(self._grid)
+        if end > now:
+            self._current = audio
+            self._current_generation = generation
+            self._pos = now - onset
+            self._end = end
+        # Called even for a chord that was too late to sound at all, so
+        # whoever waits on it moves on to the next beat
+        if on_start is not None:
+            on_start()
+        return 0
+
+    def fill(self, out, out_time=None):
+        """Write exactly len(out) samples into out, padding with silence.
+
+        ``out_time`` is the stream time at which out[0] will be heard, if
+        the backend reports it; onset deviations are measured against it.
+        """
+        generation = self._generation
+        frames = len(out)
+        block_start = self.clock
+        out[:] = 0
+        pos = 0
+        played = False
+        if self._current is not None and self._current_generation != generation:
+            self._current = None
+        while pos < frames:
+            now = block_start + pos
+            if self._current is None:
+                wait = self._start_next(now, generation, None if out_time is None else out_time + pos / self.fs)
+                if wait is None:
+                    break
+                if wait:
+                    # Early: stay silent until the beat
+                    pos += min(wait, frames - pos)
+                    continue
+                if self._current is None:
+                    continue
+            audio = self._current
+            take = min(frames - pos, self._end - now)
+            have = max(0, min(take, len(audio) - self._pos))
+            out[pos:pos + have] = audio[self._pos:self._pos + have]
+            played = played or have > 0
+            self._pos += take
+            pos += take
+            if now + take >= self._end:
+                self._current = None
+        self.clock = block_start + frames
+        self.mix_preview(out, clip=played)
+
+    def mix_preview(self, out, clip=True):
+        """Add the next len(out) samples of the current preview, if any, to out."""
+        preview = self._preview
+        if preview is None:
+            return
+        audio, preview_generation, pos = preview
+        if preview_generation != self._generation:
+            self._preview = None
+            return
+        take = min(len(out), len(audio) - pos)
+        out[:take] += audio[pos:pos + take]
+        preview[2] = pos + take
+        if preview[2] >= len(audio):
+            self._preview = None
+        # Whatever was already in out and the preview together can exceed full scale
+        if clip:
+            out.clip(-1.0, 1.0, out=out)
+
+
+class AudioEngine:
+    """Owns the output stream and feeds it from a ChordScheduler."""
+
+    # Chords are rendered and scheduled by the caller, in this process
+    render_in_process = True
+
+    def __init__(self, fs=DEFAULT_FS, blocksize=DEFAULT_BLOCKSIZE, latency=DEFAULT_LATENCY):
+        self.fs = fs
+        self.blocksize = blocksize
+        self.latency = latency
+        self.scheduler = ChordScheduler(fs)
+        self._stream = None
+
+    def start(self):
+        if self._stream is None:
+            # Imported here so the render process can use ChordScheduler
+            # without loading PortAudio
+            import sounddevice as sd
+            self._stream = sd.OutputStream(
+                samplerate=self.fs,
+                blocksize=self.blocksize,
+                latency=self.latency,
+                channels=1,
+                dtype="float32",
+                callback=self._callback,
+            )
+            self._stream.start()
+            telemetry.info["block_ms"] = self.blocksize / self.fs * 1e3
+            telemetry.info["latency_ms"] = round(self._stream.latency * 1e3, 2)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def _callback(self, outdata, frames, time_info, status):
+        start = time.perf_counter()
+        count_status(status, time_info)
+        self.scheduler.fill(outdata[:, 0], getattr(time_info, "outputBufferDacTime", None) or None)
+        telemetry.record("callback", time.perf_counter() - start)
+        telemetry.count("callbacks")
+
+    def schedule(self, audio, on_start=None):
+        self.start()
+        self.scheduler.schedule(audio, on_start)
+
+    def preview(self, audio):
+        self.start()
+        self.scheduler.preview(audio)
+
+    def stop(self):
+        self.scheduler.stop()
+
+    def restart_timeline(self, bpm):
+        self.scheduler.set_tempo(bpm)
+        self.scheduler.restart_timeline()
+
+    def set_tempo(self, bpm):
+        self.scheduler.set_tempo(bpm)
+
+    def seconds_until_next_onset(self):
+        return self.scheduler.seconds_until_next_onset()
+
+    def grid_position(self):
+        return self.scheduler.grid_position()
+
+    def next_chord_frames(self):
+        return self.scheduler.next_chord_frames()
+
+    @property
+    def onset_log(self):
+        return self.scheduler.onset_log
+
+    @property
+    def busy(self):
+        return self.scheduler.busy
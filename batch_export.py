@@ -0,0 +1,116 @@
+"""Batch-export progressions from JSONL to MIDI files, without the UI.
+
+Each input line is one progression:
+
+    {"name": "ii_V_I", "key": "C", "mode": "Dorian", "tempo": 100,
+     "chords": [{"roman": "ii", "extension": "+7th", "inversion": null, "voicing": null}, ...]}
+
+"key", "mode", "tempo" and "name" are optional; unnamed progressions are
+numbered by input line.  Lines are handed to a process pool in chunks and
+the run reports its throughput in files per second.
+
+    python batch_export.py progressions.jsonl -o out/ -j 8
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from export import export_midi
+from theory import DEFAULT_MODE, KEY_INDEX, MODE_INTERVALS
+
+DEFAULT_CHUNK_SIZE = 256
+
+
+def _export_chunk(out_dir, chunk):
+    """Worker: export one chunk of (line number, JSON line) pairs."""
+    written = 0
+    errors = []
+    for line_no, line in chunk:
+        try:
+            record = json.loads(line)
+            name = os.path.basename(str(record.get("name") or f"progression_{line_no:07d}"))
+            key = record.get("key", "C")
+            mode = record.get("mode", DEFAULT_MODE)
+            # theory falls back to C major for names it doesn't know; a typo
+            # here must not quietly write the wrong key
+            if key not in KEY_INDEX:
+                raise ValueError(f"unknown key {key!r}")
+            if mode not in MODE_INTERVALS:
+                raise ValueError(f"unknown mode {mode!r}")
+            export_midi(
+                record["chords"],
+                os.path.join(out_dir, name + ".mid"),
+                key=key,
+                mode=mode,
+                tempo=record.get("tempo", 100),
+            )
+            written += 1
+        except Exception as e:
+            errors.append((line_no, f"{type(e).__name__}: {e}"))
+    return written, errors
+
+
+def _read_chunks(lines, size):
+    numbered = ((n, line) for n, line in enumerate(lines, 1) if line.strip())
+    while True:
+        chunk = list(itertools.islice(numbered, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(lines, out_dir, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, max_pending=None):
+    """Export every progression in ``lines``; returns (files written, errors, seconds)."""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    # Bound the chunks in flight so huge inputs are never read into memory at once
+    max_pending = max_pending or workers * 4
+    written = 0
+    errors = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+
+        def collect(done):
+            nonlocal written
+            for future in done:
+                count, errs = future.result()
+                written += count
+                errors.extend(errs)
+
+        for chunk in _read_chunks(lines, chunk_size):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(pool.submit(_export_chunk, out_dir, chunk))
+        collect(wait(pending).done)
+    return written, sorted(errors), time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export progressions from a JSONL file to MIDI files.")
+    parser.add_argument("input", help="JSONL file with one progression per line ('-' for stdin)")
+    parser.add_argument("-o", "--out-dir", default="midi_out", help="directory for the .mid files (default: midi_out)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"progressions per task (default: {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        written, errors, elapsed = run(sys.stdin, args.out_dir, args.workers, args.chunk_size)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            written, errors, elapsed = run(f, args.out_dir, args.workers, args.chunk_size)
+
+    for line_no, message in errors:
+        print(f"line {line_no}: {message}", file=sys.stderr)
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"Wrote {written} files to {args.out_dir} in {elapsed:.2f}s ({rate:.1f} files/s)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Per-beat UI cost of the playback highlight as the progression grows.
+
+Runs headless on Qt's offscreen platform; no audio device is needed.
+Each "beat" moves the highlight one chord forward, which is what play_loop
+triggers on every chord.  Two numbers are reported: the highlight_card
+call itself, and the repaint Qt then does while processing events.  The
+repaint cost of a widget card depends on how many cards overlap it in the
+fixed-height panel, not on the highlight code.
+
+    python benchmarks/bench_highlight.py
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+import main
+from progression import Progression
+from theory import ROMAN_CODES
+
+SIZES = (4, 16, 64, 1000, 10000)
+BEATS = 200
+
+
+def per_beat_ms(app, size):
+    """Return (highlight_card ms, event processing ms) per beat."""
+    romans = ["I", "IV", "V", "vi"]
+    chords = Progression.from_codes([ROMAN_CODES[romans[i % 4]] for i in range(size)], *[bytes(size)] * 3)
+    panel = main.StructurePanel(chords, lambda idx: None)
+    panel.show()
+    app.processEvents()
+    call = paint = 0.0
+    for beat in range(BEATS):
+        start = time.perf_counter()
+        panel.highlight_card(beat % size)
+        mid = time.perf_counter()
+        app.processEvents()
+        call += mid - start
+        paint += time.perf_counter() - mid
+    panel.close()
+    panel.deleteLater()
+    app.processEvents()
+    return call / BEATS * 1e3, paint / BEATS * 1e3
+
+
+def main_():
+    app = QApplication.instance() or QApplication([])
+    for size in SIZES:
+        mode = "cards" if size <= main.VIRTUAL_THRESHOLD else "list view"
+        call, paint = per_beat_ms(app, size)
+        print(f"{size:6d} chords ({mode:9s}): highlight_card {call:7.3f} ms/beat, repaint {paint:7.3f} ms/beat")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,114 @@
+"""Undo/redo history memory and latency on a long progression.
+
+Makes a deep history of random edits (modifier changes, inserts at the
+end, deletes, and now and then a shuffle or a Generate) on a
+progression of --size chords, then reports:
+
+- the record bytes the history holds, against what one full copy of
+  the progression per edit would cost,
+- the Python heap the history really takes (tracemalloc, objects
+  included),
+- undo and redo latency of every edit, walking the whole history back
+  and forth, per kind of edit.
+
+Run from the repository root:  python benchmarks/bench_history.py --size 1000000 --edits 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theory
+from history import History, Shuffle, Splice
+from progression import Progression
+
+MODIFIERS = (None,) + theory.EXTENSIONS
+
+
+def random_progression(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return Progression.from_codes(*(rng.integers(0, n, size=size, dtype=np.uint8).tobytes() for n in theory.CODE_SHAPE))
+
+
+def make_edits(history, edits, seed=1):
+    rng = random.Random(seed)
+    prog = history.progression
+    while len(history) < edits:
+        r = rng.random()
+        if r < 0.6:
+            history.set_modifiers(rng.randrange(len(prog)), rng.choice(MODIFIERS), rng.choice((None,) + theory.INVERSIONS), None)
+        elif r < 0.8:
+            history.append(rng.choice(theory.ROMAN_NUMERALS))
+        elif r < 0.9998:
+            history.delete(rng.randrange(len(prog)))
+        elif r < 0.9999:
+            history.shuffle()
+        else:
+            # Generate over everything, then put the chords back by hand;
+            # the second snapshot shares every chunk with the first
+            saved = prog.copy()
+            history.replace(Progression({"roman": rng.choice(theory.ROMAN_NUMERALS)} for _ in range(8)))
+            history.replace(saved)
+
+
+def kind(edit):
+    if isinstance(edit, Shuffle):
+        return "shuffle"
+    if isinstance(edit, Splice) and not isinstance(edit.old, bytes):
+        return "replace"
+    return "splice"
+
+
+def report(label, latencies):
+    for name, values in sorted(latencies.items()):
+        values = np.array(values) * 1e6
+        print(
+            f"{label} {name:8s} {len(values):>8,}  p50 {np.percentile(values, 50):9.1f} us"
+            f"  p99 {np.percentile(values, 99):9.1f} us  max {values.max():10.1f} us"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark undo/redo history memory and latency.")
+    parser.add_argument("--size", type=int, default=1_000_000, help="chords in the progression (default 1,000,000)")
+    parser.add_argument("--edits", type=int, default=100_000, help="edits in the history (default 100,000)")
+    args = parser.parse_args(argv)
+
+    prog = random_progression(args.size)
+    history = History(prog)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    make_edits(history, args.edits)
+    elapsed = time.perf_counter() - started
+    # The progression itself may have grown; count only what the history added
+    heap = tracemalloc.get_traced_memory()[0] - before - (prog.nbytes - args.size * 4)
+    tracemalloc.stop()
+    print(f"{len(history):,} edits on {args.size:,} chords in {elapsed:.2f}s")
+    print(f"history records {history.nbytes / 1e6:10.2f} MB   (a copy per edit: {len(history) * prog.nbytes / 1e9:,.1f} GB)")
+    print(f"history heap    {heap / 1e6:10.2f} MB   ({heap / len(history):.0f} bytes per edit)")
+
+    final = prog.copy()
+    undo, redo = {}, {}
+    edits = list(history._undo)
+    for edit in reversed(edits):
+        start = time.perf_counter()
+        history.undo()
+        undo.setdefault(kind(edit), []).append(time.perf_counter() - start)
+    for edit in edits:
+        start = time.perf_counter()
+        history.redo()
+        redo.setdefault(kind(edit), []).append(time.perf_counter() - start)
+    assert prog == final
+    report("undo", undo)
+    report("redo", redo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""N-gram index build and query throughput.
+
+Writes a synthetic corpus (random walks over a fixed degree-to-degree
+transition table, 4-12 chords per progression) as JSONL and CSV to a
+temporary directory, then times:
+
+- parsing and counting each file (NgramIndex.build_from_files),
+- counting alone, from runs already in memory (NgramIndex.build),
+- saving the index and opening it memory-mapped (NgramIndex.load),
+- suggestions for random progression tails on the memory-mapped index.
+
+Run from the repository root:  python benchmarks/bench_ngram.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ngram import DEGREES, NgramIndex
+from theory import ROMAN_NUMERALS
+
+# Rough pop-progression habits: row = current degree, column = next degree
+TRANSITIONS = np.array([
+    [1, 2, 1, 6, 6, 5, 1],   # I
+    [2, 1, 1, 2, 8, 1, 1],   # ii
+    [1, 1, 1, 3, 1, 5, 1],   # iii
+    [6, 2, 1, 1, 6, 2, 1],   # IV
+    [8, 1, 1, 2, 1, 5, 1],   # V
+    [2, 3, 1, 6, 4, 1, 1],   # vi
+    [8, 1, 2, 1, 1, 1, 1],   # vii°
+], dtype=np.float64)
+QUERIES = 100_000
+
+
+def synthetic_runs(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    cumulative = np.cumsum(TRANSITIONS / TRANSITIONS.sum(axis=1, keepdims=True), axis=1)
+    lengths = rng.integers(4, 13, size=rows)
+    # Walk every progression at once, one step per column, all starting on I
+    walks = np.zeros((rows, 12), dtype=np.int64)
+    for step in range(1, 12):
+        u = rng.random(rows)
+        walks[:, step] = (u[:, None] > cumulative[walks[:, step - 1]]).sum(axis=1)
+    np.minimum(walks, DEGREES - 1, out=walks)
+    return [walk[:length].tolist() for walk, length in zip(walks, lengths)]
+
+
+def write_corpus(runs, directory):
+    jsonl = os.path.join(directory, "corpus.jsonl")
+    csv_path = os.path.join(directory, "corpus.csv")
+    with open(jsonl, "w", encoding="utf-8") as f:
+        for run in runs:
+            f.write(json.dumps({"chords": [ROMAN_NUMERALS[code] for code in run]}, ensure_ascii=False) + "\n")
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("id,chords\n")
+        for i, run in enumerate(runs):
+            f.write(f"{i},{' '.join(ROMAN_NUMERALS[code] for code in run)}\n")
+    return jsonl, csv_path
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark n-gram index build and queries.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="progressions in the synthetic corpus (default 1,000,000)")
+    parser.add_argument("--context", type=int, default=4, help="longest context (default 4)")
+    args = parser.parse_args(argv)
+
+    print(f"Generating {args.rows:,} progressions...")
+    runs = synthetic_runs(args.rows)
+    chords = sum(len(run) for run in runs)
+    with tempfile.TemporaryDirectory() as directory:
+        jsonl, csv_path = write_corpus(runs, directory)
+        for label, path in (("JSONL", jsonl), ("CSV", csv_path)):
+            size = os.path.getsize(path) / 1e6
+            _, seconds = timed(lambda: NgramIndex.build_from_files([path], args.context))
+            print(f"parse + count {label:5s} {size:7.1f} MB {seconds:7.2f}s  {args.rows / seconds:>12,.0f} rows/s")
+        index, seconds = timed(lambda: NgramIndex.build(runs, args.context))
+        print(f"count only              {seconds:7.2f}s  {chords / seconds:>12,.0f} chords/s")
+
+        path = os.path.join(directory, "corpus.ngram")
+        _, seconds = timed(lambda: index.save(path))
+        print(f"save  {len(index):,} contexts, {os.path.getsize(path) / 1e3:.1f} kB in {seconds * 1e3:.2f} ms")
+        loaded, seconds = timed(lambda: NgramIndex.load(path))
+        print(f"load (memory-mapped)    {seconds * 1e3:7.3f} ms")
+
+        rng = np.random.default_rng(1)
+        tails = [list(rng.integers(0, DEGREES, size=rng.integers(0, 9))) for _ in range(QUERIES)]
+        loaded.suggest(tails[0])
+        latencies = np.empty(QUERIES)
+        for i, tail in enumerate(tails):
+            start = time.perf_counter()
+            loaded.suggest(tail)
+            latencies[i] = time.perf_counter() - start
+        latencies *= 1e6
+        print(
+            f"suggest  p50 {np.percentile(latencies, 50):.1f} us  p99 {np.percentile(latencies, 99):.1f} us"
+            f"  max {latencies.max():.1f} us  ({QUERIES / latencies.sum() * 1e6:,.0f} queries/s)"
+        )
+        del loaded
+
+
+if __name__ == "__main__":
+    main()
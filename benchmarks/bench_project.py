@@ -0,0 +1,82 @@
+"""Project file load and save times at 1k, 100k and 1M chords.
+
+For each size, writes a random progression to a temporary project file,
+then times:
+
+- a full save to a new file,
+- opening it (memory-mapped, records copied into the code columns),
+- decoding one screenful of rows through the lazy key view,
+- a dirty save after changing one chord, and after appending eight,
+- the JSON sidecar, for comparison.
+
+Run from the repository root:  python benchmarks/bench_project.py
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theory
+from progression import Progression
+from project import Project
+
+SIZES = (1_000, 100_000, 1_000_000)
+# Rows the structure panel shows at once
+SCREEN_ROWS = 40
+
+
+def random_progression(size, seed=0):
+    rng = random.Random(seed)
+    codes = [bytes(rng.randrange(n) for _ in range(size)) for n in theory.CODE_SHAPE]
+    return Progression.from_codes(*codes)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def report(label, seconds, written=None):
+    extra = f"  {written:>12,} bytes written" if written is not None else ""
+    print(f"  {label:22s} {seconds * 1e3:9.2f} ms{extra}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark project file load and save.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="progression lengths (default 1k 100k 1M)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"bench_{size}.chordproj")
+            prog = random_progression(size)
+            print(f"{size:,} chords")
+            written, seconds = timed(lambda: Project(prog, tempo=120, key="Eb", mode="Dorian").save(path))
+            report("full save", seconds, written)
+
+            project, seconds = timed(lambda: Project.open(path))
+            report("open", seconds)
+            view = project.progression.key_view()
+            _, seconds = timed(lambda: [view[i] for i in range(min(SCREEN_ROWS, size))])
+            report(f"decode {SCREEN_ROWS} rows", seconds)
+
+            project.progression.set_modifiers(size // 2, "+7th", "1st", None)
+            written, seconds = timed(project.save)
+            report("dirty save, 1 edit", seconds, written)
+            for _ in range(8):
+                project.progression.append("V")
+            written, seconds = timed(project.save)
+            report("dirty save, 8 appended", seconds, written)
+
+            if size <= 100_000:
+                _, seconds = timed(lambda: project.save_sidecar(path + ".json"))
+                report("JSON sidecar", seconds, os.path.getsize(path + ".json"))
+
+
+if __name__ == "__main__":
+    main()
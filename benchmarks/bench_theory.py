@@ -0,0 +1,129 @@
+"""Per-lookup cost of chord resolution, before and after the theory engine.
+
+Run from the repository root:  python benchmarks/bench_theory.py
+"""
+import itertools
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theory
+
+
+def legacy_get_chord_frequencies(roman, extension=None, inversion=None, voicing=None, key="C", mode="Major (Ionian)"):
+    # Copy of the original MainWindow.get_chord_frequencies, minus its two
+    # debug prints, which rebuilt every table on each call.
+    note_names_sharp = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+    note_names_flat = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
+    note_freqs = [261.63, 277.18, 293.66, 311.13, 329.63, 349.23, 369.99, 392.00, 415.30, 440.00, 466.16, 493.88]
+    note_map = {n: f for n, f in zip(note_names_sharp, note_freqs)}
+    note_map.update({n: f for n, f in zip(note_names_flat, note_freqs)})
+    mode_intervals = {
+        "Major (Ionian)":      [0, 2, 4, 5, 7, 9, 11],
+        "Dorian":              [0, 2, 3, 5, 7, 9, 10],
+        "Phrygian":            [0, 1, 3, 5, 7, 8, 10],
+        "Lydian":              [0, 2, 4, 6, 7, 9, 11],
+        "Mixolydian":          [0, 2, 4, 5, 7, 9, 10],
+        "Minor (Aeolian)":     [0, 2, 3, 5, 7, 8, 10],
+        "Locrian":             [0, 1, 3, 5, 6, 8, 10],
+        "Gypsy Minor":         [0, 2, 3, 6, 7, 8, 11],
+        "Harmonic Minor":      [0, 2, 3, 5, 7, 8, 11],
+        "Minor Pentatonic":    [0, 3, 5, 7, 10],
+        "Whole Tone":          [0, 2, 4, 6, 8, 10],
+        "Tonic 2nds":          [0, 2],
+        "Tonic 3rds":          [0, 4],
+        "Tonic 4ths":          [0, 5],
+        "Tonic 6ths":          [0, 9],
+    }
+    roman_to_degree = {"I": 0, "ii": 1, "iii": 2, "IV": 3, "V": 4, "vi": 5, "vii°": 6}
+    if key in note_names_sharp:
+        key_index = note_names_sharp.index(key)
+        scale_notes = note_names_sharp
+    elif key in note_names_flat:
+        key_index = note_names_flat.index(key)
+        scale_notes = note_names_flat
+    else:
+        key_index = 0
+        scale_notes = note_names_sharp
+    intervals = mode_intervals.get(mode, mode_intervals["Major (Ionian)"])
+    scale = [(key_index + i) % 12 for i in intervals]
+    scale_note_names = [scale_notes[i] for i in scale]
+    triads = []
+    for i in range(len(scale)):
+        triads.append([scale_note_names[i], scale_note_names[(i + 2) % len(scale)], scale_note_names[(i + 4) % len(scale)]])
+    roman_map = {
+        "I": triads[0], "ii": triads[1], "iii": triads[2], "IV": triads[3],
+        "V": triads[4], "vi": triads[5], "vii°": triads[6] if len(triads) > 6 else triads[0],
+    }
+    notes = roman_map.get(roman, triads[0])
+    if extension == "+6th":
+        notes = notes + [scale_note_names[(roman_to_degree[roman] + 5) % len(scale_note_names)]]
+    elif extension == "+7th":
+        notes = notes + [scale_note_names[(roman_to_degree[roman] + 6) % len(scale_note_names)]]
+    elif extension == "+9th":
+        notes = notes + [scale_note_names[(roman_to_degree[roman] + 1) % len(scale_note_names)]]
+    elif extension == "sus2":
+        notes[1] = scale_note_names[(roman_to_degree[roman] + 1) % len(scale_note_names)]
+    elif extension == "sus4":
+        notes[1] = scale_note_names[(roman_to_degree[roman] + 3) % len(scale_note_names)]
+    if inversion == "1st":
+        notes = notes[1:] + notes[:1]
+    elif inversion == "2nd":
+        notes = notes[2:] + notes[:2]
+    if voicing == "Open" and len(notes) >= 3:
+        notes = [notes[0], notes[1], notes[2]]
+    elif voicing == "Drop 2" and len(notes) >= 3:
+        notes = [notes[0], notes[2], notes[1]]
+    return [note_map.get(n, 261.63) for n in notes]
+
+
+def pitch_class(freq):
+    return round(12 * math.log2(freq / 440.0)) % 12
+
+
+def workload():
+    # The legacy code only handled the seven-note modes without raising
+    modes = [m for m, iv in theory.MODE_INTERVALS.items() if len(iv) == 7]
+    combos = itertools.product(
+        theory.ROMAN_NUMERALS,
+        (None,) + theory.EXTENSIONS,
+        (None,) + theory.INVERSIONS,
+        (None,) + theory.VOICINGS,
+        ("C", "F#", "Bb"),
+        modes,
+    )
+    return list(combos)
+
+
+def main():
+    calls = workload()
+    for args in calls:
+        # The engine places chords across octaves and voices Open/Drop 2 by
+        # moving notes an octave (the legacy code reordered or dropped
+        # them), so compare pitch classes against the unvoiced chord
+        roman, extension, inversion, voicing, key, mode = args
+        expected = sorted(map(pitch_class, legacy_get_chord_frequencies(roman, extension, inversion, None, key, mode)))
+        assert sorted(map(pitch_class, theory.chord_frequencies(*args))) == expected, args
+
+    def run_legacy():
+        for args in calls:
+            legacy_get_chord_frequencies(*args)
+
+    def run_engine():
+        for args in calls:
+            theory.chord_frequencies(*args)
+
+    n = len(calls)
+    legacy = min(timeit.repeat(run_legacy, number=1, repeat=5)) / n
+    engine = min(timeit.repeat(run_engine, number=1, repeat=5)) / n
+    print(f"lookups per run: {n}")
+    print(f"legacy get_chord_frequencies: {legacy * 1e6:8.3f} us/lookup")
+    print(f"theory.chord_frequencies:     {engine * 1e6:8.3f} us/lookup")
+    print(f"speedup: {legacy / engine:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Tuning table correctness and the cost of retuning.
+
+Checks that every key's tonic is degree 0 of a key-relative scale and
+sounds at its 12-TET pitch, for scales of 7, 12 and 19 notes, then times
+building a tuning's tables and rebuilding every key's chord table for a
+new tuning.
+
+Run from the repository root:  python benchmarks/bench_tuning.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theory
+from tuning import JUST_INTONATION, TONIC_MIDI, equal_frequency, parse_scala
+
+
+def edo(notes):
+    """A Scala file of ``notes`` equal divisions of the octave."""
+    lines = [f"{notes}-EDO", str(notes)] + [f"{1200.0 * step / notes:.6f}" for step in range(1, notes + 1)]
+    return "\n".join(lines)
+
+
+def check_tonics(tuning):
+    for pc, key in enumerate(theory.NOTE_NAMES_SHARP):
+        table = tuning.table(pc)
+        tonic = TONIC_MIDI[pc]
+        expected = equal_frequency(tonic, tuning.reference)
+        assert abs(table[tonic] - expected) < 1e-9, (tuning, key, table[tonic], expected)
+        # One period up is the next degree 0
+        assert abs(table[tonic + len(tuning.cents)] - expected * 2.0 ** (tuning.cents[-1] / 1200.0)) < 1e-9, (tuning, key)
+        # The tonic triad's bass, as playback resolves it
+        assert abs(theory.chord_frequencies("I", key=key, tuning=tuning)[0] - expected) < 1e-9, (tuning, key)
+
+
+def main():
+    scales = [parse_scala(edo(7)), JUST_INTONATION.with_reference(432.0), parse_scala(edo(19))]
+    for tuning in scales:
+        check_tonics(tuning)
+        print(f"{tuning.name}: every key's tonic is degree 0 at its 12-TET pitch")
+
+    def build_tables():
+        tuning = JUST_INTONATION.with_reference(441.0)
+        for pc in range(12):
+            tuning.table(pc)
+
+    references = [439.0, 441.0]
+
+    def retune():
+        # What a change of tuning or A4 costs playback: every key's chord table again
+        references.reverse()
+        tuning = JUST_INTONATION.with_reference(references[0])
+        for key in theory.NOTE_NAMES_SHARP:
+            theory.chord_table(key, theory.DEFAULT_MODE, tuning)
+
+    retune()
+    tables = min(timeit.repeat(build_tables, number=10, repeat=5)) / 10
+    chords = min(timeit.repeat(retune, number=10, repeat=5)) / 10
+    print(f"tuning tables, 12 keys:   {tables * 1e3:8.3f} ms")
+    print(f"chord tables, 12 keys:    {chords * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
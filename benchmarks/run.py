@@ -0,0 +1,385 @@
+"""Headless benchmark suite for theory and tuning, synthesis, export, transposition, progression, n-gram, generator, project file and undo history operations.
+
+Needs no audio device and no display: nothing here imports Qt or
+sounddevice.  Every benchmark is timed in several repeats and the fastest
+repeat is kept, as time per call.  Results are written as JSON and can be
+compared against a stored baseline, failing when anything got slower than
+the threshold allows:
+
+    python benchmarks/run.py --save-baseline            # record benchmarks/baseline.json
+    python benchmarks/run.py --threshold 0.25           # exit 1 on a >25% slowdown
+    python benchmarks/run.py -k export -o results.json  # a subset, saved elsewhere
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import export
+import synth
+import theory
+from progression import Progression
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 5
+MIN_REPEAT_SECONDS = 0.05
+
+BENCHMARKS = {}
+# Temporary directories of the benchmark being run, removed once it is timed
+_scratch = []
+
+
+def bench(name):
+    """Register a setup function that returns the zero-argument callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def scratch_dir(prefix="bench_"):
+    """A temporary directory for a benchmark's setup, removed after the benchmark has run."""
+    directory = tempfile.TemporaryDirectory(prefix=prefix)
+    _scratch.append(directory)
+    return directory.name
+
+
+def random_progression(size, seed=0):
+    rng = random.Random(seed)
+    codes = [[rng.randrange(n) for _ in range(size)] for n in theory.CODE_SHAPE]
+    return Progression.from_codes(*codes)
+
+
+@bench("theory.lookup.all_modes")
+def _():
+    # Every numeral with every extension, in every mode, from a warm cache
+    args = [
+        (roman, ext, None, None, "C", mode["label"])
+        for mode in theory.MODES
+        for roman in theory.ROMAN_NUMERALS
+        for ext in (None,) + theory.EXTENSIONS
+    ]
+    for a in args:
+        theory.chord_frequencies(*a)
+
+    def run():
+        for a in args:
+            theory.chord_frequencies(*a)
+    return run
+
+
+@bench("theory.table.all_modes.cold")
+def _():
+    labels = [mode["label"] for mode in theory.MODES]
+
+    def run():
+        theory.clear_cache()
+        for label in labels:
+            theory.chord_table("C", label)
+    return run
+
+
+@bench("theory.retune.all_keys")
+def _():
+    # A new tuning or A4: every key's chord table rebuilt under just intonation,
+    # one gather each from MIDI notes that stay cached
+    from tuning import JUST_INTONATION
+    labels = [mode["label"] for mode in theory.MODES]
+    for label in labels:
+        theory.chord_notes("C", label)
+    references = [432.0, 440.0]
+
+    def run():
+        references.reverse()
+        tuning = JUST_INTONATION.with_reference(references[0])
+        for key in theory.NOTE_NAMES_SHARP:
+            theory.chord_table(key, "Major (Ionian)", tuning)
+    return run
+
+
+@bench("synth.chord")
+def _():
+    freqs = theory.chord_frequencies("V", "+7th")
+    return lambda: synth.render_chord(freqs, 0.6, synth.DEFAULT_FS)
+
+
+@bench("synth.chord.cached")
+def _():
+    freqs = theory.chord_frequencies("V", "+7th")
+    cache = synth.ChordBufferCache()
+    cache.get(freqs, 0.6, synth.DEFAULT_FS)
+    return lambda: cache.get(freqs, 0.6, synth.DEFAULT_FS)
+
+
+@bench("synth.progression.64")
+def _():
+    freqs = export.progression_frequencies(random_progression(64))
+    return lambda: synth.render_progression(freqs, 0.6, synth.DEFAULT_FS)
+
+
+@bench("synth.progression.1k.short")
+def _():
+    # Sixteenth notes at 100 BPM: many chord changes per block of samples
+    freqs = export.progression_frequencies(random_progression(1000))
+    return lambda: synth.render_progression(freqs, 0.15, synth.DEFAULT_FS)
+
+
+def _midi_bench(size):
+    prog = random_progression(size)
+
+    def run():
+        export.export_midi(prog, io.BytesIO())
+    return run
+
+
+for _size, _label in ((10, "10"), (1000, "1k"), (100_000, "100k")):
+    bench(f"export.midi.{_label}")(lambda size=_size: _midi_bench(size))
+
+
+@bench("progression.shuffle.100k")
+def _():
+    import numpy as np
+    prog = random_progression(100_000)
+    rng = np.random.default_rng(0)
+    return lambda: prog.shuffle(rng)
+
+
+@bench("progression.transpose.100k")
+def _():
+    prog = random_progression(100_000)
+    return lambda: prog.transpose(1)
+
+
+@bench("progression.edit.100k")
+def _():
+    # One modifier edit, one delete from the middle and one append
+    prog = random_progression(100_000)
+    middle = len(prog) // 2
+
+    def run():
+        prog.set_modifiers(middle, "+7th", "1st", None)
+        del prog[middle]
+        prog.append("V", "+7th")
+    return run
+
+
+@bench("progression.keys.10k")
+def _():
+    # Every chord decoded at once (the structure panel now decodes lazily, via key_view)
+    prog = random_progression(10_000)
+    return prog.keys
+
+
+def _ngram_runs(rows, seed=0):
+    rng = random.Random(seed)
+    return [[rng.randrange(len(theory.ROMAN_NUMERALS)) for _ in range(rng.randrange(4, 13))] for _ in range(rows)]
+
+
+@bench("ngram.build.100k")
+def _():
+    from ngram import NgramIndex
+    runs = _ngram_runs(100_000)
+    return lambda: NgramIndex.build(runs)
+
+
+@bench("ngram.suggest")
+def _():
+    # What the chord panel asks after every edit
+    from ngram import NgramIndex
+    index = NgramIndex.build(_ngram_runs(10_000))
+    tails = _ngram_runs(100, seed=1)
+
+    def run():
+        for tail in tails:
+            index.suggest(tail)
+    return run
+
+
+@bench("markov.generate.10k")
+def _():
+    # Constrained, as the Generate button asks: I ... V I, no chord three times running
+    import numpy as np
+    import markov
+    rng = np.random.default_rng(0)
+    return lambda: markov.generate(10_000, 8, start="I", end=("V", "I"), max_repeat=2, rng=rng)
+
+
+@bench("transpose.tensor.64")
+def _():
+    # All 12 keys x 15 modes of a 64-chord progression in one pass
+    import transpose
+    prog = random_progression(64)
+    return lambda: transpose.note_tensor(prog)
+
+
+@bench("transpose.pack.midi.64")
+def _():
+    import transpose
+    prog = random_progression(64)
+    out_dir = scratch_dir("bench_pack_")
+    return lambda: transpose.export_pack(prog, out_dir, workers=1)
+
+
+@bench("project.open.100k")
+def _():
+    from project import Project
+    path = os.path.join(scratch_dir("bench_project_"), "bench.chordproj")
+    Project(random_progression(100_000)).save(path)
+    return lambda: Project.open(path)
+
+
+@bench("project.save.dirty.100k")
+def _():
+    # Ctrl+S after one modifier change: header plus one 64 KiB block
+    from project import Project
+    project = Project(random_progression(100_000))
+    project.save(os.path.join(scratch_dir("bench_project_"), "bench.chordproj"))
+    flip = [0]
+
+    def run():
+        flip[0] ^= 1
+        project.progression.set_modifiers(50_000, "+7th" if flip[0] else None, None, None)
+        project.save()
+    return run
+
+
+@bench("history.undo_redo.100k")
+def _():
+    # Ctrl+Z and Ctrl+Shift+Z over a deep history of single-chord edits
+    from history import History
+    prog = random_progression(100_000)
+    history = History(prog)
+    rng = random.Random(1)
+    for _ in range(10_000):
+        history.set_modifiers(rng.randrange(len(prog)), rng.choice(theory.EXTENSIONS), None, None)
+
+    def run():
+        for _ in range(100):
+            history.undo()
+        for _ in range(100):
+            history.redo()
+    return run
+
+
+def time_call(fn, repeat):
+    """Seconds per call of fn: the fastest of ``repeat`` calibrated runs."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_REPEAT_SECONDS:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(MIN_REPEAT_SECONDS / elapsed) + 1))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best, number
+
+
+def run_suite(names, repeat=DEFAULT_REPEAT, out=sys.stdout):
+    results = {}
+    for name in names:
+        try:
+            fn = BENCHMARKS[name]()
+            seconds, number = time_call(fn, repeat)
+        finally:
+            # Drop the benchmark (and any files it holds open) before its scratch directories
+            fn = None
+            while _scratch:
+                _scratch.pop().cleanup()
+        results[name] = {"seconds": seconds, "loops": number}
+        print(f"{name:32s} {format_seconds(seconds):>12s}", file=out)
+    return results
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return f"{seconds * scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def compare(results, baseline, threshold, out=sys.stdout):
+    """Print the ratio against the baseline; return the names that regressed."""
+    regressed = []
+    print(f"\nAgainst baseline (fail above {1 + threshold:.2f}x):", file=out)
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:32s} {'(new)':>12s}", file=out)
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:32s} {ratio:11.2f}x{flag}", file=out)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the headless benchmark suite.")
+    parser.add_argument("-k", "--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("-o", "--output", default=None, help="write results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"baseline JSON to compare against (default: {os.path.relpath(DEFAULT_BASELINE)})")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"allowed slowdown as a fraction (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"timed repeats per benchmark (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print(f"No benchmark matches {args.filter!r}", file=sys.stderr)
+        return 2
+
+    results = run_suite(names, args.repeat)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            # Keep entries for benchmarks that were filtered out of this run
+            with open(args.baseline, encoding="utf-8") as f:
+                report["results"] = {**json.load(f)["results"], **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressed = compare(results, baseline, args.threshold)
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) slower than the threshold: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
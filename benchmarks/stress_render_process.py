@@ -0,0 +1,125 @@
+"""Playback under GIL contention: in-process rendering against the render process.
+
+Plays a progression while a few threads in this process run pure-Python
+busy work, standing in for heavy UI work such as StructurePanel
+rebuilding every card, and reports for each mode how late chord onsets
+were (by more than one block), how many blocks reached the audio
+callback after they were already due at the DAC (each one a dropout on a
+real device), and how often the device or the ring ran dry.  The "threads" mode renders the way playback
+does by default (LookaheadRenderer in this process); "process" is
+``--render-process``.
+
+Needs an audio output device.  Run from the repository root:
+
+    python benchmarks/stress_render_process.py --seconds 8 --threads 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio import AudioEngine
+from lookahead import LookaheadRenderer, Settings
+from progression import Progression
+from render_process import TELEMETRY_INTERVAL, RenderProcessEngine
+from telemetry import telemetry
+from theory import DEFAULT_MODE, ROMAN_NUMERALS
+
+TEMPO = 240
+SCHEDULE_AHEAD = 0.1
+
+
+def busy_ui(stop):
+    # Lots of small Python objects built and sorted, like rebuilding widget cards
+    while not stop.is_set():
+        cards = [{"roman": str(i), "label": f"card {i}", "style": ("#fff", i % 7)} for i in range(2000)]
+        cards.sort(key=lambda card: card["style"][1])
+
+
+def play_threads(engine, codes, settings):
+    # The same steps as MainWindow.play_on_stream
+    renderer = LookaheadRenderer(codes, lambda: settings, engine.fs)
+    started = threading.Event()
+    engine.restart_timeline(settings.tempo)
+    engine.onset_log.clear()
+    renderer.start()
+    try:
+        for idx in range(len(codes)):
+            item = renderer.get()
+            started.clear()
+            engine.schedule(item.audio, lambda: started.set())
+            started.wait()
+            while engine.seconds_until_next_onset() > SCHEDULE_AHEAD:
+                time.sleep(min(engine.seconds_until_next_onset() - SCHEDULE_AHEAD, 0.05))
+    finally:
+        renderer.close()
+    while engine.busy:
+        time.sleep(0.01)
+
+
+def play_process(engine, codes, settings):
+    engine.onset_log.clear()
+    engine.play(codes, settings)
+    while engine.busy:
+        time.sleep(0.01)
+
+
+def run(mode, codes, settings, load_threads):
+    engine = RenderProcessEngine() if mode == "process" else AudioEngine()
+    engine.start()
+    # Let the stream (and the render process) settle before counting
+    time.sleep(1.0)
+    telemetry.reset()
+    stop = threading.Event()
+    hogs = [threading.Thread(target=busy_ui, args=(stop,), daemon=True) for _ in range(load_threads)]
+    for hog in hogs:
+        hog.start()
+    try:
+        (play_process if mode == "process" else play_threads)(engine, codes, settings)
+    finally:
+        stop.set()
+        for hog in hogs:
+            hog.join()
+    if mode == "process":
+        # The render process sends its counters in batches
+        time.sleep(2 * TELEMETRY_INTERVAL)
+    engine.close()
+    deviations = engine.onset_log.deviations()
+    block = engine.blocksize / engine.fs
+    return {
+        "late": sum(d > block for d in deviations),
+        "max_late_ms": max(deviations + [0.0]) * 1e3,
+        "late_blocks": telemetry.counters["late_blocks"],
+        "underruns": telemetry.counters["underruns"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=8.0, help="playback length per run (default 8)")
+    parser.add_argument("--threads", type=int, default=4, help="busy threads standing in for UI work (default 4)")
+    parser.add_argument("--waveform", default="saw", help="oscillator waveform (default saw)")
+    args = parser.parse_args(argv)
+
+    beats = max(1, int(args.seconds * TEMPO / 60))
+    prog = Progression()
+    for i in range(beats):
+        prog.append(ROMAN_NUMERALS[i % len(ROMAN_NUMERALS)], "+9th")
+    settings = Settings("C", DEFAULT_MODE, TEMPO, args.waveform)
+
+    print(f"{beats} chords at {TEMPO} BPM, {args.threads} busy threads under load")
+    print(f"{'mode':8s} {'load':5s} {'late':>5s} {'max late':>10s} {'late blocks':>12s} {'underruns':>10s}")
+    for mode in ("threads", "process"):
+        for load in (0, args.threads):
+            result = run(mode, prog.codes(), settings, load)
+            print(
+                f"{mode:8s} {'yes' if load else 'no':5s} {result['late']:5d} {result['max_late_ms']:8.1f}ms"
+                f" {result['late_blocks']:12d} {result['underruns']:10d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Headless exporters for chord progressions.
+
+Nothing in here imports Qt, so the functions can be driven from scripts and
+batch tools as well as from the UI.  A progression is a
+progression.Progression, as kept in MainWindow.chord_progression, or any
+sequence of chord dicts with "roman", "extension", "inversion" and
+"voicing" keys.
+"""
+import os
+import struct
+
+from progression import Progression
+from theory import DEFAULT_MODE
+
+AUDIO_CHUNK_CHORDS = 32
+AUDIO_FORMATS = (".wav", ".flac")
+MIDI_TICKS_PER_BEAT = 480
+MIDI_WRITE_BATCH = 4096
+NOTE_ON_VELOCITY = 80
+NOTE_OFF_VELOCITY = 64
+
+
+def _as_progression(chords):
+    return chords if isinstance(chords, Progression) else Progression(chords)
+
+
+def progression_frequencies(chords, key="C", mode=DEFAULT_MODE, tuning=None):
+    """Frequencies of each chord, resolved exactly as playback resolves them (default tuning: 12-TET)."""
+    return [chord.freqs for chord in _as_progression(chords).chords(key, mode, tuning)]
+
+
+def progression_midi(chords, key="C", mode=DEFAULT_MODE):
+    """MIDI note numbers of each chord, from the same tables as playback."""
+    return _as_progression(chords).notes(key, mode)
+
+
+def _varlen(value):
+    """Encode a MIDI variable-length quantity."""
+    out = bytearray([value & 0x7F])
+    value >>= 7
+    while value:
+        out.insert(0, 0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(out)
+
+
+def _chord_events(notes, ticks):
+    """Track bytes for one chord: every note on together, all off one beat later.
+
+    Uses running status like mido does.  Each chord starts with an explicit
+    note-on status byte, so the encoding does not depend on its neighbours.
+    """
+    events = bytearray()
+    for i, n in enumerate(notes):
+        events += bytes((0x00, 0x90, n, NOTE_ON_VELOCITY) if i == 0 else (0x00, n, NOTE_ON_VELOCITY))
+    for i, n in enumerate(notes):
+        events += _varlen(ticks) + bytes((0x80, n, NOTE_OFF_VELOCITY)) if i == 0 else bytes((0x00, n, NOTE_OFF_VELOCITY))
+    return bytes(events)
+
+
+def write_midi_notes(fp, chord_notes, tempo=100, ticks_per_beat=MIDI_TICKS_PER_BEAT):
+    """Write chords, given as MIDI-number tuples, as a one-track MIDI file to ``fp``.
+
+    The events for each distinct chord are encoded once and reused, and the
+    track is written straight to the file object in large slices, so no
+    message objects are built and ``fp`` may be a pipe.
+    """
+    encoded = {}
+    parts = []
+    for notes in chord_notes:
+        events = encoded.get(notes)
+        if events is None:
+            events = encoded[notes] = _chord_events(notes, ticks_per_beat)
+        parts.append(events)
+    usec = round(60_000_000 / tempo)
+    tempo_meta = b"\x00\xff\x51\x03" + usec.to_bytes(3, "big")
+    end_of_track = b"\x00\xff\x2f\x00"
+    track_len = len(tempo_meta) + sum(map(len, parts)) + len(end_of_track)
+
+    fp.write(b"MThd" + struct.pack(">IHHH", 6, 1, 1, ticks_per_beat))
+    fp.write(b"MTrk" + struct.pack(">I", track_len) + tempo_meta)
+    for start in range(0, len(parts), MIDI_WRITE_BATCH):
+        fp.write(b"".join(parts[start:start + MIDI_WRITE_BATCH]))
+    fp.write(end_of_track)
+
+
+def export_midi(chords, dest, key="C", mode=DEFAULT_MODE, tempo=100):
+    """Write a progression as MIDI, one beat per chord, to a path or binary file object.
+
+    Notes come from the theory tables that playback uses, so the file
+    honours the mode and every extension.
+    """
+    notes = progression_midi(chords, key, mode)
+    if hasattr(dest, "write"):
+        write_midi_notes(dest, notes, tempo)
+    else:
+        with open(dest, "wb") as f:
+            write_midi_notes(f, notes, tempo)
+
+
+def _wav_header(frames, fs):
+    data_bytes = frames * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, 1, fs, fs * 2, 2, 16,
+        b"data", data_bytes,
+    )
+
+
+def _render_chunks(freq_chunks, tempo, fs, waveform):
+    from synth import OscillatorBank
+    beat = 60 / tempo
+    # One bank for the whole file, so phases carry over between chunks
+    bank = OscillatorBank(fs, waveform)
+    for freqs in freq_chunks:
+        audio, _ = bank.render_progression(freqs, beat)
+        yield audio
+
+
+def export_audio(chords, path, key="C", mode=DEFAULT_MODE, tempo=100, fs=None, chunk_chords=AUDIO_CHUNK_CHORDS, waveform="sine", tuning=None):
+    """Render a progression to a 16-bit mono .wav or .flac file with one of synth.WAVEFORMS.
+
+    Chords are rendered ``chunk_chords`` at a time and written straight to
+    the output, so peak memory depends on the chunk size and not on the
+    length of the progression.  WAV output is written through a NumPy
+    memmap of one chunk at a time; FLAC needs the optional soundfile
+    package.  ``tuning`` is a tuning.EqualTemperament or ScaleTuning
+    (default 12-TET at 440 Hz).  Returns the number of frames written.
+    """
+    chords = _as_progression(chords)
+    freq_chunks = (
+        progression_frequencies(chords[start:start + chunk_chords], key, mode, tuning)
+        for start in range(0, len(chords), chunk_chords)
+    )
+    return _write_audio(freq_chunks, len(chords), path, tempo, fs, waveform)
+
+
+def write_audio(chord_freqs, path, tempo=100, fs=None, chunk_chords=AUDIO_CHUNK_CHORDS, waveform="sine"):
+    """Like export_audio, for chords already resolved to frequency tuples."""
+    freq_chunks = (chord_freqs[start:start + chunk_chords] for start in range(0, len(chord_freqs), chunk_chords))
+    return _write_audio(freq_chunks, len(chord_freqs), path, tempo, fs, waveform)
+
+
+def _write_audio(freq_chunks, count, path, tempo, fs, waveform):
+    import numpy as np
+    from synth import DEFAULT_FS, chord_lengths
+
+    fs = fs or DEFAULT_FS
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in AUDIO_FORMATS:
+        raise ValueError(f"Unsupported audio format {ext!r}; use one of {', '.join(AUDIO_FORMATS)}")
+    frames = int(chord_lengths(count, 60 / tempo, fs).sum()) if count else 0
+    chunks = _render_chunks(freq_chunks, tempo, fs, waveform)
+
+    if ext == ".flac":
+        try:
+            import soundfile as sf
+        except ImportError:
+            raise RuntimeError("FLAC export needs the soundfile package (pip install soundfile)")
+        with sf.SoundFile(path, "w", samplerate=fs, channels=1, format="FLAC", subtype="PCM_16") as f:
+            for audio in chunks:
+                f.write(audio)
+        return frames
+
+    header = _wav_header(frames, fs)
+    if len(header) - 8 + frames * 2 > 0xFFFFFFFF:
+        raise ValueError("Progression is too long for a WAV file; export as .flac instead")
+    with open(path, "wb") as f:
+        f.write(header)
+        f.truncate(len(header) + frames * 2)
+    pos = 0
+    for audio in chunks:
+        # Map only this chunk's region so resident memory stays bounded
+        out = np.memmap(path, dtype="<i2", mode="r+", offset=len(header) + pos * 2, shape=(len(audio),))
+        np.multiply(audio, 32767, out=audio)
+        np.rint(audio, out=audio)
+        out[:] = audio
+        out.flush()
+        del out
+        pos += len(audio)
+    return frames
@@ -0,0 +1,211 @@
+"""Unlimited undo/redo for a progression, stored as compact edits.
+
+Every change to the progression goes through a History, which keeps the
+smallest description of the change that can be run both ways:
+
+- a splice: where it happened, and the chords removed and inserted
+  there as packed records (four bytes a chord, see
+  Progression.records()).  Adding, deleting or re-voicing a chord
+  costs a few bytes;
+- a shuffle: the seed of its permutation, drawn again on undo and redo;
+- a whole-progression replacement (Remove all, Generate): a splice whose
+  two sides are Snapshots, the records cut into fixed-size chunks.  A
+  chunk equal to the same chunk of either side of the previous
+  replacement is shared, not copied, so replacing a long progression
+  again and again (or Remove all, undo, Remove all) stores only what
+  changed in between.
+
+History memory therefore grows with the edits made, not with their
+number times the progression length, and undo or redo costs the size of
+one edit.  Both return the (start, old end, new end) span they changed,
+as structure_view.diff_span() does.
+"""
+from progression import RECORD_BYTES
+
+# Snapshot chunk size in bytes (16,384 chords)
+SNAPSHOT_CHUNK = 1 << 16
+
+
+class Snapshot:
+    """Immutable packed records, held as chunks that later snapshots may share."""
+
+    __slots__ = ("chunks", "size")
+
+    def __init__(self, records=b"", bases=()):
+        chunks = []
+        for i, offset in enumerate(range(0, len(records), SNAPSHOT_CHUNK)):
+            chunk = records[offset:offset + SNAPSHOT_CHUNK]
+            for base in bases:
+                if i < len(base.chunks) and base.chunks[i] == chunk:
+                    chunk = base.chunks[i]
+                    break
+            chunks.append(chunk)
+        self.chunks = tuple(chunks)
+        self.size = len(records)
+
+    def __len__(self):
+        return self.size
+
+    def tobytes(self):
+        return b"".join(self.chunks)
+
+
+def _data(side):
+    return side.tobytes() if isinstance(side, Snapshot) else side
+
+
+class Splice:
+    """Chords ``old`` at ``start`` replaced with chords ``new`` (packed records or Snapshots)."""
+
+    __slots__ = ("start", "old", "new")
+
+    def __init__(self, start, old, new):
+        self.start = start
+        self.old = old
+        self.new = new
+
+    def apply(self, progression):
+        return self._swap(progression, self.old, self.new)
+
+    def revert(self, progression):
+        return self._swap(progression, self.new, self.old)
+
+    def _swap(self, progression, before, after):
+        start = self.start
+        old_end = start + len(before) // RECORD_BYTES
+        progression.splice(start, old_end, _data(after))
+        return start, old_end, start + len(after) // RECORD_BYTES
+
+    def buffers(self):
+        for side in (self.old, self.new):
+            yield from side.chunks if isinstance(side, Snapshot) else (side,)
+
+
+class Shuffle:
+    """A shuffle of ``size`` chords, by the permutation that ``seed`` draws."""
+
+    __slots__ = ("seed", "size")
+
+    def __init__(self, seed, size):
+        self.seed = seed
+        self.size = size
+
+    def order(self):
+        import numpy as np
+        return np.random.default_rng(self.seed).permutation(self.size)
+
+    def apply(self, progression):
+        progression.permute(self.order())
+        return 0, self.size, self.size
+
+    def revert(self, progression):
+        import numpy as np
+        order = self.order()
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(self.size)
+        progression.permute(inverse)
+        return 0, self.size, self.size
+
+    def buffers(self):
+        return ()
+
+
+class History:
+    """Edits made to ``progression``, undoable and redoable without limit.
+
+    The mutating methods mirror Progression's and record what they do;
+    edits made to the progression directly are not tracked, so call
+    reset() after replacing it wholesale (e.g. opening a project).
+    """
+
+    def __init__(self, progression):
+        self.progression = progression
+        self._undo = []
+        self._redo = []
+        # Both sides of the last replacement, whose chunks later snapshots share
+        self._bases = ()
+
+    def _push(self, edit):
+        self._undo.append(edit)
+        self._redo.clear()
+
+    def _snapshot(self, *bases):
+        return Snapshot(self.progression.records(), bases + self._bases)
+
+    def append(self, roman, extension=None, inversion=None, voicing=None):
+        start = len(self.progression)
+        self.progression.append(roman, extension, inversion, voicing)
+        self._push(Splice(start, b"", self.progression.records(start)))
+
+    def delete(self, index):
+        old = self.progression.records(index, index + 1)
+        del self.progression[index]
+        self._push(Splice(index, old, b""))
+
+    def set_modifiers(self, index, extension=None, inversion=None, voicing=None):
+        old = self.progression.records(index, index + 1)
+        self.progression.set_modifiers(index, extension, inversion, voicing)
+        new = self.progression.records(index, index + 1)
+        if new != old:
+            self._push(Splice(index, old, new))
+
+    def shuffle(self):
+        import numpy as np
+        edit = Shuffle(np.random.SeedSequence().entropy, len(self.progression))
+        edit.apply(self.progression)
+        self._push(edit)
+
+    def replace(self, chords):
+        """Replace every chord with ``chords`` (a Progression, or dicts as for extend())."""
+        old = self._snapshot()
+        self.progression.clear()
+        self.progression.extend(chords)
+        new = self._snapshot(old)
+        self._bases = (old, new)
+        self._push(Splice(0, old, new))
+
+    def remove_all(self):
+        """Remove every chord, as an edit that can be undone (Remove all)."""
+        self.replace(())
+
+    def reset(self):
+        """Forget every edit, keeping the progression as it is; the chords are untouched."""
+        self._undo.clear()
+        self._redo.clear()
+        self._bases = ()
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Revert the last edit; returns the span it changed, or None if there is nothing to undo."""
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        self._redo.append(edit)
+        return edit.revert(self.progression)
+
+    def redo(self):
+        """Apply the last undone edit again; returns the span it changed, or None."""
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        self._undo.append(edit)
+        return edit.apply(self.progression)
+
+    def __len__(self):
+        return len(self._undo) + len(self._redo)
+
+    @property
+    def nbytes(self):
+        """Record bytes held by the history, counting shared snapshot chunks once."""
+        seen = {}
+        for edit in self._undo + self._redo:
+            for buffer in edit.buffers():
+                seen[id(buffer)] = len(buffer)
+        return sum(seen.values())
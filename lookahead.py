@@ -0,0 +1,133 @@
+"""Look-ahead chord rendering for playback.
+
+A worker thread renders the next few chords of a progression while the
+current one plays and hands them over through a bounded queue.  When the
+queue is full the worker blocks (back-pressure), so it never runs more
+than ``depth`` chords ahead, and the playback thread only has to pick up
+a finished buffer shortly before each beat: synthesis cost is off the
+critical path between chords.
+
+Every rendered chord records the settings (key, mode, tempo, waveform, tuning)
+and the grid position it was rendered for.  If either no longer matches
+when its beat comes, the playback thread calls restart() and the worker
+renders again from that chord, continuing the voices' phases from the
+last chord that was actually played.
+"""
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from synth import OscillatorBank
+from telemetry import telemetry
+from theory import chord_table
+from timeline import grid_frames
+
+DEFAULT_DEPTH = 4
+# How often a blocked worker checks whether it has been cancelled
+POLL_SECONDS = 0.05
+
+# ``tuning`` is a tuning.EqualTemperament or ScaleTuning; None is 12-TET at 440 Hz
+Settings = namedtuple("Settings", ["key", "mode", "tempo", "waveform", "tuning"], defaults=(None,))
+# ``position`` is where the chord starts on the beat grid and ``phases``
+# the voice phases after it, for restarting the worker right behind it
+RenderedChord = namedtuple("RenderedChord", ["index", "audio", "settings", "position", "phases"])
+
+
+class LookaheadRenderer:
+    """Renders chords ahead of playback on a worker thread.
+
+    ``codes`` are packed chord codes (Progression.codes()); ``settings`` is
+    called before each chord and returns the Settings to render it with.
+    """
+
+    def __init__(self, codes, settings, fs, depth=DEFAULT_DEPTH):
+        self.codes = codes
+        self.settings = settings
+        self.fs = fs
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._generation = 0
+        self._thread = None
+
+    def start(self, index=0, position=0.0, phases=None):
+        """(Re)start rendering at chord ``index``, placed ``position`` frames into the grid."""
+        self._generation += 1
+        # Anything still queued belongs to the old generation
+        self._drain()
+        bank = OscillatorBank(self.fs)
+        if phases is not None:
+            bank.phases = phases.copy()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._generation, bank, index, position), daemon=True
+        )
+        self._thread.start()
+
+    def restart(self, item, position, previous=None):
+        """Throw away what was rendered ahead and render again from ``item``.
+
+        ``previous`` is the last chord handed to the audio stream, whose
+        voice phases the new renders continue from.
+        """
+        self.start(item.index, position, previous.phases if previous is not None else None)
+
+    def close(self):
+        """Stop the worker; it exits at its next chord or queue poll."""
+        self._generation += 1
+        self._drain()
+
+    def get(self, keep_going=lambda: True):
+        """Next rendered chord, or None if keep_going() turned false while waiting."""
+        while keep_going():
+            try:
+                generation, item = self._queue.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if generation != self._generation:
+                continue
+            if isinstance(item, Exception):
+                raise item
+            return item
+        return None
+
+    def is_stale(self, item, position):
+        """True if ``item`` no longer matches the current settings or its place on the grid."""
+        return item.settings != self.settings() or item.position != position
+
+    def _drain(self):
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _put(self, generation, item):
+        # Block while the queue is full, but give up once cancelled
+        while generation == self._generation:
+            try:
+                self._queue.put((generation, item), timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, generation, bank, index, position):
+        try:
+            for index in range(index, len(self.codes)):
+                if generation != self._generation:
+                    return
+                settings = self.settings()
+                t0 = time.perf_counter()
+                freqs = chord_table(settings.key, settings.mode, settings.tuning)[self.codes[index]].freqs
+                t1 = time.perf_counter()
+                beat = self.fs * 60.0 / settings.tempo
+                bank.waveform = settings.waveform
+                # Exactly one beat on the scheduler's grid, so nothing is cut or padded
+                audio = bank.render_chord(freqs, grid_frames(position, beat))
+                telemetry.record("lookup", t1 - t0)
+                telemetry.record("render", time.perf_counter() - t1)
+                item = RenderedChord(index, audio, settings, position, bank.phases.copy())
+                position += beat
+                if not self._put(generation, item):
+                    return
+        except Exception as e:
+            self._put(generation, e)
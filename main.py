@@ -1,32 +1,45 @@
 import sys
+import time
+_STARTED = time.perf_counter()
+import startup_profile
+if "--profile-startup" in sys.argv:
+    startup_profile.install(_STARTED)
 import math
+import threading
+import applog
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QGridLayout, QGroupBox, QSpinBox, QComboBox, QScrollArea, QGraphicsDropShadowEffect
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QGridLayout, QGroupBox, QSpinBox, QDoubleSpinBox, QComboBox, QScrollArea, QGraphicsDropShadowEffect
 )
-from PyQt5.QtCore import Qt
-
-# Define MODES at the top so it's available globally
-MODES = [
-    {"label": "Major (Ionian)"},
-    {"label": "Dorian"},
-    {"label": "Phrygian"},
-    {"label": "Lydian"},
-    {"label": "Mixolydian"},
-    {"label": "Minor (Aeolian)"},
-    {"label": "Locrian"},
-    {"label": "Gypsy Minor"},
-    {"label": "Harmonic Minor"},
-    {"label": "Minor Pentatonic"},
-    {"label": "Whole Tone"},
-    {"label": "Tonic 2nds"},
-    {"label": "Tonic 3rds"},
-    {"label": "Tonic 4ths"},
-    {"label": "Tonic 6ths"},
-]
+from PyQt5.QtCore import Qt, QSize, QObject, QEvent, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from theory import MODES, ROMAN_NUMERALS, chord_frequencies
+from tuning import EQUAL_TEMPERAMENT, JUST_INTONATION, MAX_A4, MIN_A4, EqualTemperament
+from progression import Progression
+from history import History
+from project import PROJECT_EXT, Project
+from timeline import OnsetLog
+from telemetry import telemetry
+from structure_view import ChordListView, chord_color, chord_keys, edit_span
 
 # Define constants for panel dimensions and style
 PANEL_W = 400
 PANEL_H = 600
+# Progressions longer than this are shown in the virtualized list view
+VIRTUAL_THRESHOLD = 64
+# How long before its beat the next chord is handed to the audio stream
+SCHEDULE_AHEAD = 0.1
+# Chords rendered ahead of the one playing (same as lookahead.DEFAULT_DEPTH)
+LOOKAHEAD_CHORDS = 4
+# Shortest progression the Generate button makes, and how often it may repeat a chord in a row
+GENERATE_MIN_CHORDS = 8
+GENERATE_MAX_REPEAT = 2
+# Projects up to this many chords also get a readable JSON sidecar on save
+SIDECAR_MAX_CHORDS = 10_000
+# Same as synth.WAVEFORMS, without importing NumPy before the first paint
+WAVEFORMS = ("sine", "triangle", "saw", "square")
+# Tuning selector entries; the last asks for a Scala (.scl) file
+TUNINGS = ("12-TET", "Just intonation", "Scala file…")
 PANEL_STYLE = (
     "QFrame {"
     "  background: #fff;"
@@ -36,12 +49,35 @@ PANEL_STYLE = (
     "}"
 )
 
+_card_styles = {}
+
+def card_style(color):
+    # One stylesheet per degree color, covering both the idle and the
+    # playing look, so highlighting never has to set a new stylesheet
+    if color not in _card_styles:
+        _card_styles[color] = f"""
+            QFrame#chordCard {{
+                border: 1.5px solid {color};
+                border-radius: 16px;
+                margin-bottom: 16px;
+                background: #fff;
+            }}
+            QFrame#chordCard[playing="true"] {{
+                border-color: #1976d2;
+                background: #e3f2fd;
+            }}
+            """
+    return _card_styles[color]
+
 class ChordPanel(QWidget):
     def __init__(self, on_select, on_add, selected_roman):
         super().__init__()
         self.on_select = on_select
         self.on_add = on_add
         self.selected_roman = None
+        # roman -> probability of coming next, from the n-gram index
+        self.suggestions = {}
+        self._top_suggestion = None
         # ensure the panel background matches the card
         self.setStyleSheet("background: #ffffff; border-radius: 20px;")
         
@@ -71,7 +107,6 @@ class ChordPanel(QWidget):
         )
 
         # Chord wheel group (centered with header)
-        from PyQt5.QtGui import QFont
         wheel = QWidget(card_frame)
         wheel.setFixedSize(420, 420)
 
@@ -173,11 +208,29 @@ class ChordPanel(QWidget):
         self.update_selection(roman)
         self.on_select(roman)
 
+    def set_suggestions(self, ranked):
+        # ranked: [(roman, probability)], most likely first
+        self.suggestions = dict(ranked)
+        self._top_suggestion = ranked[0][0] if ranked else None
+        self.update_selection(self.selected_roman)
+
+    @staticmethod
+    def _restyle(btn, style):
+        # Re-polishing a button is the expensive part of a suggestion refresh
+        if btn.styleSheet() != style:
+            btn.setStyleSheet(style)
+
     def update_selection(self, roman):
         for btn, r in zip(self.btns, self.roman_numerals):
             color = "#1976d2" if r in ["I", "IV", "V"] else "#388e3c" if r in ["ii", "iii", "vi"] else "#d32f2f"
+            p = self.suggestions.get(r)
+            if p is None:
+                btn.setToolTip(f"{r} = chord degree (press Enter to select)")
+            else:
+                btn.setToolTip(f"{r} = chord degree (press Enter to select)\nSuggested next ({p:.0%})")
             if r == roman:
-                btn.setStyleSheet(
+                self._restyle(
+                    btn,
                     f"""
                     QPushButton {{
                         background: {color};
@@ -198,12 +251,22 @@ class ChordPanel(QWidget):
                     """
                 )
             else:
-                btn.setStyleSheet(
+                # Likely next chords get a tint of their own colour, stronger
+                # the more likely they are; the likeliest also a thicker ring
+                background = "#fff"
+                border = 2
+                if p is not None:
+                    r_, g_, b_ = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+                    background = f"rgba({r_}, {g_}, {b_}, {int(40 + 100 * p)})"
+                    if r == self._top_suggestion:
+                        border = 4
+                self._restyle(
+                    btn,
                     f"""
                     QPushButton {{
-                        background: #fff;
+                        background: {background};
                         color: {color};
-                        border: 2px solid {color};
+                        border: {border}px solid {color};
                         border-radius: 45px;
                         font-size: 32px;
                         font-weight: bold;
@@ -211,7 +274,7 @@ class ChordPanel(QWidget):
                     QPushButton:focus {{
                         outline: none;
                         box-shadow: none;
-                        border: 2px solid {color};
+                        border: {border}px solid {color};
                     }}
                     QPushButton:pressed {{
                         background: #f5f5f5;
@@ -225,10 +288,15 @@ class ChordPanel(QWidget):
             self.update_selection(None)
 
 class StructurePanel(QWidget):
-    def __init__(self, chords, on_delete):
+    def __init__(self, chords, on_delete, on_changed=None, on_generate=None, history=None):
         super().__init__()
         self.chords = chords
+        # Edits made here are recorded for undo
+        self.history = history if history is not None else History(chords)
         self.on_delete = on_delete
+        self.on_generate = on_generate
+        # Called after every update_chords, e.g. to refresh suggestions
+        self.on_changed = on_changed
         # Card container for header + content
         from PyQt5.QtWidgets import QFrame
         card_frame = QFrame(self)
@@ -268,20 +336,61 @@ class StructurePanel(QWidget):
             "QPushButton:pressed {background: #1565c0;}"
         )
         self.randomize_btn.setToolTip("Randomize chord order")
+        self.generate_btn = QPushButton("Generate")
+        self.generate_btn.setStyleSheet(
+            "QPushButton {background: #388e3c; color: #fff; border-radius: 8px; font-size: 14px; font-weight: bold; padding: 6px 18px;}"
+            "QPushButton:pressed {background: #2e7d32;}"
+        )
+        self.generate_btn.setToolTip("Replace the progression with a new one in the current mode")
+        self.generate_btn.setVisible(on_generate is not None)
         controls_row.addWidget(self.remove_all_btn)
         controls_row.addWidget(self.randomize_btn)
+        controls_row.addWidget(self.generate_btn)
         card_layout.addLayout(controls_row)
+
+        # Empty-state placeholder: 4 outlined boxes and instructional text, built once
+        self.empty_placeholder = QWidget()
+        placeholder_layout = QVBoxLayout(self.empty_placeholder)
+        placeholder_layout.setContentsMargins(0, 0, 0, 0)
+        slot_row = QHBoxLayout()
+        slot_row.setSpacing(18)
+        slot_row.setAlignment(Qt.AlignHCenter)
+        for _ in range(4):
+            slot = QFrame()
+            slot.setFixedSize(56, 56)
+            slot.setStyleSheet(
+                "background: #fff; border: 2.5px solid #bbb; border-radius: 10px;"
+            )
+            slot.setFocusPolicy(Qt.StrongFocus)
+            slot.setToolTip("Empty chord slot (Tab to focus)")
+            slot_row.addWidget(slot)
+        placeholder_layout.addLayout(slot_row)
+        # Centered instructional text
+        empty = QLabel("Construct your chord progression here.")
+        empty.setAlignment(Qt.AlignCenter)
+        empty.setStyleSheet("color: #bbb; font-family: Palatino, Georgia, serif; font-size: 13pt; margin-top: 18px;")
+        placeholder_layout.addWidget(empty)
+        card_layout.addWidget(self.empty_placeholder)
         card_layout.addLayout(self.cards_layout)
 
+        # Cards currently shown, and the (roman, extension, inversion, voicing)
+        # each one was built from, so updates only touch what changed
+        self.card_widgets = []
+        self._card_keys = []
+        self._play_icon = None
+        self._highlighted_card = None
+        self.card_layout = card_layout
+        self.list_view = None
+
         def remove_all_chords():
-            self.chords.clear()
+            self.history.remove_all()
             self.update_chords(self.chords)
         def randomize_chords():
-            import random
-            random.shuffle(self.chords)
+            self.history.shuffle()
             self.update_chords(self.chords)
         self.remove_all_btn.clicked.connect(remove_all_chords)
         self.randomize_btn.clicked.connect(randomize_chords)
+        self.generate_btn.clicked.connect(lambda: self.on_generate())
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -289,242 +398,273 @@ class StructurePanel(QWidget):
         self.setLayout(main_layout)
         self.update_chords(chords)
 
-    def update_chords(self, chords):
-        # Remove old cards
-        self.card_widgets = []
-        while self.cards_layout.count():
-            item = self.cards_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-        if not chords:
-            # Show 4 empty outlined boxes, centered
-            from PyQt5.QtWidgets import QHBoxLayout
-            slot_row = QHBoxLayout()
-            slot_row.setSpacing(18)
-            slot_row.setAlignment(Qt.AlignHCenter)
-            for _ in range(4):
-                slot = QFrame()
-                slot.setFixedSize(56, 56)
-                slot.setStyleSheet(
-                    "background: #fff; border: 2.5px solid #bbb; border-radius: 10px;"
-                )
-                slot.setFocusPolicy(Qt.StrongFocus)
-                slot.setToolTip("Empty chord slot (Tab to focus)")
-                slot_row.addWidget(slot)
-            self.cards_layout.addLayout(slot_row)
-            # Centered instructional text
-            empty = QLabel("Construct your chord progression here.")
-            empty.setAlignment(Qt.AlignCenter)
-            empty.setStyleSheet("color: #bbb; font-family: Palatino, Georgia, serif; font-size: 13pt; margin-top: 18px;")
-            self.cards_layout.addWidget(empty)
+    def update_chords(self, chords, span=None):
+        # span: the (start, old end, new end) an edit changed, when known (undo/redo)
+        count = len(chords)
+        if count > VIRTUAL_THRESHOLD:
+            # Long progressions go to the virtualized list, which only paints visible rows
+            self._sync_cards([], [])
+            model = self._chord_list_view().chord_model
+            if span is not None and hasattr(chords, "records") and model.can_splice(span, count):
+                # Read back only the edited chords instead of snapshotting them all
+                model.splice(span[0], span[1], chords.records(span[0], span[2]))
+            else:
+                model.sync(chord_keys(chords), span)
+            self.list_view.show()
         else:
-            # Show each chord as a styled card with play, label, modifiers, and delete
-            from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout
-            for i, chord in enumerate(chords):
-                roman = chord["roman"]
-                color = "#1976d2" if roman in ["I", "IV", "V"] else "#388e3c" if roman in ["ii", "iii", "vi"] else "#d32f2f"
-                card = QFrame()
-                card.setObjectName("chordCard")
-                card.setMinimumHeight(110)
-                card.setStyleSheet(
-                    f"""
-                    QFrame#chordCard {{
-                        border: 1.5px solid {color};
-                        border-radius: 16px;
-                        margin-bottom: 16px;
-                        background: #fff;
-                    }}
-                    """
-                )
-                # Add drop shadow effect
-                from PyQt5.QtWidgets import QGraphicsDropShadowEffect
-                shadow = QGraphicsDropShadowEffect(card)
-                shadow.setBlurRadius(16)
-                shadow.setOffset(0, 4)
-                shadow.setColor(Qt.gray)
-                card.setGraphicsEffect(shadow)
-                card.setFocusPolicy(Qt.StrongFocus)
-                card.setToolTip(f"Chord: {roman} (hover to preview, drag to reorder)")
-                card_layout = QHBoxLayout()
-                card_layout.setSpacing(10)
-                card_layout.setContentsMargins(12, 8, 12, 8)
-                # Play button
-                from PyQt5.QtGui import QIcon, QPixmap, QPainter, QBrush, QPolygon
-                from PyQt5.QtCore import QPoint
-
-                # Create a small play icon (white triangle)
-                small_play_pixmap = QPixmap(24, 24)
-                small_play_pixmap.fill(Qt.transparent)
-                painter = QPainter(small_play_pixmap)
-                painter.setRenderHint(QPainter.Antialiasing)
-                painter.setBrush(QBrush(Qt.white))
-                painter.setPen(Qt.NoPen)
-                triangle = QPolygon([QPoint(7, 4), QPoint(19, 12), QPoint(7, 20)])
-                painter.drawPolygon(triangle)
-                painter.end()
-                small_play_icon = QIcon(small_play_pixmap)
-
-                play_btn = QPushButton(card)
-                play_btn.setIcon(small_play_icon)
-                play_btn.setIconSize(small_play_pixmap.size())
-                play_btn.setFixedSize(36, 36)
-                play_btn.setStyleSheet(
-                    """
-                    QPushButton {
-                        background: #1976d2;
-                        border-radius: 10px;
-                        border: none;
-                        box-shadow: 0 2px 8px rgba(0,0,0,0.10);
-                    }
-                    QPushButton:pressed {
-                        background: #1565c0;
-                    }
-                    """
-                )
-                play_btn.setFocusPolicy(Qt.StrongFocus)
-                play_btn.setToolTip("Preview this chord")
-                def make_play(idx):
-                    def play():
-                        parent = self.parentWidget()
-                        while parent and not hasattr(parent, "key"):
-                            parent = parent.parentWidget()
-                        if parent and hasattr(parent, "key"):
-                            chord = self.chords[idx]
-                            freqs = parent.get_chord_frequencies(
-                                chord["roman"],
-                                chord.get("extension"),
-                                chord.get("inversion"),
-                                chord.get("voicing"),
-                                key=parent.key,
-                                mode=parent.mode
-                            )
-                            parent.play_chord_tone(freqs, duration=0.5)
-                    return play
-                play_btn.clicked.connect(make_play(i))
-                card_layout.addWidget(play_btn)
-                # create a vertical stack for label + modifiers
-                label_column = QVBoxLayout()
-                label_column.setAlignment(Qt.AlignTop | Qt.AlignHCenter)
-
-                # Roman numeral label
-                label = QLabel(roman, card)
-                label.setAlignment(Qt.AlignCenter)
-                font = QFont("Palatino")
-                if not font.exactMatch():
-                    font = QFont("Georgia")
-                font.setPointSize(32)
-                font.setWeight(QFont.Bold)
-                label.setFont(font)
-                label.setStyleSheet(f"font-size: 32px; font-weight: bold; color: {color}; min-width: 60px;")
-                label.setWordWrap(False)  # Prevent text wrapping
-                label.setMinimumHeight(40)  # Ensure consistent height
-                label.setAlignment(Qt.AlignCenter)  # Center-align text
-                label_column.addWidget(label)
-
-                # modifiers in a single horizontal row
-                mod_row = QHBoxLayout()
-                mod_row.setSpacing(8)
-                mod_row.setAlignment(Qt.AlignLeft | Qt.AlignBottom)
-
-                if chord.get("extension"):
-                    ext_pill = QLabel(chord["extension"])
-                    ext_pill.setFixedHeight(30)
-                    ext_pill.setMinimumWidth(56)
-                    ext_pill.setAlignment(Qt.AlignCenter)
-                    ext_pill.setStyleSheet(
-                        f"""
-                        background: #fff;
-                        color: {color};
-                        border: 2px solid {color};
-                        border-radius: 8px;
-                        font-size: 14px;
-                        font-weight: bold;
-                        padding: 4px 10px;
-                        """
-                    )
-                    mod_row.addWidget(ext_pill)
-
-                if chord.get("inversion"):
-                    inv_pill = QLabel(chord["inversion"])
-                    inv_pill.setFixedHeight(30)
-                    inv_pill.setMinimumWidth(56)
-                    inv_pill.setAlignment(Qt.AlignCenter)
-                    inv_pill.setStyleSheet(
-                        f"""
-                        background: #fff;
-                        color: {color};
-                        border: 2px solid {color};
-                        border-radius: 8px;
-                        font-size: 14px;
-                        font-weight: bold;
-                        padding: 4px 10px;
-                        """
-                    )
-                    mod_row.addWidget(inv_pill)
-
-                if chord.get("voicing"):
-                    voicing_pill = QLabel(chord["voicing"])
-                    voicing_pill.setFixedHeight(30)
-                    voicing_pill.setMinimumWidth(56)
-                    voicing_pill.setAlignment(Qt.AlignCenter)
-                    voicing_pill.setStyleSheet(
-                        f"""
-                        background: #fff;
-                        color: {color};
-                        border: 2px solid {color};
-                        border-radius: 8px;
-                        font-size: 14px;
-                        font-weight: bold;
-                        padding: 4px 10px;
-                        """
-                    )
-                    mod_row.addWidget(voicing_pill)
-
-                label_column.addLayout(mod_row)
-                card_layout.addLayout(label_column, 1)
-
-                # Edit/settings button (distinct)
-                edit_btn = QPushButton("✎", card)
-                edit_btn.setFixedSize(36, 36)
-                edit_btn.setStyleSheet(
-                    "QPushButton {background: #fff; color: #1976d2; border: 2px solid #1976d2; font-size: 22px; font-weight: bold; border-radius: 10px;}"
-                    "QPushButton:focus { box-shadow: 0 0 0 2px #1976d244; }"
-                    "QPushButton:hover { background: #e3f2fd; }"
-                )
-                edit_btn.setFocusPolicy(Qt.StrongFocus)
-                edit_btn.setToolTip("Edit this chord")
-                edit_btn.clicked.connect(lambda checked, idx=i: self.show_modifier_popup(idx))
-                card_layout.addWidget(edit_btn)
-                # Delete button
-                del_btn = QPushButton("✕", card)
-                del_btn.setFixedSize(36, 36)
-                del_btn.setStyleSheet(
-                    "QPushButton {background: #fff; color: #888; border: none; font-size: 24px; font-weight: bold; border-radius: 10px;}"
-                    "QPushButton:focus { box-shadow: 0 0 0 2px #8884; }"
-                    "QPushButton:hover { background: #f0f0f0; }"
-                )
-                del_btn.setFocusPolicy(Qt.StrongFocus)
-                del_btn.setToolTip("Remove this chord from progression")
-                del_btn.clicked.connect(lambda checked, idx=i: self.on_delete(idx))
-                card_layout.addWidget(del_btn)
-                card.setLayout(card_layout)
-                self.cards_layout.addWidget(card)
-                self.card_widgets.append(card)
+            if self.list_view is not None:
+                self.list_view.chord_model.sync([])
+                self.list_view.hide()
+            self._sync_cards(chords, chord_keys(chords), span)
+        self.empty_placeholder.setVisible(not count)
+        if self.on_changed is not None:
+            self.on_changed()
+
+    def _sync_cards(self, chords, keys, span=None):
+        # Reconcile the cards against the previous chord list: keep the
+        # unchanged prefix and suffix, and only rebuild the span in between
+        start, old_end, new_end = edit_span(self._card_keys, keys, span)
+
+        # Cards in the changed span are reused when their chord is still
+        # present (e.g. after a shuffle); the rest are built or deleted
+        reusable = {}
+        for card, key in zip(self.card_widgets[start:old_end], self._card_keys[start:old_end]):
+            self.cards_layout.removeWidget(card)
+            reusable.setdefault(key, []).append(card)
+        new_cards = []
+        for key, chord in zip(keys[start:new_end], chords[start:new_end]):
+            pool = reusable.get(key)
+            new_cards.append(pool.pop() if pool else self._make_card(chord))
+        for pool in reusable.values():
+            for card in pool:
+                if card is self._highlighted_card:
+                    self._highlighted_card = None
+                card.deleteLater()
+        for offset, card in enumerate(new_cards):
+            self.cards_layout.insertWidget(start + offset, card)
+        self.card_widgets[start:old_end] = new_cards
+        self._card_keys = keys
+
+    def _chord_list_view(self):
+        if self.list_view is None:
+            self.list_view = ChordListView()
+            self.list_view.card_delegate.playClicked.connect(self.play_chord)
+            self.list_view.card_delegate.editClicked.connect(self.show_modifier_popup)
+            self.list_view.card_delegate.deleteClicked.connect(self.on_delete)
+            self.card_layout.addWidget(self.list_view, 1)
+        return self.list_view
+
+    def play_chord(self, idx):
+        parent = self.parentWidget()
+        while parent and not hasattr(parent, "key"):
+            parent = parent.parentWidget()
+        if parent and hasattr(parent, "key"):
+            chord = self.chords[idx]
+            freqs = parent.get_chord_frequencies(
+                chord["roman"],
+                chord.get("extension"),
+                chord.get("inversion"),
+                chord.get("voicing"),
+                key=parent.key,
+                mode=parent.mode
+            )
+            parent.play_chord_tone(freqs, duration=0.5)
+
+    def _card_index(self, card):
+        return self.card_widgets.index(card)
+
+    def _small_play_icon(self):
+        if self._play_icon is None:
+            from PyQt5.QtGui import QIcon, QPixmap, QPainter, QBrush, QPolygon
+            from PyQt5.QtCore import QPoint
+
+            # Create a small play icon (white triangle)
+            small_play_pixmap = QPixmap(24, 24)
+            small_play_pixmap.fill(Qt.transparent)
+            painter = QPainter(small_play_pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setBrush(QBrush(Qt.white))
+            painter.setPen(Qt.NoPen)
+            triangle = QPolygon([QPoint(7, 4), QPoint(19, 12), QPoint(7, 20)])
+            painter.drawPolygon(triangle)
+            painter.end()
+            self._play_icon = QIcon(small_play_pixmap)
+        return self._play_icon
+
+    def _make_card(self, chord):
+        # Show a chord as a styled card with play, label, modifiers, and delete
+        roman = chord["roman"]
+        color = chord_color(roman)
+        card = QFrame()
+        card.setObjectName("chordCard")
+        card.setMinimumHeight(110)
+        card.setProperty("playing", False)
+        card.setStyleSheet(card_style(color))
+        # Add drop shadow effect
+        from PyQt5.QtWidgets import QGraphicsDropShadowEffect
+        shadow = QGraphicsDropShadowEffect(card)
+        shadow.setBlurRadius(16)
+        shadow.setOffset(0, 4)
+        shadow.setColor(Qt.gray)
+        card.setGraphicsEffect(shadow)
+        card.setFocusPolicy(Qt.StrongFocus)
+        card.setToolTip(f"Chord: {roman} (hover to preview, drag to reorder)")
+        card_layout = QHBoxLayout()
+        card_layout.setSpacing(10)
+        card_layout.setContentsMargins(12, 8, 12, 8)
+        # Play button
+        play_btn = QPushButton(card)
+        play_btn.setIcon(self._small_play_icon())
+        play_btn.setIconSize(QSize(24, 24))
+        play_btn.setFixedSize(36, 36)
+        play_btn.setStyleSheet(
+            """
+            QPushButton {
+                background: #1976d2;
+                border-radius: 10px;
+                border: none;
+                box-shadow: 0 2px 8px rgba(0,0,0,0.10);
+            }
+            QPushButton:pressed {
+                background: #1565c0;
+            }
+            """
+        )
+        play_btn.setFocusPolicy(Qt.StrongFocus)
+        play_btn.setToolTip("Preview this chord")
+        # Handlers look up the card's current position, so cards stay valid
+        # when chords before them are added or removed
+        play_btn.clicked.connect(lambda checked: self.play_chord(self._card_index(card)))
+        card_layout.addWidget(play_btn)
+        # create a vertical stack for label + modifiers
+        label_column = QVBoxLayout()
+        label_column.setAlignment(Qt.AlignTop | Qt.AlignHCenter)
+
+        # Roman numeral label
+        label = QLabel(roman, card)
+        label.setAlignment(Qt.AlignCenter)
+        font = QFont("Palatino")
+        if not font.exactMatch():
+            font = QFont("Georgia")
+        font.setPointSize(32)
+        font.setWeight(QFont.Bold)
+        label.setFont(font)
+        label.setStyleSheet(f"font-size: 32px; font-weight: bold; color: {color}; min-width: 60px;")
+        label.setWordWrap(False)  # Prevent text wrapping
+        label.setMinimumHeight(40)  # Ensure consistent height
+        label.setAlignment(Qt.AlignCenter)  # Center-align text
+        label_column.addWidget(label)
+
+        # modifiers in a single horizontal row
+        mod_row = QHBoxLayout()
+        mod_row.setSpacing(8)
+        mod_row.setAlignment(Qt.AlignLeft | Qt.AlignBottom)
+
+        if chord.get("extension"):
+            ext_pill = QLabel(chord["extension"])
+            ext_pill.setFixedHeight(30)
+            ext_pill.setMinimumWidth(56)
+            ext_pill.setAlignment(Qt.AlignCenter)
+            ext_pill.setStyleSheet(
+                f"""
+                background: #fff;
+                color: {color};
+                border: 2px solid {color};
+                border-radius: 8px;
+                font-size: 14px;
+                font-weight: bold;
+                padding: 4px 10px;
+                """
+            )
+            mod_row.addWidget(ext_pill)
+
+        if chord.get("inversion"):
+            inv_pill = QLabel(chord["inversion"])
+            inv_pill.setFixedHeight(30)
+            inv_pill.setMinimumWidth(56)
+            inv_pill.setAlignment(Qt.AlignCenter)
+            inv_pill.setStyleSheet(
+                f"""
+                background: #fff;
+                color: {color};
+                border: 2px solid {color};
+                border-radius: 8px;
+                font-size: 14px;
+                font-weight: bold;
+                padding: 4px 10px;
+                """
+            )
+            mod_row.addWidget(inv_pill)
+
+        if chord.get("voicing"):
+            voicing_pill = QLabel(chord["voicing"])
+            voicing_pill.setFixedHeight(30)
+            voicing_pill.setMinimumWidth(56)
+            voicing_pill.setAlignment(Qt.AlignCenter)
+            voicing_pill.setStyleSheet(
+                f"""
+                background: #fff;
+                color: {color};
+                border: 2px solid {color};
+                border-radius: 8px;
+                font-size: 14px;
+                font-weight: bold;
+                padding: 4px 10px;
+                """
+            )
+            mod_row.addWidget(voicing_pill)
+
+        label_column.addLayout(mod_row)
+        card_layout.addLayout(label_column, 1)
+
+        # Edit/settings button (distinct)
+        edit_btn = QPushButton("✎", card)
+        edit_btn.setFixedSize(36, 36)
+        edit_btn.setStyleSheet(
+            "QPushButton {background: #fff; color: #1976d2; border: 2px solid #1976d2; font-size: 22px; font-weight: bold; border-radius: 10px;}"
+            "QPushButton:focus { box-shadow: 0 0 0 2px #1976d244; }"
+            "QPushButton:hover { background: #e3f2fd; }"
+        )
+        edit_btn.setFocusPolicy(Qt.StrongFocus)
+        edit_btn.setToolTip("Edit this chord")
+        edit_btn.clicked.connect(lambda checked: self.show_modifier_popup(self._card_index(card)))
+        card_layout.addWidget(edit_btn)
+        # Delete button
+        del_btn = QPushButton("✕", card)
+        del_btn.setFixedSize(36, 36)
+        del_btn.setStyleSheet(
+            "QPushButton {background: #fff; color: #888; border: none; font-size: 24px; font-weight: bold; border-radius: 10px;}"
+            "QPushButton:focus { box-shadow: 0 0 0 2px #8884; }"
+            "QPushButton:hover { background: #f0f0f0; }"
+        )
+        del_btn.setFocusPolicy(Qt.StrongFocus)
+        del_btn.setToolTip("Remove this chord from progression")
+        del_btn.clicked.connect(lambda checked: self.on_delete(self._card_index(card)))
+        card_layout.addWidget(del_btn)
+        card.setLayout(card_layout)
+        return card
 
     def highlight_card(self, idx):
-        for i, card in enumerate(getattr(self, "card_widgets", [])):
-            if i == idx:
-                card.setFocus()
-                card.setStyleSheet(
-                    "background: #e3f2fd; border: 2.5px solid #1976d2; border-radius: 10px; "
-                    "box-shadow: 0 0 0 3px #1976d288;"
-                )
-            else:
-                card.clearFocus()
-                card.setStyleSheet(
-                    "background: #fff; border: 2.5px solid #1976d2; border-radius: 10px;"
-                )
+        # Only the previously and the newly highlighted card are touched: the
+        # card stylesheet already has a rule for the "playing" property, so
+        # flipping it and repolishing that one card is enough
+        if self.list_view is not None:
+            self.list_view.set_playing_row(idx)
+            if idx >= 0 and self.list_view.isVisible():
+                self.list_view.scrollTo(self.list_view.chord_model.index(idx))
+        card = self.card_widgets[idx] if 0 <= idx < len(self.card_widgets) else None
+        if card is self._highlighted_card:
+            return
+        if self._highlighted_card is not None:
+            self._set_card_playing(self._highlighted_card, False)
+        if card is not None:
+            self._set_card_playing(card, True)
+        self._highlighted_card = card
+
+    def _set_card_playing(self, card, playing):
+        card.setProperty("playing", playing)
+        card.style().unpolish(card)
+        card.style().polish(card)
 
     def show_modifier_popup(self, idx):
         from PyQt5.QtWidgets import QDialog, QVBoxLayout, QRadioButton, QButtonGroup, QDialogButtonBox, QGroupBox, QScrollArea
@@ -643,7 +783,6 @@ class StructurePanel(QWidget):
                     selected_ext = r.text()
             if selected_ext == "None":
                 selected_ext = None
-            print("Applied extension:", selected_ext)
             selected_inv = None
             for r in inv_radios:
                 if r.isChecked():
@@ -656,14 +795,12 @@ class StructurePanel(QWidget):
                     selected_voicing = r.text()
             if selected_voicing == "None":
                 selected_voicing = None
-            self.chords[idx]["extension"] = selected_ext
-            self.chords[idx]["inversion"] = selected_inv
-            self.chords[idx]["voicing"] = selected_voicing
-            print(f"Updated modifiers for {self.chords[idx]['roman']}: {selected_ext}, {selected_inv}, {selected_voicing}")
+            self.history.set_modifiers(idx, selected_ext, selected_inv, selected_voicing)
+            applog.info("Updated modifiers for %s: %s, %s, %s", self.chords[idx]["roman"], selected_ext, selected_inv, selected_voicing)
             self.update_chords(self.chords)
 
 class SettingsPanel(QWidget):
-    def __init__(self, on_play, on_stop, is_playing, tempo, set_tempo, on_export_midi, key, set_key, mode, set_mode):
+    def __init__(self, on_play, on_stop, is_playing, tempo, set_tempo, on_export_midi, key, set_key, mode, set_mode, on_export_audio, waveform, set_waveform, on_export_pack=None, on_open_project=None, on_save_project=None, tuning=EQUAL_TEMPERAMENT, set_tuning=None):
         super().__init__()
         from PyQt5.QtWidgets import QFormLayout, QSizePolicy, QFrame, QPushButton
         # Card container for header + content
@@ -787,11 +924,60 @@ class SettingsPanel(QWidget):
         self.export_btn.setToolTip("Export progression as MIDI file")
         self.export_btn.clicked.connect(on_export_midi)
 
+        self.export_audio_btn = QPushButton("Export Audio")
+        self.export_audio_btn.setFixedHeight(44)
+        self.export_audio_btn.setStyleSheet("background: #388e3c; color: #fff; border-radius: 12px; font-size: 18px; font-weight: bold;")
+        self.export_audio_btn.setToolTip("Render progression to a WAV or FLAC file")
+        self.export_audio_btn.clicked.connect(on_export_audio)
+
+        self.export_pack_btn = QPushButton("Export Pack")
+        self.export_pack_btn.setFixedHeight(44)
+        self.export_pack_btn.setStyleSheet("background: #388e3c; color: #fff; border-radius: 12px; font-size: 18px; font-weight: bold;")
+        self.export_pack_btn.setToolTip("Export the progression in all 12 keys and every mode")
+        if on_export_pack is not None:
+            self.export_pack_btn.clicked.connect(on_export_pack)
+        else:
+            self.export_pack_btn.hide()
+
+        self.stats_btn = QPushButton("Stats")
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.setFixedHeight(44)
+        self.stats_btn.setStyleSheet(
+            "QPushButton {font-size: 14px; border-radius: 8px; background: #e0e0e0; color: #222; font-weight: bold;}"
+            "QPushButton:checked {background: #1976d2; color: #fff;}"
+        )
+        self.stats_btn.setToolTip("Show playback timing: render, callback, onset jitter, underruns")
+        self.stats_btn.toggled.connect(self.show_stats)
+
         button_row = QHBoxLayout()
         button_row.addWidget(self.play_btn)
         button_row.addWidget(self.stop_btn)
+        button_row.addWidget(self.stats_btn)
         layout.addLayout(button_row)  # Add Play/Stop as a horizontal group
-        layout.addWidget(self.export_btn)  # Export MIDI as its own row
+        export_row = QHBoxLayout()
+        export_row.addWidget(self.export_btn)
+        export_row.addWidget(self.export_audio_btn)
+        export_row.addWidget(self.export_pack_btn)
+        layout.addLayout(export_row)  # Export MIDI/Audio/Pack as their own row
+
+        self.open_project_btn = QPushButton("Open Project")
+        self.save_project_btn = QPushButton("Save Project")
+        for btn, handler in ((self.open_project_btn, on_open_project), (self.save_project_btn, on_save_project)):
+            btn.setFixedHeight(36)
+            btn.setStyleSheet(
+                "QPushButton {font-size: 14px; border-radius: 8px; background: #e0e0e0; color: #222; font-weight: bold;}"
+                "QPushButton:pressed {background: #bdbdbd;}"
+            )
+            if handler is not None:
+                btn.clicked.connect(lambda checked, handler=handler: handler())
+            else:
+                btn.hide()
+        self.open_project_btn.setToolTip(f"Open a saved session ({PROJECT_EXT}) (Ctrl+O)")
+        self.save_project_btn.setToolTip("Save progression, tempo, key, mode and sound (Ctrl+S; Ctrl+Shift+S to save as)")
+        project_row = QHBoxLayout()
+        project_row.addWidget(self.open_project_btn)
+        project_row.addWidget(self.save_project_btn)
+        layout.addLayout(project_row)
 
         # Key row
         key_label = QLabel("Key:")
@@ -874,16 +1060,155 @@ class SettingsPanel(QWidget):
         mode_row_layout.addWidget(self.mode_combo)
         form.addRow(mode_row)
 
+        # Waveform row
+        waveform_label = QLabel("Sound:")
+        waveform_label.setStyleSheet("font-family: Palatino, Georgia, serif; font-size: 16pt; font-weight: bold;")
+        self.waveform_combo = QComboBox()
+        self.waveform_combo.addItems([w.capitalize() for w in WAVEFORMS])
+        self.waveform_combo.setFixedWidth(180)
+        self.waveform_combo.setCurrentIndex(WAVEFORMS.index(waveform))
+        self.waveform_combo.setStyleSheet(
+            "QComboBox {font-size: 16pt; border-radius: 8px; padding: 4px 16px; border: 1.5px solid #bbb; background: #fff;}"
+            "QComboBox:focus { border: 2px solid #1976d2; }"
+            "QAbstractItemView { background: #fff; }"
+        )
+        self.waveform_combo.setFocusPolicy(Qt.StrongFocus)
+        self.waveform_combo.setToolTip("Oscillator waveform for playback, previews and audio export")
+        self.waveform_combo.currentIndexChanged.connect(lambda i: set_waveform(WAVEFORMS[i]))
+
+        waveform_row = QWidget()
+        waveform_row_layout = QHBoxLayout(waveform_row)
+        waveform_row_layout.setContentsMargins(0, 0, 0, 0)
+        waveform_row_layout.setSpacing(12)
+        waveform_row_layout.addWidget(waveform_label)
+        waveform_row_layout.addWidget(self.waveform_combo)
+        form.addRow(waveform_row)
+
+        # Tuning row: tuning system and the pitch of A4
+        tuning_label = QLabel("Tuning:")
+        tuning_label.setStyleSheet("font-family: Palatino, Georgia, serif; font-size: 16pt; font-weight: bold;")
+        self.tuning_combo = QComboBox()
+        self.tuning_combo.addItems(TUNINGS)
+        self.tuning_combo.setFixedWidth(150)
+        self.tuning_combo.setStyleSheet(
+            "QComboBox {font-size: 12pt; border-radius: 8px; padding: 4px 8px; border: 1.5px solid #bbb; background: #fff;}"
+            "QComboBox:focus { border: 2px solid #1976d2; }"
+            "QAbstractItemView { background: #fff; }"
+        )
+        self.tuning_combo.setFocusPolicy(Qt.StrongFocus)
+        self.tuning_combo.setToolTip("Equal temperament, just intonation in the current key, or a Scala scale on its tonic")
+        self.a4_spin = QDoubleSpinBox()
+        self.a4_spin.setRange(MIN_A4, MAX_A4)
+        self.a4_spin.setDecimals(1)
+        self.a4_spin.setSuffix(" Hz")
+        self.a4_spin.setValue(tuning.reference)
+        self.a4_spin.setFixedWidth(100)
+        self.a4_spin.setStyleSheet("font-size: 12pt; padding: 2px 4px; border-radius: 6px; border: 1.5px solid #bbb; background: #fff;")
+        self.a4_spin.setToolTip("Reference pitch of A4")
+        self.set_tuning = set_tuning
+        self._tuning_index = 0
+        # activated also fires when Scala file… is picked again, to load another scale
+        self.tuning_combo.activated.connect(lambda i: self.choose_tuning(i, load=True))
+        self.a4_spin.valueChanged.connect(lambda value: self.choose_tuning(self._tuning_index))
+
+        tuning_row = QWidget()
+        tuning_row_layout = QHBoxLayout(tuning_row)
+        tuning_row_layout.setContentsMargins(0, 0, 0, 0)
+        tuning_row_layout.setSpacing(8)
+        tuning_row_layout.addWidget(tuning_label)
+        tuning_row_layout.addWidget(self.tuning_combo)
+        tuning_row_layout.addWidget(self.a4_spin)
+        form.addRow(tuning_row)
+        if set_tuning is None:
+            tuning_row.hide()
+
         layout.addLayout(form)
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(card_frame)
         self.setLayout(main_layout)
 
+        # Playback stats overlay, floating over the bottom of the panel
+        self.stats_overlay = QFrame(card_frame)
+        self.stats_overlay.setStyleSheet(
+            "QFrame {background: rgba(33, 33, 33, 225); border-radius: 12px;}"
+            "QLabel {color: #fff; background: transparent; font-family: Menlo, Consolas, monospace; font-size: 12px; font-weight: normal;}"
+        )
+        overlay_layout = QVBoxLayout(self.stats_overlay)
+        overlay_layout.setContentsMargins(12, 10, 12, 10)
+        self.stats_label = QLabel()
+        overlay_layout.addWidget(self.stats_label)
+        stats_csv_btn = QPushButton("Export CSV")
+        stats_csv_btn.setStyleSheet("background: #388e3c; color: #fff; border-radius: 8px; font-size: 13px; font-weight: bold; padding: 4px 10px;")
+        stats_csv_btn.setToolTip("Save every recorded timing sample as CSV")
+        stats_csv_btn.clicked.connect(self.export_stats)
+        reset_btn = QPushButton("Reset")
+        reset_btn.setStyleSheet("background: #757575; color: #fff; border-radius: 8px; font-size: 13px; font-weight: bold; padding: 4px 10px;")
+        reset_btn.clicked.connect(telemetry.reset)
+        overlay_buttons = QHBoxLayout()
+        overlay_buttons.addWidget(stats_csv_btn)
+        overlay_buttons.addWidget(reset_btn)
+        overlay_layout.addLayout(overlay_buttons)
+        self.stats_overlay.hide()
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(500)
+        self.stats_timer.timeout.connect(self.refresh_stats)
+
+    def show_session(self, tempo, key, mode, waveform):
+        # Show settings loaded from a project; the widgets' own signals
+        # pass them on to the window
+        self.tempo_spin.setValue(tempo)
+        self.key_toggle_btn.setChecked(key in self.key_options_flats and key not in self.key_options_sharps)
+        self.key_combo.setCurrentText(key)
+        self.mode_combo.setCurrentText(mode)
+        if waveform in WAVEFORMS:
+            self.waveform_combo.setCurrentIndex(WAVEFORMS.index(waveform))
+
+    def choose_tuning(self, index, load=False):
+        # Go back to the previous entry if no Scala scale was loaded
+        if self.set_tuning(TUNINGS[index], self.a4_spin.value(), load):
+            self._tuning_index = index
+        else:
+            self.tuning_combo.setCurrentIndex(self._tuning_index)
+
+    def show_stats(self, visible):
+        if visible:
+            self.refresh_stats()
+            frame = self.stats_overlay.parentWidget()
+            self.stats_overlay.adjustSize()
+            width = frame.width() - 32
+            height = self.stats_overlay.sizeHint().height()
+            self.stats_overlay.setGeometry(16, frame.height() - height - 16, width, height)
+            self.stats_overlay.raise_()
+            self.stats_overlay.show()
+            self.stats_timer.start()
+        else:
+            self.stats_timer.stop()
+            self.stats_overlay.hide()
+
+    def refresh_stats(self):
+        self.stats_label.setText(telemetry.format_summary())
+
+    def export_stats(self):
+        from PyQt5.QtWidgets import QFileDialog, QMessageBox
+        path, _ = QFileDialog.getSaveFileName(self, "Export Playback Stats", "playback_stats.csv", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            telemetry.write_csv(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Export Failed", f"Failed to save stats:\n{e}")
+
 from functools import partial
 
 class MainWindow(QWidget):
-    def __init__(self):
+    # (chord index or -1, time posted); emitted from the playback and audio
+    # threads and delivered on the GUI thread through a queued connection
+    highlightRequested = pyqtSignal(int, float)
+    # An NgramIndex, loaded on a background thread
+    ngramIndexLoaded = pyqtSignal(object)
+
+    def __init__(self, audio_options=None):
         super().__init__()
         self.setWindowTitle("Chord Progression Tool")
         self.setStyleSheet("background: #f5f5f5;")
@@ -895,7 +1220,11 @@ class MainWindow(QWidget):
 
         # State for selected chord and progression (must be defined before panel creation)
         self.selected_roman = None
-        self.chord_progression = []
+        self.chord_progression = Progression()
+        # Where the session was last opened from or saved to
+        self.project = Project(self.chord_progression)
+        # Every edit to chord_progression goes through here, for undo/redo
+        self.history = History(self.chord_progression)
 
         # Handlers for chord selection and add (must be defined before panel creation)
         def on_select(roman):
@@ -903,173 +1232,300 @@ class MainWindow(QWidget):
             self.chord_panel.update_selection(roman)
 
         def on_add(roman):
-            self.chord_progression.append({
-                "roman": roman,
-                "extension": None,
-                "inversion": None
-            })
+            self.history.append(roman)
             self.selected_roman = None
             self.chord_panel.update_selection(None)
             self.structure_panel.update_chords(self.chord_progression)
 
         def on_delete(idx):
             if 0 <= idx < len(self.chord_progression):
-                self.chord_progression.pop(idx)
+                self.history.delete(idx)
                 self.structure_panel.update_chords(self.chord_progression)
 
+        def on_generate():
+            # A fresh progression from the mode's Markov chain, as long as the
+            # current one (at least GENERATE_MIN_CHORDS), opening on I and
+            # closing with V-I where the mode has a V
+            import markov
+            length = max(len(self.chord_progression), GENERATE_MIN_CHORDS)
+            end = ("V", "I") if markov.degree_count(self.mode) > ROMAN_NUMERALS.index("V") else ("I",)
+            codes = markov.generate(1, length, self.mode, start="I", end=end, max_repeat=GENERATE_MAX_REPEAT)[0]
+            self.history.replace(markov.to_progression(codes))
+            applog.info("Generated %d chords in %s", length, self.mode)
+            self.structure_panel.update_chords(self.chord_progression)
+
         # Playback state and handlers (must be defined before panel creation)
         self.is_playing = False
         self.tempo = 100
         self.key = "C"
         self.mode = "Major (Ionian)"
-
-        import threading
-        import time
-        import numpy as np
-        import sounddevice as sd
-
-        # Add a lock to prevent concurrent audio playback
-        self.audio_lock = threading.Lock()
-
-        def play_chord_tone(self, notes, duration=0.5, fs=44100):
-            print(f"[DEBUG] play_chord_tone called with notes: {notes}")
+        self.waveform = "sine"
+        self.tuning = EQUAL_TEMPERAMENT
+        # The last Scala scale loaded, kept while A4 changes
+        self.scala_tuning = None
+
+        # One output stream for the whole session; chords are queued on it.
+        # NumPy and sounddevice are only imported once the window is up
+        # (see warm_up_audio) or when audio is first needed.
+        self._audio_options = audio_options or {}
+        self._audio_engine = None
+        self._audio_engine_lock = threading.Lock()
+        self.lookahead = LOOKAHEAD_CHORDS
+        # Ideal vs actual chord onsets of the latest playback
+        self.onset_log = OnsetLog()
+        self.highlightRequested.connect(self.on_highlight_requested)
+        # "What comes next" suggestions, once an index is loaded
+        self.ngram_index = None
+        self.ngramIndexLoaded.connect(self.on_ngram_index_loaded)
+
+        def play_chord_tone(self, notes, duration=0.5):
+            if applog.debug_enabled:
+                applog.debug("play_chord_tone: %s", notes)
             if not notes or not all(isinstance(f, (int, float)) and f > 0 for f in notes):
-                print("[DEBUG] Invalid or empty notes passed to play_chord_tone.")
-                return
-            t = np.linspace(0, duration, int(fs * duration), False)
-            audio = np.zeros_like(t)
-            for freq in notes:
-                print(f"[DEBUG] Generating sine wave for freq: {freq}")
-                audio += 0.3 * np.sin(2 * np.pi * freq * t)
-            if np.max(np.abs(audio)) == 0:
-                print("[DEBUG] Audio buffer is silent (all zeros).")
+                applog.warning("Invalid or empty notes passed to play_chord_tone: %r", notes)
                 return
-            audio = audio / np.max(np.abs(audio))
-            print("[DEBUG] Playing audio buffer with sounddevice.")
-            # Ensure only one playback at a time
-            with self.audio_lock:
-                sd.play(audio, fs)
-                sd.wait()
+            from synth import chord_cache
+            # Previews are mixed over playback instead of waiting for it
+            self.audio_engine.preview(chord_cache.get(notes, duration, self.audio_engine.fs, self.waveform))
         setattr(MainWindow, "play_chord_tone", play_chord_tone)
 
         def on_play():
+            if self.is_playing:
+                return
             self.is_playing = True
-            print("Playback started at", self.tempo, "BPM")
-            from PyQt5.QtCore import QTimer
+            applog.info("Playback started at %s BPM", self.tempo)
             def play_loop():
-                print(f"[DEBUG] chord_progression at start of playback: {self.chord_progression}")
-                for idx, chord in enumerate(self.chord_progression):
-                    if not self.is_playing:
-                        break
-                    print(f"[DEBUG] chord at idx={idx}: {chord}")
-                    # Use QTimer.singleShot with functools.partial to capture idx
-                    QTimer.singleShot(0, partial(self.structure_panel.highlight_card, idx))
-                    print(f"[DEBUG] Playing chord idx={idx}: {chord}")
-                    freqs = self.get_chord_frequencies(
-                        chord["roman"],
-                        chord.get("extension"),
-                        chord.get("inversion"),
-                        chord.get("voicing"),
-                        key=self.key,
-                        mode=self.mode
-                    )
-                    print(f"[DEBUG] Frequencies for chord: {freqs}")
-                    print(f"Playing: {chord['roman']} {chord.get('extension') or ''} {chord.get('inversion') or ''}")
-                    self.play_chord_tone(freqs, duration=60/self.tempo)
+                chords = self.chord_progression.copy()
+                if applog.debug_enabled:
+                    applog.debug("chord_progression at start of playback: %s", chords)
+                codes = chords.codes()
+                try:
+                    engine = self.audio_engine
+                    engine.start()
+                except Exception as e:
+                    applog.warning("No audio output (%s); playing silently on the system clock", e)
+                    play_silently(codes)
+                else:
+                    if engine.render_in_process:
+                        play_on_stream(engine, codes)
+                    else:
+                        play_in_render_process(engine, codes)
+                if applog.debug_enabled:
+                    applog.debug("Onset deviations: %s", self.onset_log.summary())
                 # Clear highlight at end
-                QTimer.singleShot(0, partial(self.structure_panel.highlight_card, -1))
+                post_highlight(-1)
                 self.is_playing = False
+
+            def post_highlight(idx):
+                # Called off the GUI thread, which has no event loop of its own for
+                # QTimer; the signal is queued to the GUI thread instead
+                self.highlightRequested.emit(idx, time.perf_counter())
+
+            def playback_settings():
+                from lookahead import Settings
+                return Settings(self.key, self.mode, self.tempo, self.waveform, self.tuning)
+
+            def play_on_stream(engine, codes):
+                from lookahead import LookaheadRenderer
+                # Key, mode, tempo, waveform and tuning are re-read per chord, so changes apply from the next beat
+                renderer = LookaheadRenderer(codes, playback_settings, engine.fs, self.lookahead)
+                keep_going = lambda: self.is_playing
+                started = threading.Event()
+                def chord_started(idx):
+                    # Runs on the audio thread when the chord's first sample is played
+                    post_highlight(idx)
+                    started.set()
+                # Onsets come from the stream's sample clock, starting now
+                engine.restart_timeline(self.tempo)
+                self.onset_log = engine.onset_log
+                self.onset_log.clear()
+                renderer.start()
+                previous = None
+                try:
+                    for idx in range(len(codes)):
+                        item = renderer.get(keep_going)
+                        if item is None:
+                            break
+                        position = engine.grid_position()
+                        if renderer.is_stale(item, position):
+                            # Something changed since this chord was rendered ahead
+                            if applog.debug_enabled:
+                                applog.debug("Re-rendering from chord %d", idx)
+                            renderer.restart(item, position, previous)
+                            item = renderer.get(keep_going)
+                            if item is None:
+                                break
+                        started.clear()
+                        engine.schedule(item.audio, partial(chord_started, idx))
+                        previous = item
+                        while self.is_playing and not started.wait(0.05):
+                            pass
+                        # Hand over the next chord only shortly before its beat, so
+                        # changes made while this one plays still reach it
+                        while self.is_playing and engine.seconds_until_next_onset() > SCHEDULE_AHEAD:
+                            time.sleep(min(engine.seconds_until_next_onset() - SCHEDULE_AHEAD, 0.05))
+                finally:
+                    renderer.close()
+                while self.is_playing and engine.busy:
+                    time.sleep(0.01)
+
+            def play_in_render_process(engine, codes):
+                # The child process renders and schedules; here we only pass on
+                # setting changes, which apply from the next chord it schedules
+                current = playback_settings()
+                engine.play(codes, current, post_highlight)
+                self.onset_log = engine.onset_log
+                self.onset_log.clear()
+                while self.is_playing and engine.busy:
+                    if playback_settings() != current:
+                        current = playback_settings()
+                        engine.update_settings(current)
+                    time.sleep(0.01)
+
+            def play_silently(codes):
+                from timeline import MonotonicTimeline
+                clock = MonotonicTimeline()
+                self.onset_log = clock.log
+                keep_going = lambda: self.is_playing
+                for idx, code in enumerate(codes):
+                    if not clock.wait(keep_going):
+                        return
+                    clock.beat(60 / self.tempo)
+                    post_highlight(idx)
+                clock.wait(keep_going)
             threading.Thread(target=play_loop, daemon=True).start()
 
         def on_stop():
             self.is_playing = False
+            if self._audio_engine is not None:
+                self._audio_engine.stop()
             self.structure_panel.highlight_card(-1)
-            print("Playback stopped")
+            applog.info("Playback stopped")
 
         def set_tempo(val):
             self.tempo = val
-            print("Tempo set to", val)
+            # Takes effect from the next beat of a running playback
+            if self._audio_engine is not None:
+                self._audio_engine.set_tempo(val)
+            applog.info("Tempo set to %s", val)
 
         def export_midi():
             from PyQt5.QtWidgets import QFileDialog, QMessageBox
-            import mido
+            from export import export_midi as write_midi
 
             path, _ = QFileDialog.getSaveFileName(self, "Export MIDI", "progression.mid", "MIDI Files (*.mid)")
             if not path:
                 return
-
-            note_map = {
-                "C": 60, "C#": 61, "D": 62, "D#": 63, "E": 64, "F": 65, "F#": 66,
-                "G": 67, "G#": 68, "A": 69, "A#": 70, "B": 71
-            }
-            def get_midi_notes(roman, extension=None, inversion=None, voicing=None, key="C"):
-                roman_map = {
-                    "I": ["C", "E", "G"],
-                    "ii": ["D", "F", "A"],
-                    "iii": ["E", "G", "B"],
-                    "IV": ["F", "A", "C"],
-                    "V": ["G", "B", "D"],
-                    "vi": ["A", "C", "E"],
-                    "vii°": ["B", "D", "F"],
-                }
-                notes = roman_map.get(roman, ["C", "E", "G"])
-                if extension == "+7th":
-                    notes.append("B")
-                elif extension == "+9th":
-                    notes.append("D")
-                elif extension == "sus2":
-                    notes[1] = "D"
-                elif extension == "sus4":
-                    notes[1] = "F"
-                if inversion == "1st":
-                    notes = notes[1:] + notes[:1]
-                elif inversion == "2nd":
-                    notes = notes[2:] + notes[:2]
-                if voicing == "Open" and len(notes) >= 3:
-                    notes = [notes[0], notes[1], notes[2]]
-                elif voicing == "Drop 2" and len(notes) >= 3:
-                    notes = [notes[0], notes[2], notes[1]]
-                key_offset = note_map.get(key, 60) - 60
-                midi_notes = []
-                for n in notes:
-                    base = n.replace("+8", "").replace("-8", "").replace("°", "")
-                    midi = note_map.get(base, 60) + key_offset
-                    midi_notes.append(midi)
-                return midi_notes
-
-            mid = mido.MidiFile()
-            track = mido.MidiTrack()
-            mid.tracks.append(track)
-            bpm = self.tempo
-            tempo = mido.bpm2tempo(bpm)
-            track.append(mido.MetaMessage('set_tempo', tempo=tempo))
-            ticks_per_beat = mid.ticks_per_beat
-            for chord in self.chord_progression:
-                notes = get_midi_notes(
-                    chord["roman"],
-                    chord.get("extension"),
-                    chord.get("inversion"),
-                    chord.get("voicing"),
-                    key=self.key
-                )
-                for n in notes:
-                    track.append(mido.Message('note_on', note=n, velocity=80, time=0))
-                for i, n in enumerate(notes):
-                    track.append(mido.Message('note_off', note=n, velocity=64, time=ticks_per_beat if i == 0 else 0))
             try:
-                mid.save(path)
+                # Same chord tables as playback, so the file matches what you hear
+                write_midi(self.chord_progression, path, key=self.key, mode=self.mode, tempo=self.tempo)
                 QMessageBox.information(self, "Export Complete", f"MIDI file saved to:\n{path}")
             except Exception as e:
                 QMessageBox.critical(self, "Export Failed", f"Failed to save MIDI file:\n{e}")
 
+        def export_audio():
+            from PyQt5.QtWidgets import QFileDialog, QMessageBox
+            from export import export_audio as render_to_file
+
+            path, _ = QFileDialog.getSaveFileName(self, "Export Audio", "progression.wav", "Audio Files (*.wav *.flac)")
+            if not path:
+                return
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                render_to_file(self.chord_progression, path, key=self.key, mode=self.mode, tempo=self.tempo, waveform=self.waveform, tuning=self.tuning)
+            except Exception as e:
+                QApplication.restoreOverrideCursor()
+                QMessageBox.critical(self, "Export Failed", f"Failed to save audio file:\n{e}")
+            else:
+                QApplication.restoreOverrideCursor()
+                QMessageBox.information(self, "Export Complete", f"Audio file saved to:\n{path}")
+
+        def export_pack():
+            from PyQt5.QtWidgets import QFileDialog, QMessageBox
+
+            if not len(self.chord_progression):
+                QMessageBox.information(self, "Export Pack", "Add some chords to the progression first.")
+                return
+            out_dir = QFileDialog.getExistingDirectory(self, "Export Pack to Folder")
+            if not out_dir:
+                return
+            answer = QMessageBox.question(
+                self, "Export Pack", "Render audio (.wav) for every key and mode as well as MIDI?",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.No,
+            )
+            if answer == QMessageBox.Cancel:
+                return
+            panel = self.settings_panel
+            # Name the keys the way the key selector currently shows them
+            keys = panel.key_options_flats if panel.key_toggle_btn.isChecked() else panel.key_options_sharps
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                from transpose import export_pack as write_pack
+                written, elapsed = write_pack(
+                    self.chord_progression, out_dir, keys, audio=".wav" if answer == QMessageBox.Yes else None,
+                    tempo=self.tempo, waveform=self.waveform, tuning=self.tuning,
+                )
+            except Exception as e:
+                QApplication.restoreOverrideCursor()
+                QMessageBox.critical(self, "Export Failed", f"Failed to export pack:\n{e}")
+            else:
+                QApplication.restoreOverrideCursor()
+                applog.info("Exported %d pack files in %.2fs", written, elapsed)
+                QMessageBox.information(self, "Export Complete", f"{written} files saved to:\n{out_dir}")
+
+        def save_project(save_as=False):
+            from PyQt5.QtWidgets import QFileDialog, QMessageBox
+
+            path = self.project.path
+            if save_as or path is None:
+                path, _ = QFileDialog.getSaveFileName(self, "Save Project", path or "progression" + PROJECT_EXT, f"Chord Projects (*{PROJECT_EXT})")
+                if not path:
+                    return
+            project = self.project
+            project.tempo, project.key, project.mode, project.waveform = self.tempo, self.key, self.mode, self.waveform
+            started = time.perf_counter()
+            try:
+                # Re-saving the same file only rewrites the blocks that changed
+                written = project.save(path, sidecar=len(self.chord_progression) <= SIDECAR_MAX_CHORDS)
+            except Exception as e:
+                QMessageBox.critical(self, "Save Failed", f"Failed to save project:\n{e}")
+                return
+            applog.info("Saved %s: %d bytes written in %.1f ms", path, written, (time.perf_counter() - started) * 1e3)
+            self.show_project_name()
+
+        def open_project():
+            from PyQt5.QtWidgets import QFileDialog, QMessageBox
+
+            path, _ = QFileDialog.getOpenFileName(self, "Open Project", "", f"Chord Projects (*{PROJECT_EXT});;All Files (*)")
+            if not path:
+                return
+            started = time.perf_counter()
+            try:
+                # Fills chord_progression in place; it is shared with the structure panel
+                project = Project.open(path, self.chord_progression)
+            except Exception as e:
+                QMessageBox.critical(self, "Open Failed", f"Failed to open project:\n{e}")
+                return
+            self.project = project
+            # The opened session starts a new history
+            self.history.reset()
+            self.settings_panel.show_session(project.tempo, project.key, project.mode, project.waveform)
+            self.structure_panel.update_chords(self.chord_progression)
+            applog.info("Opened %s: %d chords in %.1f ms", path, len(self.chord_progression), (time.perf_counter() - started) * 1e3)
+            self.show_project_name()
+
+        self.save_project = save_project
+
         # Chord Panel
-        self.chord_panel = ChordPanel(on_select, on_add, self.selected_roman)
+        with startup_profile.phase("ChordPanel"):
+            self.chord_panel = ChordPanel(on_select, on_add, self.selected_roman)
         self.chord_panel.setMinimumWidth(340)
         self.chord_panel.setMaximumWidth(420)
         self.chord_panel.setSizePolicy(self.chord_panel.sizePolicy().Expanding, self.chord_panel.sizePolicy().Expanding)
 
         # Chord Structure Panel
-        self.structure_panel = StructurePanel(self.chord_progression, on_delete)
+        with startup_profile.phase("StructurePanel"):
+            self.structure_panel = StructurePanel(self.chord_progression, on_delete, self.refresh_suggestions, on_generate, self.history)
         self.structure_panel.setMinimumWidth(340)
         self.structure_panel.setMaximumWidth(420)
         self.structure_panel.setSizePolicy(self.structure_panel.sizePolicy().Expanding, self.structure_panel.sizePolicy().Expanding)
@@ -1077,114 +1533,59 @@ class MainWindow(QWidget):
         # Handlers for key/mode selection (must be defined before panel creation)
         def set_key(val):
             self.key = val
-            print("Key set to", val)
+            applog.info("Key set to %s", val)
 
         def set_mode(val):
             self.mode = val
-            print("Mode set to", val)
+            applog.info("Mode set to %s", val)
+
+        def set_waveform(val):
+            self.waveform = val
+            applog.info("Waveform set to %s", val)
+
+        def set_tuning(choice, reference, load=False):
+            # Returns False if a Scala scale was asked for and none was loaded
+            if choice == TUNINGS[2]:
+                if load or self.scala_tuning is None:
+                    from PyQt5.QtWidgets import QFileDialog, QMessageBox
+                    from tuning import load_scala
+
+                    path, _ = QFileDialog.getOpenFileName(self, "Load Scala Scale", "", "Scala Scales (*.scl);;All Files (*)")
+                    if not path:
+                        return False
+                    try:
+                        self.scala_tuning = load_scala(path)
+                    except (OSError, ValueError) as e:
+                        QMessageBox.critical(self, "Load Failed", f"Failed to load scale:\n{e}")
+                        return False
+                tuning = self.scala_tuning.with_reference(reference)
+            elif choice == TUNINGS[1]:
+                tuning = JUST_INTONATION.with_reference(reference)
+            else:
+                tuning = EqualTemperament(reference)
+            # Chord tables are rebuilt for the new tuning on next use
+            self.tuning = tuning
+            applog.info("Tuning set to %r", tuning)
+            return True
 
         # Session Settings Panel
-        self.settings_panel = SettingsPanel(
-            on_play, on_stop, self.is_playing, self.tempo, set_tempo, export_midi,
-            self.key, set_key, self.mode, set_mode
-        )
+        with startup_profile.phase("SettingsPanel"):
+            self.settings_panel = SettingsPanel(
+                on_play, on_stop, self.is_playing, self.tempo, set_tempo, export_midi,
+                self.key, set_key, self.mode, set_mode, export_audio,
+                self.waveform, set_waveform, export_pack, open_project, save_project,
+                self.tuning, set_tuning,
+            )
         self.settings_panel.setMinimumWidth(340)
         self.settings_panel.setMaximumWidth(420)
         self.settings_panel.setSizePolicy(self.settings_panel.sizePolicy().Expanding, self.settings_panel.sizePolicy().Expanding)
 
         # Add get_chord_frequencies method for StructurePanel play button
         def get_chord_frequencies(self, roman, extension=None, inversion=None, voicing=None, key=None, mode=None):
-            print(f"[DEBUG] get_chord_frequencies called with roman={roman}, extension={extension}, inversion={inversion}, voicing={voicing}, key={key}, mode={mode}")
-            # Note names and their indices
-            note_names_sharp = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-            note_names_flat = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
-            note_freqs = [261.63, 277.18, 293.66, 311.13, 329.63, 349.23, 369.99, 392.00, 415.30, 440.00, 466.16, 493.88]
-            note_map = {n: f for n, f in zip(note_names_sharp, note_freqs)}
-            note_map.update({n: f for n, f in zip(note_names_flat, note_freqs)})
-
-            # Mode intervals (in semitones from root)
-            mode_intervals = {
-                "Major (Ionian)":      [0, 2, 4, 5, 7, 9, 11],
-                "Dorian":              [0, 2, 3, 5, 7, 9, 10],
-                "Phrygian":            [0, 1, 3, 5, 7, 8, 10],
-                "Lydian":              [0, 2, 4, 6, 7, 9, 11],
-                "Mixolydian":          [0, 2, 4, 5, 7, 9, 10],
-                "Minor (Aeolian)":     [0, 2, 3, 5, 7, 8, 10],
-                "Locrian":             [0, 1, 3, 5, 6, 8, 10],
-                "Gypsy Minor":         [0, 2, 3, 6, 7, 8, 11],
-                "Harmonic Minor":      [0, 2, 3, 5, 7, 8, 11],
-                "Minor Pentatonic":    [0, 3, 5, 7, 10],
-                "Whole Tone":          [0, 2, 4, 6, 8, 10],
-                "Tonic 2nds":          [0, 2],
-                "Tonic 3rds":          [0, 4],
-                "Tonic 4ths":          [0, 5],
-                "Tonic 6ths":          [0, 9],
-            }
-            # Chord degree to scale degree index
-            roman_to_degree = {
-                "I": 0, "ii": 1, "iii": 2, "IV": 3, "V": 4, "vi": 5, "vii°": 6
-            }
-            # Build scale for key/mode
-            key_val = key if key else self.key
-            mode_val = mode if mode else self.mode
-            if key_val in note_names_sharp:
-                key_index = note_names_sharp.index(key_val)
-                scale_notes = note_names_sharp
-            elif key_val in note_names_flat:
-                key_index = note_names_flat.index(key_val)
-                scale_notes = note_names_flat
-            else:
-                key_index = 0
-                scale_notes = note_names_sharp
-            intervals = mode_intervals.get(mode_val, mode_intervals["Major (Ionian)"])
-            scale = [(key_index + i) % 12 for i in intervals]
-            scale_note_names = [scale_notes[i] for i in scale]
-
-            # Build triads for each degree
-            triads = []
-            for i in range(len(scale)):
-                root = scale_note_names[i]
-                third = scale_note_names[(i + 2) % len(scale)]
-                fifth = scale_note_names[(i + 4) % len(scale)]
-                triads.append([root, third, fifth])
-            roman_map = {
-                "I": triads[0],
-                "ii": triads[1],
-                "iii": triads[2],
-                "IV": triads[3],
-                "V": triads[4],
-                "vi": triads[5],
-                "vii°": triads[6] if len(triads) > 6 else triads[0],
-            }
-            notes = roman_map.get(roman, triads[0])
-            # Apply extension, inversion, voicing as in export_midi
-            if extension == "+6th":
-                # Add 6th degree
-                sixth = scale_note_names[(roman_to_degree[roman] + 5) % len(scale_note_names)]
-                notes = notes + [sixth]
-            elif extension == "+7th":
-                # Add 7th degree
-                seventh = scale_note_names[(roman_to_degree[roman] + 6) % len(scale_note_names)]
-                notes = notes + [seventh]
-            elif extension == "+9th":
-                ninth = scale_note_names[(roman_to_degree[roman] + 1) % len(scale_note_names)]
-                notes = notes + [ninth]
-            elif extension == "sus2":
-                notes[1] = scale_note_names[(roman_to_degree[roman] + 1) % len(scale_note_names)]
-            elif extension == "sus4":
-                notes[1] = scale_note_names[(roman_to_degree[roman] + 3) % len(scale_note_names)]
-            if inversion == "1st":
-                notes = notes[1:] + notes[:1]
-            elif inversion == "2nd":
-                notes = notes[2:] + notes[:2]
-            if voicing == "Open" and len(notes) >= 3:
-                notes = [notes[0], notes[1], notes[2]]
-            elif voicing == "Drop 2" and len(notes) >= 3:
-                notes = [notes[0], notes[2], notes[1]]
-            # For "Custom" voicing, do nothing special (user-defined, not implemented)
-            # If "Custom" is selected, the voicing is not applied; user can implement their own logic here.
-            freqs = [note_map.get(n, 261.63) for n in notes]
-            print(f"[DEBUG] get_chord_frequencies returning: {freqs}")
+            # Chords are resolved once and memoized by the theory module
+            freqs = chord_frequencies(roman, extension, inversion, voicing, key or self.key, mode or self.mode, self.tuning)
+            if applog.debug_enabled:
+                applog.debug("get_chord_frequencies(%s, %s, %s, %s) -> %s", roman, extension, inversion, voicing, freqs)
             return freqs
         # Attach as method
         setattr(MainWindow, "get_chord_frequencies", get_chord_frequencies)
@@ -1207,10 +1608,104 @@ class MainWindow(QWidget):
         self.setTabOrder(self.settings_panel.key_combo, self.settings_panel.mode_combo)
         self.setTabOrder(self.settings_panel.mode_combo, self.settings_panel.play_btn)
 
+    @property
+    def audio_engine(self):
+        if self._audio_engine is None:
+            with self._audio_engine_lock:
+                if self._audio_engine is None:
+                    options = dict(self._audio_options)
+                    if options.pop("render_process", False):
+                        from render_process import RenderProcessEngine
+                        self._audio_engine = RenderProcessEngine(lookahead=self.lookahead, **options)
+                    else:
+                        from audio import AudioEngine
+                        self._audio_engine = AudioEngine(**options)
+        return self._audio_engine
+
+    def warm_up_audio(self):
+        # Load NumPy/sounddevice and open the stream off the GUI thread, so
+        # the first Play or preview click doesn't pay for it
+        def warm_up():
+            try:
+                with startup_profile.phase("audio backend (background)"):
+                    self.audio_engine.start()
+            except Exception as e:
+                applog.error("Audio backend unavailable: %s", e)
+            finally:
+                startup_profile.mark("audio backend ready")
+                if startup_profile.active():
+                    startup_profile.active().report()
+        threading.Thread(target=warm_up, daemon=True).start()
+
+    def load_ngram_index(self, path):
+        # The index is memory-mapped, but NumPy itself is worth keeping off the GUI thread
+        def load():
+            try:
+                from ngram import NgramIndex
+                index = NgramIndex.load(path)
+            except Exception as e:
+                applog.error("Could not load n-gram index %s: %s", path, e)
+            else:
+                applog.info("Loaded n-gram index %s (%d contexts)", path, len(index))
+                self.ngramIndexLoaded.emit(index)
+        threading.Thread(target=load, daemon=True).start()
+
+    def on_ngram_index_loaded(self, index):
+        self.ngram_index = index
+        self.refresh_suggestions()
+
+    def refresh_suggestions(self):
+        if self.ngram_index is None:
+            return
+        tail = self.chord_progression.roman[-self.ngram_index.max_context:] if self.ngram_index.max_context else []
+        ranked = self.ngram_index.suggest(list(tail))
+        self.chord_panel.set_suggestions([(ROMAN_NUMERALS[code], p) for code, p in ranked])
+
+    def undo(self):
+        span = self.history.undo()
+        if span is not None:
+            applog.debug("Undo: chords %d-%d became %d-%d", span[0], span[1], span[0], span[2])
+            # Only the rows in the edit's span are refreshed
+            self.structure_panel.update_chords(self.chord_progression, span)
+
+    def redo(self):
+        span = self.history.redo()
+        if span is not None:
+            applog.debug("Redo: chords %d-%d became %d-%d", span[0], span[1], span[0], span[2])
+            self.structure_panel.update_chords(self.chord_progression, span)
+
+    def show_project_name(self):
+        import os
+        name = os.path.basename(self.project.path) if self.project.path else None
+        self.setWindowTitle(f"Chord Progression Tool - {name}" if name else "Chord Progression Tool")
+
+    def on_highlight_requested(self, idx, posted):
+        telemetry.record("highlight", time.perf_counter() - posted)
+        self.structure_panel.highlight_card(idx)
+
+    def closeEvent(self, event):
+        self.is_playing = False
+        if self._audio_engine is not None:
+            self._audio_engine.close()
+        super().closeEvent(event)
+
     def keyPressEvent(self, event):
         # Space or Enter: Play/Stop toggle (when not in a text field)
         focus_widget = QApplication.focusWidget()
-        if event.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter):
+        # Ctrl+Shift+D: dump the recent debug events to stderr
+        if event.key() == Qt.Key_D and event.modifiers() == (Qt.ControlModifier | Qt.ShiftModifier):
+            applog.dump_ring()
+        # Ctrl+S / Ctrl+Shift+S: save the project (as); Ctrl+O: open one
+        elif event.key() == Qt.Key_S and event.modifiers() in (Qt.ControlModifier, Qt.ControlModifier | Qt.ShiftModifier):
+            self.save_project(save_as=bool(event.modifiers() & Qt.ShiftModifier))
+        elif event.key() == Qt.Key_O and event.modifiers() == Qt.ControlModifier:
+            self.settings_panel.open_project_btn.click()
+        # Ctrl+Z: undo; Ctrl+Shift+Z or Ctrl+Y: redo
+        elif event.key() == Qt.Key_Z and event.modifiers() == Qt.ControlModifier:
+            self.undo()
+        elif (event.key() == Qt.Key_Z and event.modifiers() == (Qt.ControlModifier | Qt.ShiftModifier)) or (event.key() == Qt.Key_Y and event.modifiers() == Qt.ControlModifier):
+            self.redo()
+        elif event.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter):
             if isinstance(focus_widget, QPushButton):
                 focus_widget.click()
             elif not self.is_playing:
@@ -1245,15 +1740,59 @@ class MainWindow(QWidget):
         elif event.key() == Qt.Key_Up:
             if focus_widget in getattr(self.structure_panel, "card_widgets", []):
                 self.chord_panel.btns[0].setFocus()
-            elif focus_widget in [self.settings_panel.play_btn, self.settings_panel.stop_btn, self.settings_panel.export_btn]:
+            elif focus_widget in [self.settings_panel.play_btn, self.settings_panel.stop_btn, self.settings_panel.export_btn, self.settings_panel.export_audio_btn, self.settings_panel.export_pack_btn]:
                 self.structure_panel.setFocus()
         else:
             super().keyPressEvent(event)
 
+def parse_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Chord Progression Tool")
+    parser.add_argument("--blocksize", type=int, default=None, help="audio block size in frames (default 512)")
+    parser.add_argument("--latency", default=None, help="output latency in seconds, or 'low'/'high' (default low)")
+    parser.add_argument("--lookahead", type=int, default=LOOKAHEAD_CHORDS, metavar="K", help=f"chords rendered ahead during playback (default {LOOKAHEAD_CHORDS})")
+    parser.add_argument("--render-process", action="store_true", help="render playback in a separate process, out of the GUI's way")
+    parser.add_argument("--ngram-index", default=None, metavar="PATH", help="n-gram index (built with ngram.py) for next-chord suggestions")
+    parser.add_argument("--cache-mb", type=float, default=None, help="memory cap for cached chord audio in MB (default 64)")
+    parser.add_argument("--log-level", default=applog.DEFAULT_LEVEL, type=str.upper, choices=applog.LEVELS, help="console log level (default INFO)")
+    parser.add_argument("--debug-ring", type=int, default=0, metavar="N", help="keep the last N debug events in memory; dump with Ctrl+Shift+D or SIGUSR1")
+    parser.add_argument("--profile-startup", action="store_true", help="print where startup time goes (imports, panels, first paint)")
+    # Leave anything we don't know about (e.g. Qt's own flags) to QApplication
+    args, qt_args = parser.parse_known_args(argv[1:])
+    audio_options = {}
+    if args.blocksize is not None:
+        audio_options["blocksize"] = args.blocksize
+    if args.latency is not None:
+        try:
+            audio_options["latency"] = float(args.latency)
+        except ValueError:
+            audio_options["latency"] = args.latency
+    if args.render_process:
+        audio_options["render_process"] = True
+    return args, audio_options, argv[:1] + qt_args
+
+class FirstPaintWatcher(QObject):
+    # Calls on_painted once, after the first paint event of the watched widget
+    def __init__(self, on_painted):
+        super().__init__()
+        self.on_painted = on_painted
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            QTimer.singleShot(0, self.on_painted)
+        return False
+
 if __name__ == "__main__":
-    app = QApplication([])
+    args, audio_options, qt_argv = parse_args(sys.argv)
+    applog.configure(args.log_level, args.debug_ring)
+    if args.cache_mb is not None:
+        from synth import chord_cache
+        chord_cache.resize(args.cache_mb)
+    with startup_profile.phase("QApplication"):
+        app = QApplication(qt_argv)
     # Set global font and stylesheet for professional, accessible look
-    from PyQt5.QtGui import QFont, QFontDatabase
+    from PyQt5.QtGui import QFontDatabase
     base_font = QFontDatabase.systemFont(QFontDatabase.GeneralFont)
     base_font.setFamily("Palatino" if QFont("Palatino").exactMatch() else "Georgia")
     base_font.setPointSizeF(base_font.pointSizeF() * app.devicePixelRatio())
@@ -1293,11 +1832,30 @@ if __name__ == "__main__":
             font-weight: bold;
         }
     """)
-    window = MainWindow()
+    with startup_profile.phase("MainWindow"):
+        window = MainWindow(audio_options)
+    window.lookahead = max(1, args.lookahead)
     # Remove setTabOrder for add_btn (no longer present)
     # window.setTabOrder(window.chord_panel.add_btn, window.settings_panel.play_btn)
     if hasattr(window.settings_panel, "play_btn") and hasattr(window.settings_panel, "stop_btn") and hasattr(window.settings_panel, "tempo_spin"):
         window.setTabOrder(window.settings_panel.play_btn, window.settings_panel.stop_btn)
         window.setTabOrder(window.settings_panel.stop_btn, window.settings_panel.tempo_spin)
+
+    def on_first_paint():
+        startup_profile.mark("first paint")
+        window.warm_up_audio()
+        if args.ngram_index:
+            window.load_ngram_index(args.ngram_index)
+
+    first_paint = FirstPaintWatcher(on_first_paint)
+    window.installEventFilter(first_paint)
     window.show()
+    startup_profile.mark("window shown")
+    if args.debug_ring:
+        applog.install_dump_signal()
+        # Python signal handlers only run between bytecodes, so wake the
+        # interpreter now and then while Qt's event loop has control
+        signal_timer = QTimer()
+        signal_timer.timeout.connect(lambda: None)
+        signal_timer.start(250)
     app.exec_()
@@ -0,0 +1,217 @@
+"""Markov-chain progression generator with one transition matrix per mode.
+
+Every mode in theory.MODES gets a 7x7 degree-to-degree transition matrix,
+built once at import from the mode's intervals: root motion by scale
+steps (falling fifths strongest, then steps and thirds), triads that are
+not major or minor (diminished, augmented) made rarer, and an extra pull
+to I from chords holding the leading tone.  Degrees a short scale doesn't
+have (theory plays them as the tonic) are never generated.
+
+generate() samples many progressions at once, one vectorised draw per
+chord position over all of them.  Constraints (a fixed first chord, a
+fixed ending such as V-I, a cap on how often a chord may repeat in a
+row) are exact rather than retried: the chain is conditioned on them by
+a backward pass over the positions, so every sample satisfies them and
+the rest of each progression keeps the chain's own probabilities.
+
+    python markov.py -n 100000 --length 8 --mode Dorian --start I --end V I -o generated.jsonl
+
+writes JSONL in the format batch_export.py and ngram.py read.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from progression import Progression
+from theory import DEFAULT_MODE, MODE_INTERVALS, MODES, ROMAN_CODES, ROMAN_NUMERALS
+
+DEGREES = len(ROMAN_NUMERALS)
+# Weight of moving the root up by 0-6 scale steps: repeat, step up, third
+# up, fourth up (fifth down), fifth up, sixth up (third down), step down
+ROOT_MOTION = (0.3, 2.0, 0.8, 3.0, 1.5, 1.8, 1.0)
+# Diminished, augmented or otherwise unstable triads
+UNSTABLE_WEIGHT = 0.35
+TONIC_WEIGHT = 1.5
+LEADING_TONE_WEIGHT = 2.0
+# Start distribution: weight of I against any other stable triad
+START_TONIC_WEIGHT = 4.0
+
+
+def degree_count(mode):
+    """How many of the seven degrees a mode has (theory maps the rest to I)."""
+    return min(len(MODE_INTERVALS.get(mode, MODE_INTERVALS[DEFAULT_MODE])), DEGREES)
+
+
+def _is_stable(intervals, degree):
+    n = len(intervals)
+    return (intervals[(degree + 4) % n] - intervals[degree]) % 12 == 7
+
+
+def _has_leading_tone(intervals, degree):
+    # Leading tone as root or third, as in V and vii°
+    n = len(intervals)
+    return 11 in (intervals[degree], intervals[(degree + 2) % n])
+
+
+def _mode_tables(intervals):
+    n = len(intervals)
+    usable = min(n, DEGREES)
+    weights = np.zeros((DEGREES, DEGREES))
+    for a in range(usable):
+        for b in range(usable):
+            # Motion in a shorter scale is mapped onto the seven-step weights
+            w = ROOT_MOTION[round((b - a) % n * DEGREES / n) % DEGREES]
+            if not _is_stable(intervals, b):
+                w *= UNSTABLE_WEIGHT
+            if b == 0:
+                w *= TONIC_WEIGHT * (LEADING_TONE_WEIGHT if _has_leading_tone(intervals, a) else 1.0)
+            weights[a, b] = w
+    # Rows for missing degrees only matter if a constraint asks for them
+    weights[usable:, 0] = 1.0
+    start = np.zeros(DEGREES)
+    start[:usable] = [1.0 if _is_stable(intervals, d) else UNSTABLE_WEIGHT for d in range(usable)]
+    start[0] = START_TONIC_WEIGHT
+    return weights / weights.sum(axis=1, keepdims=True), start / start.sum()
+
+
+TRANSITIONS = {}
+START = {}
+for _mode in MODES:
+    TRANSITIONS[_mode["label"]], START[_mode["label"]] = _mode_tables(MODE_INTERVALS[_mode["label"]])
+
+
+def transition_matrix(mode=DEFAULT_MODE):
+    """The (7, 7) row-stochastic degree transition matrix of a mode."""
+    return TRANSITIONS.get(mode, TRANSITIONS[DEFAULT_MODE])
+
+
+def _repeat_chain(P, start, max_repeat):
+    # States are (degree, run length so far); a degree can only follow
+    # itself while its run is shorter than max_repeat
+    R = max_repeat
+    A = np.zeros((DEGREES * R, DEGREES * R))
+    for s in range(DEGREES):
+        for r in range(R):
+            row = s * R + r
+            for t in range(DEGREES):
+                if t != s:
+                    A[row, t * R] = P[s, t]
+                elif r + 1 < R:
+                    A[row, s * R + r + 1] = P[s, s]
+    first = np.zeros(DEGREES * R)
+    first[::R] = start
+    return A, first
+
+
+def generate(count, length, mode=DEFAULT_MODE, start=None, end=(), max_repeat=None, rng=None):
+    """Sample ``count`` progressions of ``length`` chords; returns a (count, length) uint8 array of degree codes.
+
+    ``start`` is a numeral the progressions must open with, ``end`` a
+    sequence of numerals they must close with (e.g. ("V", "I")), and
+    ``max_repeat`` the most times one chord may sound in a row.  Raises
+    ValueError when no progression can satisfy the constraints.
+    """
+    if length < 1:
+        raise ValueError("length must be at least 1")
+    if max_repeat is not None and max_repeat < 1:
+        raise ValueError("max_repeat must be at least 1")
+    rng = rng if rng is not None else np.random.default_rng()
+    usable = degree_count(mode)
+
+    # Which degrees each position may hold
+    allowed = np.zeros((length, DEGREES))
+    allowed[:, :usable] = 1.0
+    fixed = [] if start is None else [(0, start)]
+    if len(end) > length:
+        raise ValueError(f"An ending of {len(end)} chords does not fit in {length}")
+    fixed += [(length - len(end) + i, roman) for i, roman in enumerate(end)]
+    for position, roman in fixed:
+        code = ROMAN_CODES[roman]
+        if code >= usable:
+            raise ValueError(f"{mode} has no {roman} chord")
+        allowed[position, np.arange(DEGREES) != code] = 0.0
+
+    P = transition_matrix(mode)
+    first = START.get(mode, START[DEFAULT_MODE])
+    R = 1
+    if max_repeat is not None and max_repeat < length:
+        P, first = _repeat_chain(P, first, max_repeat)
+        R = max_repeat
+        allowed = np.repeat(allowed, R, axis=1)
+
+    # Backward pass: beta[t][s] is proportional to the chance that a chain in
+    # state s at position t meets every later constraint
+    beta = np.empty_like(allowed)
+    beta[-1] = allowed[-1]
+    for t in range(length - 2, -1, -1):
+        b = allowed[t] * (P @ beta[t + 1])
+        peak = b.max()
+        beta[t] = b / peak if peak > 0 else b
+    first = first * beta[0]
+    if not first.any():
+        raise ValueError("No progression satisfies these constraints")
+
+    # Unnormalised cumulative rows; a draw is a count of entries <= u * total
+    first_cum = np.cumsum(first)
+    step_cum = np.cumsum(P[None, :, :] * beta[1:, None, :], axis=2)
+
+    states = np.empty((count, length), dtype=np.int64)
+    u = rng.random((count, length))
+    states[:, 0] = (first_cum[None, :] <= (u[:, :1] * first_cum[-1])).sum(axis=1)
+    for t in range(1, length):
+        cum = step_cum[t - 1][states[:, t - 1]]
+        states[:, t] = (cum <= u[:, t:t + 1] * cum[:, -1:]).sum(axis=1)
+    return (states // R).astype(np.uint8)
+
+
+def to_progression(codes):
+    """A Progression (no modifiers) from one row of generate()."""
+    roman = np.asarray(codes, dtype=np.uint8).tobytes()
+    blank = bytes(len(roman))
+    return Progression.from_codes(roman, blank, blank, blank)
+
+
+def write_jsonl(codes, f, mode=DEFAULT_MODE, key="C", tempo=100, prefix="markov"):
+    """Write generated progressions as batch_export.py JSONL, one per line."""
+    chords = [json.dumps({"roman": roman, "extension": None, "inversion": None, "voicing": None}, ensure_ascii=False) for roman in ROMAN_NUMERALS]
+    head = json.dumps({"key": key, "mode": mode, "tempo": tempo}, ensure_ascii=False)[:-1]
+    for i, row in enumerate(codes.tolist()):
+        f.write(f'{head}, "name": "{prefix}_{i:07d}", "chords": [{", ".join(chords[c] for c in row)}]}}\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate chord progressions from a per-mode Markov chain.")
+    parser.add_argument("-n", "--count", type=int, default=1000, help="progressions to generate (default 1000)")
+    parser.add_argument("--length", type=int, default=8, help="chords per progression (default 8)")
+    parser.add_argument("--mode", default=DEFAULT_MODE, choices=[m["label"] for m in MODES], help=f"mode (default {DEFAULT_MODE})")
+    parser.add_argument("--key", default="C", help="key written to each record (default C)")
+    parser.add_argument("--tempo", type=int, default=100, help="tempo written to each record (default 100)")
+    parser.add_argument("--start", default=None, choices=ROMAN_NUMERALS, help="first chord, e.g. I")
+    parser.add_argument("--end", nargs="+", default=(), choices=ROMAN_NUMERALS, metavar="NUMERAL", help="closing chords, e.g. V I")
+    parser.add_argument("--max-repeat", type=int, default=None, help="most times a chord may sound in a row")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file to write ('-' for stdout, the default)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        codes = generate(args.count, args.length, args.mode, args.start, args.end, args.max_repeat, np.random.default_rng(args.seed))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    if args.output == "-":
+        write_jsonl(codes, sys.stdout, args.mode, args.key, args.tempo)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            write_jsonl(codes, f, args.mode, args.key, args.tempo)
+    rate = args.count / elapsed if elapsed > 0 else 0.0
+    print(f"Generated {args.count} progressions in {elapsed:.3f}s ({rate:,.0f}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
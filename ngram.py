@@ -0,0 +1,270 @@
+"""N-gram index of chord degrees, for "what comes next" suggestions.
+
+A corpus of roman-numeral progressions is reduced to counts of which
+degree follows each context of up to ``max_context`` earlier degrees.
+Contexts are integer-coded, three bits per degree (degree code + 1, so
+contexts of different lengths never collide; the empty context is 0),
+and stored as one sorted uint32 array with a parallel array of
+follow-up counts, one row of seven per context.  A lookup is a binary
+search.
+
+The index is saved as one flat binary file (a small header, then the
+two arrays) and memory-mapped on load, so opening it costs no parsing
+and only the pages that queries touch are ever read.
+
+Queries back off: the longest tail of the progression that was seen at
+least ``min_count`` times in the corpus decides the ranking.
+
+    python ngram.py build corpus.jsonl more.csv -o corpus.ngram
+    python ngram.py query corpus.ngram I vi IV
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+
+import numpy as np
+
+from theory import ROMAN_NUMERALS
+
+DEGREES = len(ROMAN_NUMERALS)
+DEFAULT_CONTEXT = 4
+# Contexts are bincounted densely per length, 8**k * 7 bins
+MAX_CONTEXT = 6
+DEFAULT_MIN_COUNT = 3
+MAGIC = b"CHNGRAM1"
+# magic, max context, number of contexts, rows, tokens
+HEADER = struct.Struct("<8sIIQQ")
+
+# Leading numeral of a token such as "V7", "vii°" or "IV6"; case is ignored
+_NUMERAL = re.compile(r"\s*([ivIV]+)")
+_NUMERAL_DEGREES = {"i": 0, "ii": 1, "iii": 2, "iv": 3, "v": 4, "vi": 5, "vii": 6}
+_SEPARATORS = re.compile(r"[\s,;|\-]+")
+_degree_cache = {}
+
+
+def degree(token):
+    """Degree code (0-6) of a roman-numeral token, or None if it isn't one."""
+    try:
+        return _degree_cache[token]
+    except KeyError:
+        pass
+    match = _NUMERAL.match(token)
+    code = _NUMERAL_DEGREES.get(match.group(1).lower()) if match else None
+    if len(_degree_cache) < 65536:
+        _degree_cache[token] = code
+    return code
+
+
+def degree_runs(tokens):
+    """Split tokens into runs of degree codes; anything unrecognised ends a run."""
+    run = []
+    for token in tokens:
+        code = degree(token)
+        if code is None:
+            if run:
+                yield run
+            run = []
+        else:
+            run.append(code)
+    if run:
+        yield run
+
+
+def pack(context):
+    """Integer key of a sequence of degree codes, oldest first."""
+    key = 0
+    for code in context:
+        key = (key << 3) | (code + 1)
+    return key
+
+
+def _tokens_of(chords):
+    # JSONL rows hold either numeral strings or chord dicts as in batch_export
+    for chord in chords:
+        yield chord.get("roman", "") if isinstance(chord, dict) else str(chord)
+
+
+def read_corpus(path):
+    """Yield degree-code runs from a .jsonl, .csv or plain-text corpus, one row at a time.
+
+    JSONL rows are ``{"chords": [...]}`` or a bare list; CSV rows use a
+    "chords" or "progression" column if there is one, otherwise every
+    cell; text lines (and CSV cells) hold numerals separated by spaces,
+    commas, dashes or bars.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8", newline="") as f:
+        if ext in (".jsonl", ".json"):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                chords = row.get("chords", ()) if isinstance(row, dict) else row
+                yield from degree_runs(_tokens_of(chords))
+        elif ext == ".csv":
+            reader = csv.reader(f)
+            column = None
+            for i, cells in enumerate(reader):
+                if i == 0:
+                    names = [cell.strip().lower() for cell in cells]
+                    for name in ("chords", "progression"):
+                        if name in names:
+                            column = names.index(name)
+                    if column is not None or all(degree(cell) is None for cell in cells if cell.strip()):
+                        continue
+                text = cells[column] if column is not None and column < len(cells) else " ".join(cells)
+                yield from degree_runs(_SEPARATORS.split(text.strip()))
+        else:
+            for line in f:
+                yield from degree_runs(_SEPARATORS.split(line.strip()))
+
+
+class NgramIndex:
+    """Follow-up counts for every context of up to ``max_context`` degrees.
+
+    ``keys`` is sorted; ``counts[i]`` holds how often each of the seven
+    degrees followed context ``keys[i]``.  Both may be memory-mapped.
+    """
+
+    def __init__(self, keys, counts, max_context, rows=0, tokens=0):
+        self.keys = keys
+        self.counts = counts
+        self.max_context = max_context
+        self.rows = rows
+        self.tokens = tokens
+
+    @classmethod
+    def build(cls, runs, max_context=DEFAULT_CONTEXT):
+        """Count n-grams over an iterable of degree-code sequences."""
+        if not 0 <= max_context <= MAX_CONTEXT:
+            raise ValueError(f"max_context must be between 0 and {MAX_CONTEXT}")
+        flat = array("B")
+        lengths = array("q")
+        for run in runs:
+            flat.extend(run)
+            lengths.append(len(run))
+        tokens = np.frombuffer(flat, dtype=np.uint8).astype(np.uint32) + 1
+        lengths = np.frombuffer(lengths, dtype=np.int64)
+        # Position of every token within its own run
+        starts = np.zeros(len(lengths), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        offset = np.arange(len(tokens), dtype=np.int64) - np.repeat(starts, lengths)
+
+        all_keys, all_counts = [], []
+        for k in range(max_context + 1):
+            targets = np.flatnonzero(offset >= k)
+            key = np.zeros(len(targets), dtype=np.int64)
+            for back in range(k, 0, -1):
+                key <<= 3
+                key |= tokens[targets - back]
+            # One bin per (context, next degree); contexts of length k are < 8**k
+            bins = np.bincount(key * DEGREES + (tokens[targets] - 1), minlength=(8 ** k) * DEGREES)
+            rows = bins.reshape(-1, DEGREES)
+            seen = np.flatnonzero(rows.any(axis=1))
+            all_keys.append(seen)
+            all_counts.append(rows[seen])
+        keys = np.concatenate(all_keys)
+        order = np.argsort(keys, kind="stable")
+        counts = np.concatenate(all_counts)[order]
+        return cls(keys[order].astype(np.uint32), counts.astype(np.uint32), max_context, len(lengths), len(tokens))
+
+    @classmethod
+    def build_from_files(cls, paths, max_context=DEFAULT_CONTEXT):
+        def runs():
+            for path in paths:
+                yield from read_corpus(path)
+        return cls.build(runs(), max_context)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.max_context, len(self.keys), self.rows, self.tokens))
+            f.write(np.ascontiguousarray(self.keys, dtype="<u4").tobytes())
+            f.write(np.ascontiguousarray(self.counts, dtype="<u4").tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Open a saved index memory-mapped, without reading the arrays."""
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a chord n-gram index")
+        _, max_context, size, rows, tokens = HEADER.unpack(header)
+        if size == 0:
+            return cls(np.zeros(0, dtype=np.uint32), np.zeros((0, DEGREES), dtype=np.uint32), max_context, rows, tokens)
+        keys = np.memmap(path, dtype="<u4", mode="r", offset=HEADER.size, shape=(size,))
+        counts = np.memmap(path, dtype="<u4", mode="r", offset=HEADER.size + 4 * size, shape=(size, DEGREES))
+        return cls(keys, counts, max_context, rows, tokens)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, context):
+        """Follow-up counts of an exact context (degree codes, oldest first), or None if unseen."""
+        key = pack(context)
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.counts[i]
+        return None
+
+    def next_counts(self, tail, min_count=DEFAULT_MIN_COUNT):
+        """(context length used, counts) for the longest well-attested context ending the tail."""
+        tail = list(tail)[-self.max_context:] if self.max_context else []
+        for k in range(len(tail), -1, -1):
+            counts = self.lookup(tail[len(tail) - k:])
+            if counts is not None and (k == 0 or counts.sum() >= min_count):
+                return k, counts
+        return 0, np.zeros(DEGREES, dtype=np.uint32)
+
+    def suggest(self, tail, top=3, min_count=DEFAULT_MIN_COUNT):
+        """The ``top`` most likely next degrees as [(degree code, probability)], best first."""
+        _, counts = self.next_counts(tail, min_count)
+        total = int(counts.sum())
+        if not total:
+            return []
+        best = np.argsort(-counts.astype(np.int64), kind="stable")[:top]
+        return [(int(code), int(counts[code]) / total) for code in best if counts[code]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a chord n-gram index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="count n-grams in .jsonl/.csv/.txt corpora")
+    build.add_argument("corpus", nargs="+", help="corpus files")
+    build.add_argument("-o", "--output", required=True, help="index file to write")
+    build.add_argument("--context", type=int, default=DEFAULT_CONTEXT, help=f"longest context in chords (default {DEFAULT_CONTEXT}, max {MAX_CONTEXT})")
+    query = commands.add_parser("query", help="suggest what follows a progression")
+    query.add_argument("index", help="index file")
+    query.add_argument("chords", nargs="*", help="the progression so far, e.g. I vi IV")
+    query.add_argument("--top", type=int, default=3, help="suggestions to show (default 3)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = NgramIndex.build_from_files(args.corpus, args.context)
+        index.save(args.output)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{index.rows} sequences, {index.tokens} chords, {len(index)} contexts"
+            f" in {elapsed:.2f}s ({index.rows / elapsed:,.0f} sequences/s) -> {args.output}"
+        )
+        return 0
+    index = NgramIndex.load(args.index)
+    # An unrecognised chord breaks the context, so only the last run counts
+    runs = list(degree_runs(args.chords))
+    tail = runs[-1] if runs else []
+    used, _ = index.next_counts(tail)
+    for code, p in index.suggest(tail, args.top):
+        print(f"{ROMAN_NUMERALS[code]:5s} {p:6.1%}")
+    print(f"(context of {used} chord{'s' if used != 1 else ''})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
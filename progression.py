@@ -0,0 +1,345 @@
+"""Compact chord progression storage.
+
+A Progression keeps its chords as small integer codes in four parallel
+``array('B')`` columns (roman numeral, extension, inversion, voicing), so a
+chord costs four bytes instead of a dict of strings.  The codes are those
+of the theory module, and playback and export resolve them through
+``theory.chord_table()`` without looking at a string.
+
+UI code that wants a chord at a time gets a ChordView, a slotted proxy that
+reads and writes the columns and also answers ``chord["roman"]`` and
+``chord.get("extension")`` like the dicts it replaces.  Bulk operations
+(extend, delete, shuffle, slice, transpose) work on whole columns.
+
+records() packs a progression as four bytes per chord, the layout of
+project files; ChordKeys is a snapshot in that form that decodes a
+chord's names only when it is looked at, which is how the structure
+panel shows very long progressions.
+"""
+from array import array
+
+from theory import (
+    CODE_SHAPE,
+    DEFAULT_MODE,
+    EXTENSION_CODES,
+    INVERSION_CODES,
+    ROMAN_CODES,
+    ROMAN_NUMERALS,
+    VOICING_CODES,
+    chord_notes,
+    chord_table,
+)
+
+FIELDS = ("roman", "extension", "inversion", "voicing")
+_CODES = (ROMAN_CODES, EXTENSION_CODES, INVERSION_CODES, VOICING_CODES)
+_NAMES = tuple(tuple(codes) for codes in _CODES)
+RECORD_BYTES = len(FIELDS)
+_VALID_CODES = tuple(bytes(range(size)) for size in CODE_SHAPE)
+# Chunk size of the memory comparisons in ChordKeys.diff_span
+_DIFF_CHUNK = 1 << 16
+
+
+def _common_prefix(a, b):
+    """Length in bytes of the common prefix of two bytes objects."""
+    limit = min(len(a), len(b))
+    start = 0
+    while start < limit:
+        end = min(start + _DIFF_CHUNK, limit)
+        if a[start:end] != b[start:end]:
+            # a[:lo] is equal and the first difference lies before hi
+            lo, hi = start, end
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[lo:mid] == b[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        start = end
+    return limit
+
+
+def _common_suffix(a, b, limit):
+    """Length in bytes (at most limit) of the common suffix of two bytes objects."""
+    la, lb = len(a), len(b)
+    done = 0
+    while done < limit:
+        size = min(_DIFF_CHUNK, limit - done)
+        if a[la - done - size:la - done] != b[lb - done - size:lb - done]:
+            lo, hi = done, done + size
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[la - mid:la - lo] == b[lb - mid:lb - lo]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        done += size
+    return limit
+
+
+class ChordKeys:
+    """Sequence of (roman, extension, inversion, voicing) tuples over packed records.
+
+    Holds a snapshot of a progression's records() and decodes a tuple only
+    when that chord is indexed, so a million chords cost one 4 MB copy
+    instead of a million tuples.  Slices are ChordKeys too.  The owner of
+    a snapshot can bring it up to date after an edit with splice(), which
+    costs the size of the edit rather than another copy.
+    """
+
+    __slots__ = ("records",)
+
+    def __init__(self, records=b""):
+        self.records = bytearray(records)
+
+    def splice(self, start, stop, records):
+        """Replace chords [start, stop) with packed ``records``, in place."""
+        self.records[start * RECORD_BYTES:stop * RECORD_BYTES] = records
+
+    def __len__(self):
+        return len(self.records) // RECORD_BYTES
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return ChordKeys(self.records[start * RECORD_BYTES:max(start, stop) * RECORD_BYTES])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chord index out of range")
+        r, e, i, v = self.records[index * RECORD_BYTES:(index + 1) * RECORD_BYTES]
+        return (_NAMES[0][r], _NAMES[1][e], _NAMES[2][i], _NAMES[3][v])
+
+    def __iter__(self):
+        names = _NAMES
+        records = self.records
+        for offset in range(0, len(records), RECORD_BYTES):
+            r, e, i, v = records[offset:offset + RECORD_BYTES]
+            yield (names[0][r], names[1][e], names[2][i], names[3][v])
+
+    def __add__(self, other):
+        if isinstance(other, ChordKeys):
+            return ChordKeys(self.records + other.records)
+        return list(self) + list(other)
+
+    def __eq__(self, other):
+        if isinstance(other, ChordKeys):
+            return self.records == other.records
+        return list(self) == other
+
+    def __repr__(self):
+        return f"ChordKeys({len(self)} chords)"
+
+    def diff_span(self, other):
+        """(start, old_end, new_end) of the chords that differ from self to other, as structure_view.diff_span."""
+        prefix = _common_prefix(self.records, other.records) // RECORD_BYTES
+        limit = (min(len(self.records), len(other.records)) - prefix * RECORD_BYTES)
+        suffix = _common_suffix(self.records, other.records, limit) // RECORD_BYTES
+        return prefix, len(self) - suffix, len(other) - suffix
+
+
+class ChordView:
+    """One chord of a Progression, read and written through its columns."""
+
+    __slots__ = ("progression", "index")
+
+    def __init__(self, progression, index):
+        self.progression = progression
+        self.index = index
+
+    def __getitem__(self, field):
+        column = FIELDS.index(field)
+        return _NAMES[column][self.progression.columns[column][self.index]]
+
+    def __setitem__(self, field, value):
+        column = FIELDS.index(field)
+        self.progression.columns[column][self.index] = _CODES[column][value]
+
+    def get(self, field, default=None):
+        if field not in FIELDS:
+            return default
+        value = self[field]
+        return default if value is None else value
+
+    @property
+    def roman(self):
+        return ROMAN_NUMERALS[self.progression.roman[self.index]]
+
+    @property
+    def key(self):
+        """(roman, extension, inversion, voicing) strings, as used for diffing."""
+        return tuple(_NAMES[c][self.progression.columns[c][self.index]] for c in range(4))
+
+    def as_dict(self):
+        return dict(zip(FIELDS, self.key))
+
+    def __repr__(self):
+        return f"ChordView({self.index}, {self.as_dict()!r})"
+
+
+class Progression:
+    """Chords stored as parallel columns of one-byte codes."""
+
+    __slots__ = ("roman", "extension", "inversion", "voicing")
+
+    def __init__(self, chords=()):
+        self.roman = array("B")
+        self.extension = array("B")
+        self.inversion = array("B")
+        self.voicing = array("B")
+        self.extend(chords)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from packed records (see records()); any buffer, e.g. a memory-mapped file."""
+        data = records if isinstance(records, bytes) else bytes(records)
+        if len(data) % RECORD_BYTES:
+            raise ValueError(f"Record data must be a multiple of {RECORD_BYTES} bytes")
+        prog = cls()
+        # Extended slices of bytes copy out in C, one column at a time
+        prog.roman, prog.extension, prog.inversion, prog.voicing = (
+            array("B", data[field::RECORD_BYTES]) for field in range(RECORD_BYTES)
+        )
+        # Deleting every valid code must leave nothing behind
+        for column, valid in zip(prog.columns, _VALID_CODES):
+            if column.tobytes().translate(None, valid):
+                raise ValueError("Record data holds an unknown chord code")
+        return prog
+
+    @classmethod
+    def from_codes(cls, roman, extension, inversion, voicing):
+        """Build from four equal-length sequences of codes, without copying per chord."""
+        prog = cls()
+        prog.roman = array("B", roman)
+        prog.extension = array("B", extension)
+        prog.inversion = array("B", inversion)
+        prog.voicing = array("B", voicing)
+        if not len(prog.roman) == len(prog.extension) == len(prog.inversion) == len(prog.voicing):
+            raise ValueError("Code columns must all have the same length")
+        return prog
+
+    @property
+    def columns(self):
+        return (self.roman, self.extension, self.inversion, self.voicing)
+
+    def __len__(self):
+        return len(self.roman)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Progression.from_codes(*(column[index] for column in self.columns))
+        if index < 0:
+            index += len(self.roman)
+        if not 0 <= index < len(self.roman):
+            raise IndexError("progression index out of range")
+        return ChordView(self, index)
+
+    def __delitem__(self, index):
+        for column in self.columns:
+            del column[index]
+
+    def __iter__(self):
+        return (ChordView(self, i) for i in range(len(self.roman)))
+
+    def __eq__(self, other):
+        return isinstance(other, Progression) and self.columns == other.columns
+
+    def __repr__(self):
+        return f"Progression({[view.as_dict() for view in self]!r})"
+
+    def append(self, roman, extension=None, inversion=None, voicing=None):
+        self.roman.append(ROMAN_CODES[roman])
+        self.extension.append(EXTENSION_CODES[extension])
+        self.inversion.append(INVERSION_CODES[inversion])
+        self.voicing.append(VOICING_CODES[voicing])
+
+    def extend(self, chords):
+        """Append chords given as dicts, ChordViews, or a whole Progression."""
+        if isinstance(chords, Progression):
+            for column, other in zip(self.columns, chords.columns):
+                column.extend(other)
+            return
+        for chord in chords:
+            self.append(chord["roman"], chord.get("extension"), chord.get("inversion"), chord.get("voicing"))
+
+    def pop(self, index=-1):
+        chord = self[index].as_dict()
+        del self[index]
+        return chord
+
+    def clear(self):
+        del self[:]
+
+    def copy(self):
+        return self[:]
+
+    def set_modifiers(self, index, extension=None, inversion=None, voicing=None):
+        self.extension[index] = EXTENSION_CODES[extension]
+        self.inversion[index] = INVERSION_CODES[inversion]
+        self.voicing[index] = VOICING_CODES[voicing]
+
+    def shuffle(self, rng=None):
+        """Shuffle chords in place: one NumPy permutation applied to every column."""
+        import numpy as np
+        self.permute((rng or np.random.default_rng()).permutation(len(self.roman)))
+
+    def permute(self, order):
+        """Reorder chords in place so that chord i becomes the old chord ``order[i]``."""
+        import numpy as np
+        self.roman, self.extension, self.inversion, self.voicing = (
+            array("B", np.frombuffer(column, dtype=np.uint8)[order].tobytes()) for column in self.columns
+        )
+
+    def splice(self, start, stop, records):
+        """Replace chords [start, stop) with packed records (see records())."""
+        data = records if isinstance(records, bytes) else bytes(records)
+        for field, column in enumerate(self.columns):
+            column[start:stop] = array("B", data[field::RECORD_BYTES])
+
+    def transpose(self, steps):
+        """Move every chord ``steps`` scale degrees up (negative: down), keeping modifiers."""
+        size = CODE_SHAPE[0]
+        table = bytes((i + steps) % size if i < size else i for i in range(256))
+        self.roman = array("B", self.roman.tobytes().translate(table))
+
+    def codes(self):
+        """Packed chord codes (see theory.chord_code), one per chord."""
+        _, e, i, v = CODE_SHAPE
+        return [((r * e + x) * i + y) * v + z for r, x, y, z in zip(*self.columns)]
+
+    def chords(self, key="C", mode=DEFAULT_MODE, tuning=None):
+        """Resolved theory.Chord of every chord, straight from the code table."""
+        table = chord_table(key, mode, tuning)
+        return [table[code] for code in self.codes()]
+
+    def notes(self, key="C", mode=DEFAULT_MODE):
+        """MIDI-number tuple of every chord; no frequencies are resolved."""
+        table = chord_notes(key, mode)
+        return [table[code] for code in self.codes()]
+
+    def keys(self):
+        """(roman, extension, inversion, voicing) string tuples, for the UI diff."""
+        return list(zip(*(map(names.__getitem__, column) for names, column in zip(_NAMES, self.columns))))
+
+    def records(self, start=0, stop=None):
+        """Chords [start, stop) packed as four code bytes each (roman, extension, inversion, voicing)."""
+        start, stop, _ = slice(start, stop).indices(len(self.roman))
+        stop = max(start, stop)
+        packed = bytearray((stop - start) * RECORD_BYTES)
+        for field, column in enumerate(self.columns):
+            packed[field::RECORD_BYTES] = column if (start, stop) == (0, len(column)) else column[start:stop]
+        return bytes(packed)
+
+    def key_view(self):
+        """ChordKeys snapshot of the chords, decoded lazily."""
+        return ChordKeys(self.records())
+
+    def to_dicts(self):
+        return [dict(zip(FIELDS, key)) for key in self.keys()]
+
+    @property
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in self.columns)
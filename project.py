@@ -0,0 +1,142 @@
+"""Project files: a session's progression, tempo, key, mode and waveform.
+
+A project file is a fixed 128-byte header followed by the chords as
+integer-coded records, four bytes each (roman, extension, inversion,
+voicing codes, as in progression.Progression.records()):
+
+    magic "CHPROJ01", format version, tempo, chord count,
+    key, waveform and mode label (UTF-8, NUL-padded), then the records
+
+Opening memory-maps the file and copies the record section straight into
+the progression's code columns; no per-chord Python objects are created,
+and the structure panel decodes only the rows it paints.  A Project
+remembers the records it last read or wrote, so save() rewrites just the
+header and the 64 KiB blocks of records that changed, appends new chords
+and truncates removed ones.
+
+An optional JSON sidecar ("<project>.json") holds the same session in
+readable form; it is written on request and never read back.
+"""
+import json
+import mmap
+import os
+import struct
+
+from progression import RECORD_BYTES, Progression
+from theory import DEFAULT_MODE
+
+MAGIC = b"CHPROJ01"
+VERSION = 1
+HEADER_BYTES = 128
+# magic, version, reserved, tempo, chord count, key, waveform, mode
+HEADER = struct.Struct("<8sHHIQ8s16s48s")
+SAVE_BLOCK = 1 << 16
+PROJECT_EXT = ".chordproj"
+
+
+def _text(field):
+    return field.rstrip(b"\0").decode("utf-8")
+
+
+class Project:
+    """A session as stored in one project file.
+
+    ``progression`` is usually MainWindow.chord_progression itself, so the
+    project always saves what the window shows.
+    """
+
+    def __init__(self, progression=None, tempo=100, key="C", mode=DEFAULT_MODE, waveform="sine"):
+        self.progression = progression if progression is not None else Progression()
+        self.tempo = tempo
+        self.key = key
+        self.mode = mode
+        self.waveform = waveform
+        self.path = None
+        # Records as they are in the file at self.path, for dirty-block saves
+        self._on_disk = None
+
+    @classmethod
+    def open(cls, path, progression=None):
+        """Read a project file; its chords replace those of ``progression`` if one is given."""
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER_BYTES:
+                raise ValueError(f"{path} is not a chord project file")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, _, tempo, count, key, waveform, mode = HEADER.unpack_from(mapped)
+                if magic != MAGIC:
+                    raise ValueError(f"{path} is not a chord project file")
+                if version > VERSION:
+                    raise ValueError(f"{path} needs a newer version of this program (format {version})")
+                end = HEADER_BYTES + count * RECORD_BYTES
+                if end > size:
+                    raise ValueError(f"{path} is truncated: {count} chords declared, {(size - HEADER_BYTES) // RECORD_BYTES} present")
+                records = mapped[HEADER_BYTES:end]
+        loaded = Progression.from_records(records)
+        if progression is not None:
+            progression.clear()
+            progression.extend(loaded)
+            loaded = progression
+        project = cls(loaded, tempo, _text(key), _text(mode), _text(waveform))
+        project.path = path
+        project._on_disk = records
+        return project
+
+    def header(self):
+        return HEADER.pack(
+            MAGIC, VERSION, 0, self.tempo, len(self.progression),
+            self.key.encode("utf-8"), self.waveform.encode("utf-8"), self.mode.encode("utf-8"),
+        ).ljust(HEADER_BYTES, b"\0")
+
+    def save(self, path=None, sidecar=False):
+        """Write the project to ``path`` (default: where it was opened or last saved).
+
+        Saving again to the same file writes only the header and the
+        blocks of records that differ from the file.  Returns the number
+        of bytes written.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the project to")
+        records = self.progression.records()
+        header = self.header()
+        if path != self.path or self._on_disk is None or not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(header)
+                f.write(records)
+            written = len(header) + len(records)
+        else:
+            written = self._save_dirty(path, header, records)
+        self.path = path
+        self._on_disk = records
+        if sidecar:
+            self.save_sidecar(path + ".json")
+        return written
+
+    def _save_dirty(self, path, header, records):
+        old = self._on_disk
+        written = len(header)
+        with open(path, "r+b") as f:
+            f.write(header)
+            common = min(len(old), len(records))
+            for start in range(0, common, SAVE_BLOCK):
+                end = min(start + SAVE_BLOCK, common)
+                if old[start:end] != records[start:end]:
+                    f.seek(HEADER_BYTES + start)
+                    f.write(records[start:end])
+                    written += end - start
+            if len(records) > common:
+                f.seek(HEADER_BYTES + common)
+                f.write(records[common:])
+                written += len(records) - common
+            f.truncate(HEADER_BYTES + len(records))
+        return written
+
+    def save_sidecar(self, path):
+        """Write the session as readable JSON, in the batch_export.py record format."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"key": self.key, "mode": self.mode, "tempo": self.tempo, "waveform": self.waveform,
+                 "chords": self.progression.to_dicts()},
+                f, ensure_ascii=False, indent=1,
+            )
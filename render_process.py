@@ -0,0 +1,408 @@
+"""Optional render process: playback outside the GUI process.
+
+Everything playback does in the GUI process (rendering chords, and the
+audio callback itself) needs the GIL, so heavy UI work such as
+StructurePanel rebuilding every card can hold it up long enough to be
+heard.  With ``python main.py --render-process`` a child process does all
+of it instead, under its own GIL:
+
+- its main loop runs a ChordScheduler fed by the usual LookaheadRenderer
+  and writes finished audio into a SharedRing (the producer);
+- its output stream's callback copies blocks straight from the ring into
+  the device buffer (the consumer) and mixes in previews.
+
+The GUI process creates the ring and talks to the child over two queues.
+Commands (play, settings, preview, stop, close) go down.  Onsets, each
+reported once its first frame has actually been handed to the device,
+come back to drive the highlight, along with batches of telemetry for
+the stats overlay.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from audio import DEFAULT_BLOCKSIZE, DEFAULT_LATENCY, ChordScheduler, count_status
+from lookahead import DEFAULT_DEPTH, LookaheadRenderer
+from shm_ring import SharedRing
+from synth import DEFAULT_FS, WAVEFORMS, wavetable
+from telemetry import COUNTERS, telemetry
+from timeline import OnsetLog
+
+# Ring size in blocks; it is also how far rendering runs ahead of the device
+DEFAULT_RING_BLOCKS = 8
+# How long start() waits for the child to open its stream
+START_TIMEOUT = 15.0
+# How often the child sends its telemetry to the GUI process
+TELEMETRY_INTERVAL = 0.5
+
+
+class RingOutput:
+    """The child's output stream, fed from the ring by its callback.
+
+    The callback never blocks: onsets and the end of playback reach it
+    through deques and plain attributes set by the render loop, and what
+    it has to report goes into the ``heard`` deque for that loop to send.
+    """
+
+    def __init__(self, ring, fs, blocksize, latency):
+        self.ring = ring
+        self.fs = fs
+        self.blocksize = blocksize
+        self.latency = latency
+        # Previews only; chords come through the ring
+        self.previews = ChordScheduler(fs)
+        # (play_id, index, ideal frame, actual frame) not yet handed to the device
+        self.onsets = deque()
+        self.heard = deque()
+        self.play_id = None
+        self.done_frame = None
+        self.playing = False
+        self._origin = None
+        self._behind = 0
+        # Set by the render loop, done by the callback (the ring's only reader)
+        self.discard_pending = False
+        self._stream = None
+
+    def start(self):
+        import sounddevice as sd
+        self._stream = sd.OutputStream(
+            samplerate=self.fs,
+            blocksize=self.blocksize,
+            latency=self.latency,
+            channels=1,
+            dtype="float32",
+            callback=self._callback,
+        )
+        self._stream.start()
+        return {"block_ms": self.blocksize / self.fs * 1e3, "latency_ms": round(self._stream.latency * 1e3, 2)}
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def begin(self, play_id):
+        self.play_id = play_id
+        self.done_frame = None
+        self.onsets.clear()
+        self._origin = None
+        self._behind = 0
+        # The ring only holds silence now; skip it so the first chord is heard sooner
+        self.discard_pending = True
+        self.playing = True
+
+    def stop(self):
+        self.playing = False
+        self.onsets.clear()
+        self.previews.stop()
+        # Whatever was already rendered would otherwise still play
+        self.discard_pending = True
+
+    def _callback(self, outdata, frames, time_info, status):
+        start = time.perf_counter()
+        count_status(status, time_info)
+        ring = self.ring
+        if self.discard_pending:
+            ring.discard()
+            self._behind = 0
+            self.discard_pending = False
+        if self._behind:
+            # Drop what should already have played, so chords stay on the device clock
+            self._behind -= ring.skip(self._behind)
+        out = outdata[:, 0]
+        first = ring.read
+        got = ring.read_into(out)
+        if got < frames and self.playing and self._origin is not None:
+            # The render loop fell behind: the rest of this block is silence
+            telemetry.count("underruns")
+            self._behind += frames - got
+        self.previews.mix_preview(out)
+        out_time = getattr(time_info, "outputBufferDacTime", None) or None
+        onsets = self.onsets
+        while onsets and onsets[0][3] < first + frames:
+            self._heard(*onsets.popleft(), first, out_time)
+        if self.done_frame is not None and first + frames >= self.done_frame:
+            self.heard.append(("done", self.play_id))
+            self.done_frame = None
+            self.playing = False
+        telemetry.record("callback", time.perf_counter() - start)
+        telemetry.count("callbacks")
+
+    def _heard(self, play_id, index, ideal, actual, block_first, out_time):
+        # Stream time at which frame ``actual`` reaches the speaker (or this
+        # block's start, for an onset skipped after an underrun)
+        offset = max(actual - block_first, 0)
+        when = (out_time if out_time is not None else block_first / self.fs) + offset / self.fs
+        if self._origin is None:
+            self._origin = (ideal, when)
+        origin_frame, origin_time = self._origin
+        self.heard.append(("onset", play_id, index, (ideal - origin_frame) / self.fs, when - origin_time))
+
+
+class RenderServer:
+    """The child's main loop: keeps the ring full of scheduler output."""
+
+    def __init__(self, ring, output, fs, blocksize, lookahead, events):
+        self.ring = ring
+        self.output = output
+        self.fs = fs
+        self.blocksize = blocksize
+        self.lookahead = lookahead
+        self.events = events
+        self.scheduler = ChordScheduler(fs)
+        self.settings = None
+        self.renderer = None
+        self.play_id = None
+        self.codes = ()
+        self.index = 0
+        self.previous = None
+        self.pending = False
+
+    def handle(self, command):
+        """Apply one command from the GUI process; returns False on close."""
+        kind = command[0]
+        if kind == "play":
+            _, play_id, codes, settings = command
+            self.stop()
+            self.play_id, self.codes, self.settings = play_id, codes, settings
+            self.index, self.previous = 0, None
+            self.scheduler.set_tempo(settings.tempo)
+            self.scheduler.restart_timeline()
+            self.renderer = LookaheadRenderer(codes, lambda: self.settings, self.fs, self.lookahead)
+            self.renderer.start()
+            self.output.begin(play_id)
+        elif kind == "settings":
+            # Takes effect from the next chord handed to the scheduler
+            self.settings = command[1]
+            self.scheduler.set_tempo(self.settings.tempo)
+        elif kind == "preview":
+            self.output.previews.preview(command[1])
+        elif kind == "stop":
+            self.stop()
+            self.output.stop()
+        elif kind == "close":
+            self.stop()
+            return False
+        return True
+
+    def stop(self):
+        if self.renderer is not None:
+            self.renderer.close()
+            self.renderer = None
+        self.scheduler.stop()
+        self.pending = False
+
+    def feed(self):
+        """Give the scheduler the next chord once its onset falls within the next block."""
+        if self.renderer is None or self.pending:
+            return
+        if self.index >= len(self.codes):
+            if not self.scheduler.busy:
+                self.output.done_frame = self.scheduler.clock
+                self.renderer.close()
+                self.renderer = None
+            return
+        if self.scheduler.seconds_until_next_onset() * self.fs > self.blocksize:
+            return
+        item = self.renderer.get()
+        position = self.scheduler.grid_position()
+        if self.renderer.is_stale(item, position):
+            self.renderer.restart(item, position, self.previous)
+            item = self.renderer.get()
+        self.pending = True
+        self.scheduler.schedule(item.audio, partial(self.started, self.play_id, self.index))
+        self.previous = item
+        self.index += 1
+
+    def started(self, play_id, index):
+        # Called from inside scheduler.fill(), as the chord is written to the ring
+        self.pending = False
+        ideal, actual = self.scheduler.last_onset
+        self.output.onsets.append((play_id, index, ideal, actual))
+
+    def send_telemetry(self):
+        # Onsets are recorded on the GUI side when they are heard, not when written here
+        series = {name: list(values) for name, values in telemetry.series.items() if values and name != "onset"}
+        counters = {name: n for name, n in telemetry.counters.items() if n}
+        telemetry.reset()
+        if series or counters:
+            self.events.put(("telemetry", series, counters))
+
+    def run(self, commands):
+        period = self.blocksize / self.fs
+        next_telemetry = time.monotonic() + TELEMETRY_INTERVAL
+        heard = self.output.heard
+        while True:
+            try:
+                while True:
+                    if not self.handle(commands.get_nowait()):
+                        return
+            except queue.Empty:
+                pass
+            # The scheduler's clock is the ring's write position; nothing is
+            # written while a discard is pending, or it would be thrown away too
+            while self.ring.free() >= self.blocksize and not self.output.discard_pending:
+                self.feed()
+                view = self.ring.write_view(self.blocksize)
+                self.scheduler.fill(view)
+                self.ring.commit(len(view))
+            while heard:
+                self.events.put(heard.popleft())
+            if time.monotonic() >= next_telemetry:
+                self.send_telemetry()
+                next_telemetry += TELEMETRY_INTERVAL
+            time.sleep(period / 2)
+
+
+def serve(ring_name, fs, blocksize, latency, lookahead, commands, events):
+    """Entry point of the render process."""
+    ring = SharedRing.attach(ring_name)
+    output = RingOutput(ring, fs, blocksize, latency)
+    try:
+        # Build the tables now rather than on the first chord of the first Play
+        for waveform in WAVEFORMS:
+            wavetable(waveform)
+        try:
+            info = output.start()
+        except Exception as e:
+            events.put(("error", f"{type(e).__name__}: {e}"))
+            return
+        events.put(("ready", info))
+        RenderServer(ring, output, fs, blocksize, lookahead, events).run(commands)
+    finally:
+        output.close()
+        ring.close()
+
+
+class RenderProcessEngine:
+    """Stands in for AudioEngine when playback runs in a render process.
+
+    Playback is driven with play() and update_settings() instead of
+    schedule(); previews and stop work the same.
+    """
+
+    # The caller does not render or schedule chords itself
+    render_in_process = False
+
+    def __init__(self, fs=DEFAULT_FS, blocksize=DEFAULT_BLOCKSIZE, latency=DEFAULT_LATENCY,
+                 ring_blocks=DEFAULT_RING_BLOCKS, lookahead=DEFAULT_DEPTH):
+        self.fs = fs
+        self.blocksize = blocksize
+        self.latency = latency
+        self.ring_blocks = ring_blocks
+        self.lookahead = lookahead
+        self.ring = None
+        self._process = None
+        self._commands = None
+        self._events = None
+        self._ready = threading.Event()
+        self._error = None
+        self._start_lock = threading.Lock()
+        self._onset_log = OnsetLog()
+        self._on_start = None
+        self._playing = False
+        # Events from the child carry the id of the play() they belong to
+        self._play_id = 0
+
+    def start(self):
+        """Start the render process once and wait until its stream is open."""
+        with self._start_lock:
+            if self._process is None:
+                self._spawn()
+        if not self._ready.wait(START_TIMEOUT):
+            raise RuntimeError("Render process did not start")
+        if self._error is not None:
+            raise RuntimeError(self._error)
+
+    def _spawn(self):
+        # Spawned rather than forked: this process has Qt and its own threads running
+        ctx = multiprocessing.get_context("spawn")
+        self.ring = SharedRing(self.ring_blocks * self.blocksize)
+        self._commands = ctx.Queue()
+        self._events = ctx.Queue()
+        self._process = ctx.Process(
+            target=serve,
+            args=(self.ring.name, self.fs, self.blocksize, self.latency, self.lookahead, self._commands, self._events),
+            name="chord-render",
+            daemon=True,
+        )
+        self._process.start()
+        threading.Thread(target=self._listen, args=(self._events,), daemon=True).start()
+
+    def close(self):
+        if self._process is not None:
+            self._commands.put(("close",))
+            self._process.join(2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._events.put(None)
+            self.ring.close()
+            self._process = self.ring = None
+
+    def _listen(self, events):
+        # Runs in this process: relays what the child reports
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            kind = event[0]
+            if kind == "ready":
+                telemetry.info.update(event[1])
+                self._ready.set()
+            elif kind == "error":
+                self._error = event[1]
+                self._ready.set()
+            elif kind == "telemetry":
+                for name, values in event[1].items():
+                    for value in values:
+                        telemetry.record(name, value)
+                for name, n in event[2].items():
+                    if name in COUNTERS:
+                        telemetry.count(name, n)
+            elif event[1] != self._play_id:
+                continue
+            elif kind == "onset":
+                _, _, index, ideal, actual = event
+                self._onset_log.record(ideal, actual)
+                if self._on_start is not None:
+                    self._on_start(index)
+            elif kind == "done":
+                self._playing = False
+
+    def play(self, codes, settings, on_start=None):
+        """Play packed chord codes; on_start(index) is called as each chord reaches the device."""
+        self.start()
+        self._play_id += 1
+        self._on_start = on_start
+        self._playing = True
+        self._commands.put(("play", self._play_id, list(codes), settings))
+
+    def update_settings(self, settings):
+        """New key, mode, tempo, waveform and tuning (lookahead.Settings), from the next chord on."""
+        self._commands.put(("settings", settings))
+
+    def set_tempo(self, bpm):
+        # The tempo reaches the child with the other settings, via update_settings()
+        pass
+
+    def preview(self, audio):
+        self.start()
+        self._commands.put(("preview", audio))
+
+    def stop(self):
+        self._play_id += 1
+        self._playing = False
+        if self._process is not None:
+            self._commands.put(("stop",))
+
+    @property
+    def onset_log(self):
+        return self._onset_log
+
+    @property
+    def busy(self):
+        return self._playing
@@ -0,0 +1,138 @@
+"""Lock-free single-producer/single-consumer ring of float32 samples in shared memory.
+
+One process writes audio into the ring (the render process) and another
+reads it (the audio callback).  The shared block starts with two 64-bit
+frame counters on separate cache lines, followed by the samples:
+``written`` is only ever stored by the producer and ``read`` only by the
+consumer.  Both count frames since the ring was created and never wrap,
+so neither side takes a lock: the fill level is their difference, and a
+sample's slot is its frame number modulo the capacity (a power of two).
+
+Each side stores its samples before publishing its counter, so the other
+never sees a counter ahead of the data.  Python offers no memory barriers;
+this relies on aligned 8-byte stores being atomic and kept in program
+order, which holds on x86.
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Counters at offsets 0 and 64, capacity at 8; samples start at 128
+HEADER_BYTES = 128
+_WRITTEN = 0
+_CAPACITY = 1
+_READ = 8
+
+
+class SharedRing:
+    """A float32 SPSC ring in a multiprocessing.shared_memory block.
+
+    ``SharedRing(capacity)`` creates a new block (capacity in frames,
+    rounded up to a power of two); ``SharedRing.attach(name)`` opens an
+    existing one from another process.
+    """
+
+    def __init__(self, capacity=None, name=None):
+        if name is None:
+            capacity = 1 << max(0, int(capacity) - 1).bit_length()
+            self._shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + 4 * capacity)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._counters = np.ndarray((HEADER_BYTES // 8,), dtype=np.uint64, buffer=self._shm.buf)
+        if name is None:
+            self._counters[:] = 0
+            self._counters[_CAPACITY] = capacity
+        self.capacity = int(self._counters[_CAPACITY])
+        self._mask = self.capacity - 1
+        self._samples = np.ndarray((self.capacity,), dtype=np.float32, buffer=self._shm.buf, offset=HEADER_BYTES)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(name=name)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def written(self):
+        """Frames written since the ring was created."""
+        return int(self._counters[_WRITTEN])
+
+    @property
+    def read(self):
+        """Frames read (or discarded) since the ring was created."""
+        return int(self._counters[_READ])
+
+    def available(self):
+        """Frames waiting to be read."""
+        return int(self._counters[_WRITTEN]) - int(self._counters[_READ])
+
+    def free(self):
+        """Frames that can be written without overwriting unread ones."""
+        return self.capacity - self.available()
+
+    # Producer side
+
+    def write_view(self, frames):
+        """Writable view of up to ``frames`` free slots, contiguous (it stops at the end of the ring).
+
+        Fill it in place and then commit() the number of frames written.
+        """
+        start = int(self._counters[_WRITTEN]) & self._mask
+        frames = min(frames, self.free(), self.capacity - start)
+        return self._samples[start:start + frames]
+
+    def commit(self, frames):
+        """Publish ``frames`` samples written through write_view()."""
+        self._counters[_WRITTEN] = int(self._counters[_WRITTEN]) + frames
+
+    def write(self, samples):
+        """Copy as many of ``samples`` as fit; returns the number written."""
+        done = 0
+        while done < len(samples):
+            view = self.write_view(len(samples) - done)
+            if not len(view):
+                break
+            view[:] = samples[done:done + len(view)]
+            self.commit(len(view))
+            done += len(view)
+        return done
+
+    # Consumer side
+
+    def read_into(self, out):
+        """Copy up to len(out) frames straight from shared memory into out.
+
+        Whatever the ring cannot supply is zero-filled; returns the number
+        of frames actually read, so a short count means an underflow.
+        """
+        read = int(self._counters[_READ])
+        frames = min(len(out), int(self._counters[_WRITTEN]) - read)
+        start = read & self._mask
+        first = min(frames, self.capacity - start)
+        out[:first] = self._samples[start:start + first]
+        out[first:frames] = self._samples[:frames - first]
+        out[frames:] = 0
+        self._counters[_READ] = read + frames
+        return frames
+
+    def skip(self, frames):
+        """Drop up to ``frames`` unread frames without copying them; returns how many."""
+        read = int(self._counters[_READ])
+        frames = min(frames, int(self._counters[_WRITTEN]) - read)
+        self._counters[_READ] = read + frames
+        return frames
+
+    def discard(self):
+        """Drop everything not yet read, e.g. on stop."""
+        self._counters[_READ] = self._counters[_WRITTEN]
+
+    def close(self):
+        # The NumPy views must go before the block can be closed
+        self._counters = self._samples = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,98 @@
+"""Startup timing for ``python main.py --profile-startup``.
+
+When enabled, every top-level import is timed through an ``__import__``
+wrapper and MainWindow marks its construction phases, so the report shows
+where the time before the first paint goes.  When disabled, ``phase()``
+returns a shared no-op context manager and nothing else runs.
+"""
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_profile = None
+_NOOP = nullcontext()
+
+
+class StartupProfile:
+    def __init__(self, t0):
+        self.t0 = t0
+        self.imports = {}
+        self.phases = []
+        self.marks = []
+        self._lock = threading.Lock()
+        self._depth = threading.local()
+
+    def mark(self, label):
+        with self._lock:
+            self.marks.append((label, time.perf_counter() - self.t0))
+
+    @contextmanager
+    def phase(self, label):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.phases.append((label, start - self.t0, end - start))
+
+    def _timed_import(self, original):
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            top = name.partition(".")[0]
+            # Only the outermost first import of a package is attributed,
+            # so nested imports count towards whoever pulled them in
+            depth = getattr(self._depth, "value", 0)
+            if level or depth or top in sys.modules:
+                self._depth.value = depth + 1
+                try:
+                    return original(name, globals, locals, fromlist, level)
+                finally:
+                    self._depth.value = depth
+            self._depth.value = 1
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._depth.value = 0
+                with self._lock:
+                    self.imports[top] = self.imports.get(top, 0.0) + time.perf_counter() - start
+        return timed_import
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        ms = 1e3
+        print("Startup profile (ms since process start)", file=file)
+        print("  imports:", file=file)
+        for name, seconds in sorted(self.imports.items(), key=lambda item: -item[1]):
+            if seconds * ms >= 0.1:
+                print(f"    {name:28s} {seconds * ms:8.1f}", file=file)
+        print("  phases:", file=file)
+        for label, start, seconds in self.phases:
+            print(f"    {label:28s} {seconds * ms:8.1f}   (at {start * ms:.1f})", file=file)
+        print("  milestones:", file=file)
+        for label, at in self.marks:
+            print(f"    {label:28s} {at * ms:8.1f}", file=file)
+        file.flush()
+
+
+def install(t0):
+    """Start profiling; t0 is the perf_counter() value taken at process start."""
+    global _profile
+    _profile = StartupProfile(t0)
+    builtins.__import__ = _profile._timed_import(builtins.__import__)
+    return _profile
+
+
+def active():
+    return _profile
+
+
+def phase(label):
+    return _profile.phase(label) if _profile is not None else _NOOP
+
+
+def mark(label):
+    if _profile is not None:
+        _profile.mark(label)
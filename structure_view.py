@@ -0,0 +1,281 @@
+"""Virtualized model/view list of chord cards for long progressions.
+
+StructurePanel builds one widget tree per chord, which is fine for a few
+dozen chords but grows linearly in memory and layout time.  Past a
+threshold it switches to this view instead: a QListView over a
+ChordListModel, with ChordCardDelegate painting each visible row as a card
+and hit-testing clicks on its play, edit and delete buttons.  Only rows in
+the viewport are ever painted.
+"""
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QPoint, QRect, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor, QFont, QPainter, QPen, QPolygon
+from PyQt5.QtWidgets import QAbstractItemView, QListView, QStyledItemDelegate
+
+from progression import RECORD_BYTES, ChordKeys
+
+CARD_HEIGHT = 96
+CARD_MARGIN = 6
+BUTTON_SIZE = 36
+LAYOUT_BATCH = 10_000
+
+
+def chord_color(roman):
+    return "#1976d2" if roman in ["I", "IV", "V"] else "#388e3c" if roman in ["ii", "iii", "vi"] else "#d32f2f"
+
+
+def chord_keys(chords):
+    """(roman, extension, inversion, voicing) of every chord, for diffing."""
+    if hasattr(chords, "key_view"):
+        # progression.Progression: a packed snapshot, decoded only for rows that get painted
+        return chords.key_view()
+    return [(c["roman"], c.get("extension"), c.get("inversion"), c.get("voicing")) for c in chords]
+
+
+def diff_span(old_keys, new_keys):
+    """Return (start, old_end, new_end) bounding the part of the list that changed.
+
+    Everything before ``start`` and after the two end indices is identical
+    in both lists.
+    """
+    if isinstance(old_keys, ChordKeys) and isinstance(new_keys, ChordKeys):
+        # Compares the packed records a memory block at a time
+        return old_keys.diff_span(new_keys)
+    limit = min(len(old_keys), len(new_keys))
+    start = 0
+    while start < limit and old_keys[start] == new_keys[start]:
+        start += 1
+    suffix = 0
+    while suffix < limit - start and old_keys[-1 - suffix] == new_keys[-1 - suffix]:
+        suffix += 1
+    return start, len(old_keys) - suffix, len(new_keys) - suffix
+
+
+def edit_span(old_keys, new_keys, span=None):
+    """``span`` if it fits an edit from old_keys to new_keys, otherwise diff_span() of the two.
+
+    Callers that know what an edit changed (undo, redo) pass it to skip
+    comparing the whole list.
+    """
+    if span is not None:
+        start, old_end, new_end = span
+        if old_end - new_end == len(old_keys) - len(new_keys) and new_end <= len(new_keys):
+            return span
+    return diff_span(old_keys, new_keys)
+
+
+class ChordListModel(QAbstractListModel):
+    """List model over chord keys; rows are updated from diffs, never reset."""
+
+    KeyRole = Qt.UserRole + 1
+    PlayingRole = Qt.UserRole + 2
+    # (first, last) rows edited in place.  dataChanged() would make QListView
+    # lay out every row again; with uniform row heights a repaint is enough
+    rowsEdited = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys = []
+        self._count = 0
+        self.playing_row = -1
+
+    def rowCount(self, parent=QModelIndex()):
+        # QListView calls this about twice per row on every layout pass
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < self._count:
+            return None
+        key = self._keys[index.row()]
+        if role == Qt.DisplayRole:
+            return key[0]
+        if role == self.KeyRole:
+            return key
+        if role == self.PlayingRole:
+            return index.row() == self.playing_row
+        if role == Qt.ToolTipRole:
+            return f"Chord {index.row() + 1}: " + " ".join(k for k in key if k)
+        return None
+
+    def can_splice(self, span, count):
+        """True if ``span`` fits an edit from the current rows to ``count`` rows."""
+        start, old_end, new_end = span
+        return isinstance(self._keys, ChordKeys) and old_end <= self._count and self._count - (old_end - new_end) == count
+
+    def splice(self, start, old_end, records):
+        """Rows [start, old_end) become the chords packed in ``records``, as the progression did.
+
+        Patches the key snapshot in place, so an undo or redo costs the size
+        of its edit instead of a fresh snapshot and diff of every chord.
+        """
+        keys = self._keys
+        new_end = start + len(records) // RECORD_BYTES
+        if new_end == old_end:
+            keys.splice(start, old_end, records)
+            if new_end > start:
+                self.rowsEdited.emit(start, new_end - 1)
+            return
+        if old_end > start:
+            self.beginRemoveRows(QModelIndex(), start, old_end - 1)
+            keys.splice(start, old_end, b"")
+            self._count = len(keys)
+            self.endRemoveRows()
+        if new_end > start:
+            self.beginInsertRows(QModelIndex(), start, new_end - 1)
+            keys.splice(start, start, records)
+            self._count = len(keys)
+            self.endInsertRows()
+
+    def sync(self, keys, span=None):
+        start, old_end, new_end = edit_span(self._keys, keys, span)
+        if old_end - start == new_end - start:
+            # Same length span (modifier edit, shuffle): repaint those rows only
+            self._keys = keys
+            if new_end > start:
+                self.rowsEdited.emit(start, new_end - 1)
+            return
+        if old_end > start:
+            self.beginRemoveRows(QModelIndex(), start, old_end - 1)
+            self._keys = self._keys[:start] + self._keys[old_end:]
+            self._count = len(self._keys)
+            self.endRemoveRows()
+        if new_end > start:
+            self.beginInsertRows(QModelIndex(), start, new_end - 1)
+            self._keys = keys
+            self._count = len(self._keys)
+            self.endInsertRows()
+
+
+class ChordCardDelegate(QStyledItemDelegate):
+    """Paints a chord card per row and turns clicks into play/edit/delete signals."""
+
+    playClicked = pyqtSignal(int)
+    editClicked = pyqtSignal(int)
+    deleteClicked = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        family = "Palatino" if QFont("Palatino").exactMatch() else "Georgia"
+        self._roman_font = QFont(family)
+        self._roman_font.setPixelSize(32)
+        self._roman_font.setBold(True)
+        self._pill_font = QFont(family)
+        self._pill_font.setPixelSize(13)
+        self._pill_font.setBold(True)
+        self._button_font = QFont(family)
+        self._button_font.setPixelSize(20)
+        self._button_font.setBold(True)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), CARD_HEIGHT)
+
+    def _layout(self, rect):
+        card = rect.adjusted(CARD_MARGIN, CARD_MARGIN, -CARD_MARGIN, -CARD_MARGIN)
+        top = card.center().y() - BUTTON_SIZE // 2
+        play = QRect(card.left() + 12, top, BUTTON_SIZE, BUTTON_SIZE)
+        delete = QRect(card.right() - 12 - BUTTON_SIZE, top, BUTTON_SIZE, BUTTON_SIZE)
+        edit = QRect(delete.left() - 10 - BUTTON_SIZE, top, BUTTON_SIZE, BUTTON_SIZE)
+        body = QRect(play.right() + 10, card.top() + 4, edit.left() - play.right() - 20, card.height() - 8)
+        return card, play, edit, delete, body
+
+    def paint(self, painter, option, index):
+        key = index.data(ChordListModel.KeyRole)
+        if key is None:
+            return
+        roman, extension, inversion, voicing = key
+        color = QColor(chord_color(roman))
+        card, play, edit, delete, body = self._layout(option.rect)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        if index.data(ChordListModel.PlayingRole):
+            painter.setPen(QPen(QColor("#1976d2"), 2.5))
+            painter.setBrush(QBrush(QColor("#e3f2fd")))
+        else:
+            painter.setPen(QPen(color, 1.5))
+            painter.setBrush(QBrush(QColor("#fff")))
+        painter.drawRoundedRect(card, 16, 16)
+
+        # Play button: blue rounded square with a white triangle
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QBrush(QColor("#1976d2")))
+        painter.drawRoundedRect(play, 10, 10)
+        painter.setBrush(QBrush(Qt.white))
+        x, y = play.left(), play.top()
+        painter.drawPolygon(QPolygon([QPoint(x + 13, y + 10), QPoint(x + 25, y + 18), QPoint(x + 13, y + 26)]))
+
+        # Roman numeral over a row of modifier pills
+        painter.setPen(color)
+        painter.setFont(self._roman_font)
+        label_rect = QRect(body.left(), body.top(), body.width(), body.height() // 2 + 6)
+        painter.drawText(label_rect, Qt.AlignCenter, roman)
+        painter.setFont(self._pill_font)
+        metrics = painter.fontMetrics()
+        pill_x = body.left()
+        pill_y = label_rect.bottom() + 4
+        for text in (extension, inversion, voicing):
+            if not text:
+                continue
+            pill = QRect(pill_x, pill_y, max(48, metrics.horizontalAdvance(text) + 16), 24)
+            painter.setPen(QPen(color, 2))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRoundedRect(pill, 8, 8)
+            painter.drawText(pill, Qt.AlignCenter, text)
+            pill_x = pill.right() + 8
+
+        # Edit and delete buttons
+        painter.setFont(self._button_font)
+        painter.setPen(QPen(QColor("#1976d2"), 2))
+        painter.drawRoundedRect(edit, 10, 10)
+        painter.drawText(edit, Qt.AlignCenter, "✎")
+        painter.setPen(QColor("#888"))
+        painter.drawText(delete, Qt.AlignCenter, "✕")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == event.MouseButtonRelease and event.button() == Qt.LeftButton:
+            _, play, edit, delete, _ = self._layout(option.rect)
+            pos = event.pos()
+            if play.contains(pos):
+                self.playClicked.emit(index.row())
+                return True
+            if edit.contains(pos):
+                self.editClicked.emit(index.row())
+                return True
+            if delete.contains(pos):
+                self.deleteClicked.emit(index.row())
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class ChordListView(QListView):
+    """QListView preconfigured for fixed-height, lazily painted chord cards."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.chord_model = ChordListModel(self)
+        self.card_delegate = ChordCardDelegate(self)
+        self.setModel(self.chord_model)
+        self.setItemDelegate(self.card_delegate)
+        # Uniform sizes let the view lay out 10k rows without asking each one
+        self.setUniformItemSizes(True)
+        # Lay out huge lists (e.g. an opened project) a batch per event loop
+        # turn, so the first rows show at once and the window stays responsive
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(LAYOUT_BATCH)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setStyleSheet("QListView { border: none; background: #fff; }")
+        self.chord_model.rowsEdited.connect(lambda first, last: self.viewport().update())
+
+    def set_playing_row(self, row):
+        """Move the playback highlight, repainting only the old and new rows."""
+        model = self.chord_model
+        previous, model.playing_row = model.playing_row, row
+        if previous == row:
+            return
+        # dataChanged() costs time proportional to the row count in
+        # QListView, so invalidate just the two visible rectangles instead
+        for r in (previous, row):
+            if 0 <= r < model.rowCount():
+                self.viewport().update(self.visualRect(model.index(r)))
@@ -0,0 +1,272 @@
+"""Chord synthesis with NumPy wavetable oscillators.
+
+Each waveform is a set of band-limited single-cycle tables, one per octave
+band of harmonic content (a mip-map), so high notes never alias.  Voices
+are read from the tables by a 32-bit fixed-point phase accumulator: the
+phase wraps by integer overflow, its top bits index the table and the rest
+interpolate linearly between neighbouring entries.  No transcendental
+function is evaluated per sample.
+
+A progression is rendered into one preallocated buffer, chord by chord,
+with every voice's increment and table fixed for the chord so the inner
+work is plain whole-array arithmetic.  Phases run on from one chord to
+the next, in a progression and across successive calls on one
+OscillatorBank, so chord changes do not click.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_FS = 44100
+WAVEFORMS = ("sine", "triangle", "saw", "square")
+DEFAULT_CACHE_MB = 64
+
+TABLE_BITS = 11
+TABLE_SIZE = 1 << TABLE_BITS
+# Harmonics in band b of a mip-mapped table: MAX_HARMONICS >> b, down to 1
+MAX_HARMONICS = TABLE_SIZE // 4
+BANDS = MAX_HARMONICS.bit_length()
+_FRAC_BITS = 32 - TABLE_BITS
+_FRAC_MASK = (1 << _FRAC_BITS) - 1
+_FRAC_SCALE = np.float32(1 / (1 << _FRAC_BITS))
+
+_wavetables = {}
+
+
+def _harmonic_amplitudes(waveform, harmonics):
+    """Fourier sine-series amplitudes of harmonics 1..harmonics."""
+    k = np.arange(1, harmonics + 1, dtype=np.float64)
+    odd = k % 2 == 1
+    if waveform == "sine":
+        return (k == 1).astype(np.float64)
+    if waveform == "saw":
+        return 2 / np.pi * np.where(odd, 1.0, -1.0) / k
+    if waveform == "square":
+        return np.where(odd, 4 / np.pi / k, 0.0)
+    if waveform == "triangle":
+        sign = np.where((k - 1) % 4 == 0, 1.0, -1.0)
+        return np.where(odd, 8 / np.pi ** 2 * sign / k ** 2, 0.0)
+    raise ValueError(f"Unknown waveform: {waveform!r}")
+
+
+def wavetable(waveform):
+    """(tables, deltas) for a waveform, each a flat float32 array of (BANDS + 1) tables.
+
+    Table b holds at most MAX_HARMONICS >> b harmonics; the extra last
+    table is silence, used for the padding voices of smaller chords.
+    ``deltas`` holds the step to the next entry, for interpolation.
+    """
+    cached = _wavetables.get(waveform)
+    if cached is not None:
+        return cached
+    tables = np.zeros((BANDS + 1, TABLE_SIZE), dtype=np.float64)
+    for band in range(BANDS):
+        harmonics = MAX_HARMONICS >> band
+        spectrum = np.zeros(TABLE_SIZE // 2 + 1, dtype=np.complex128)
+        # irfft of -j*N/2*a at bin k is a*sin(2*pi*k*n/N)
+        spectrum[1:harmonics + 1] = -0.5j * TABLE_SIZE * _harmonic_amplitudes(waveform, harmonics)
+        tables[band] = np.fft.irfft(spectrum, TABLE_SIZE)
+    deltas = np.roll(tables, -1, axis=1) - tables
+    cached = _wavetables[waveform] = (tables.astype(np.float32).ravel(), deltas.astype(np.float32).ravel())
+    return cached
+
+
+def table_bands(freqs, fs):
+    """Mip-map band of each frequency: the richest table that stays below Nyquist."""
+    freqs = np.asarray(freqs, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        allowed = np.floor(fs / 2 / freqs)
+        bands = np.ceil(np.log2(MAX_HARMONICS / np.maximum(allowed, 1)))
+    bands = np.clip(bands, 0, BANDS - 1).astype(np.intp)
+    bands[freqs <= 0] = BANDS
+    return bands
+
+
+def phase_increments(freqs, fs):
+    """Per-sample phase step of each frequency as a 32-bit fixed-point fraction of a cycle."""
+    steps = np.rint(np.asarray(freqs, dtype=np.float64) / fs * 2.0 ** 32)
+    return (steps.astype(np.int64) & 0xFFFFFFFF).astype(np.uint32)
+
+
+def frequency_matrix(chord_freqs):
+    """Stack per-chord frequency tuples into a zero-padded (chords x voices) array."""
+    voices = max((len(f) for f in chord_freqs), default=0)
+    matrix = np.zeros((len(chord_freqs), voices))
+    for row, freqs in enumerate(chord_freqs):
+        matrix[row, :len(freqs)] = freqs
+    return matrix
+
+
+def chord_lengths(count, durations, fs=DEFAULT_FS):
+    """Length in samples of each chord; durations is one value or one per chord."""
+    seconds = np.broadcast_to(np.asarray(durations, dtype=np.float64), (count,))
+    return np.maximum((seconds * fs).astype(np.int64), 1)
+
+
+def _render(freqs, lengths, fs, waveform, phases):
+    """Render a (chords x voices) frequency matrix; ``phases`` (one per voice) is advanced in place."""
+    count, voices = freqs.shape
+    onsets = np.zeros(count, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=onsets[1:])
+    total = int(onsets[-1] + lengths[-1])
+    tables, deltas = wavetable(waveform)
+    incs = phase_increments(freqs, fs)
+    offsets = (table_bands(freqs, fs) * TABLE_SIZE).astype(np.uint32)
+
+    audio = np.zeros(total, dtype=np.float32)
+    longest = int(lengths.max())
+    # Scratch buffers sized for the longest chord, reused for every chord
+    ramp = np.arange(longest, dtype=np.uint32)
+    phase = np.empty(longest, dtype=np.uint32)
+    index = np.empty(longest, dtype=np.uint32)
+    frac = np.empty(longest, dtype=np.float32)
+    value = np.empty(longest, dtype=np.float32)
+    # One chord at a time, with scalar increments and table offsets: no
+    # per-sample gathers, and the buffers stay in cache
+    for chord in range(count):
+        start, length = int(onsets[chord]), int(lengths[chord])
+        out = audio[start:start + length]
+        p, i, f, v = phase[:length], index[:length], frac[:length], value[:length]
+        for voice in range(voices):
+            inc = incs[chord, voice]
+            if inc == 0:
+                continue
+            # phase = start phase + samples * increment, wrapping at 2**32 (one cycle)
+            np.multiply(ramp[:length], inc, out=p)
+            p += np.uint32(phases[voice])
+            phases[voice] = (int(phases[voice]) + int(inc) * length) & 0xFFFFFFFF
+            np.right_shift(p, _FRAC_BITS, out=i)
+            i += offsets[chord, voice]
+            np.bitwise_and(p, _FRAC_MASK, out=p)
+            np.multiply(p, _FRAC_SCALE, out=f, casting="unsafe")
+            # Linear interpolation: table[i] + frac * (table[i + 1] - table[i])
+            np.take(deltas, i, out=v)
+            v *= f
+            out += v
+            np.take(tables, i, out=v)
+            out += v
+        peak = np.abs(out).max() if length else 0.0
+        if peak > 0:
+            out *= np.float32(1 / peak)
+    return audio, onsets
+
+
+class OscillatorBank:
+    """Wavetable voices whose phases run on from one rendered chord to the next.
+
+    Playback renders chord after chord through one bank, so each voice
+    continues where it stopped instead of restarting at phase 0.
+    """
+
+    def __init__(self, fs=DEFAULT_FS, waveform="sine"):
+        if waveform not in WAVEFORMS:
+            raise ValueError(f"Unknown waveform: {waveform!r}")
+        self.fs = fs
+        self.waveform = waveform
+        self.phases = np.zeros(0, dtype=np.uint64)
+
+    def reset(self):
+        self.phases[:] = 0
+
+    def render_lengths(self, chord_freqs, lengths):
+        """Render chords of the given lengths in samples; returns (audio, onsets)."""
+        freqs = frequency_matrix(chord_freqs)
+        if len(freqs) == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        if len(self.phases) < freqs.shape[1]:
+            self.phases = np.concatenate((self.phases, np.zeros(freqs.shape[1] - len(self.phases), dtype=np.uint64)))
+        return _render(freqs, np.asarray(lengths, dtype=np.int64), self.fs, self.waveform, self.phases)
+
+    def render_progression(self, chord_freqs, durations):
+        """Render chords back to back, each ``durations`` seconds (one value or one per chord)."""
+        return self.render_lengths(chord_freqs, chord_lengths(len(chord_freqs), durations, self.fs))
+
+    def render_chord(self, freqs, frames):
+        """Render one chord of exactly ``frames`` samples, normalized to a peak of 1.0."""
+        audio, _ = self.render_lengths([freqs], [max(int(frames), 1)])
+        return audio
+
+
+def render_progression(chord_freqs, durations, fs=DEFAULT_FS, waveform="sine"):
+    """Render chords back to back into one float32 buffer.
+
+    Returns ``(audio, onsets)`` where ``onsets`` holds the first sample of
+    each chord.  Each chord is normalized to a peak of 1.0, as the old
+    per-chord playback did, and voices start at phase 0.
+    """
+    return OscillatorBank(fs, waveform).render_progression(chord_freqs, durations)
+
+
+def render_chord(freqs, duration, fs=DEFAULT_FS, waveform="sine"):
+    """Render a single chord, normalized to a peak of 1.0."""
+    audio, _ = render_progression([freqs], duration, fs, waveform)
+    return audio
+
+
+class ChordBufferCache:
+    """Bounded LRU cache of rendered, normalized chord buffers.
+
+    Buffers are keyed by (frequencies, duration, sample rate, waveform),
+    stored as read-only float32 arrays and evicted least-recently-used
+    first once their total size exceeds the memory cap.
+    """
+
+    def __init__(self, max_mb=DEFAULT_CACHE_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._buffers = OrderedDict()
+        # Previews run on the GUI thread while playback renders on its own
+        self._lock = threading.Lock()
+
+    def get(self, freqs, duration, fs=DEFAULT_FS, waveform="sine"):
+        """Return the cached buffer for the chord, rendering it on a miss."""
+        key = (tuple(freqs), duration, fs, waveform)
+        with self._lock:
+            audio = self._buffers.get(key)
+            if audio is not None:
+                self._buffers.move_to_end(key)
+                self.hits += 1
+                return audio
+            self.misses += 1
+        audio = render_chord(freqs, duration, fs, waveform).astype(np.float32)
+        audio.flags.writeable = False
+        with self._lock:
+            if key not in self._buffers and audio.nbytes <= self.max_bytes:
+                self._buffers[key] = audio
+                self.nbytes += audio.nbytes
+                self._evict()
+        return audio
+
+    def resize(self, max_mb):
+        with self._lock:
+            self.max_bytes = int(max_mb * 1024 * 1024)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._buffers.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._buffers),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and self._buffers:
+            _, audio = self._buffers.popitem(last=False)
+            self.nbytes -= audio.nbytes
+            self.evictions += 1
+
+
+# Shared by playback and the structure-panel previews
+chord_cache = ChordBufferCache()
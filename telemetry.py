@@ -0,0 +1,106 @@
+"""Playback telemetry: where the time goes while chords are playing.
+
+The playback path records timings into bounded deques (appends are atomic,
+so the audio thread never takes a lock) and bumps a few counters.  Nothing
+is aggregated until someone asks: the stats overlay in SettingsPanel calls
+summary() a couple of times a second, and write_csv() dumps every sample
+for offline analysis.
+
+Series, all in seconds:
+    lookup      resolving a chord to frequencies (get_chord_frequencies)
+    render      rendering or fetching a chord buffer (synthesis)
+    callback    one audio callback, to compare against the block period
+    highlight   GUI-thread latency of the highlight posted at each onset
+    onset       deviation of each chord onset from its ideal time
+
+Counters: audio callbacks, underruns and overruns (as reported by the
+device, or the render process's ring running dry), and late_blocks,
+callbacks that only started after their block was due at the DAC.
+"""
+import csv
+from collections import deque
+
+HISTORY = 4096
+SERIES = ("lookup", "render", "callback", "highlight", "onset")
+COUNTERS = ("callbacks", "underruns", "overruns", "late_blocks")
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class Telemetry:
+    def __init__(self, history=HISTORY):
+        self.series = {name: deque(maxlen=history) for name in SERIES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        # Facts about the current configuration, e.g. the block period
+        self.info = {}
+
+    def record(self, name, seconds):
+        self.series[name].append(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def reset(self):
+        for values in self.series.values():
+            values.clear()
+        for name in self.counters:
+            self.counters[name] = 0
+
+    def summary(self):
+        """{series: {count, mean, p50, p95, p99, max}} in seconds, plus the counters."""
+        stats = {}
+        for name, values in self.series.items():
+            values = sorted(values)
+            row = {"count": len(values), "mean": sum(values) / len(values) if values else 0.0}
+            for p in PERCENTILES:
+                row[f"p{p}"] = percentile(values, p)
+            row["max"] = values[-1] if values else 0.0
+            stats[name] = row
+        stats["counters"] = dict(self.counters)
+        return stats
+
+    def format_summary(self):
+        """A few fixed-width lines for the stats overlay."""
+        stats = self.summary()
+        lines = [f"{'':10s} {'p50':>7s} {'p95':>7s} {'p99':>7s} {'max':>7s}  ms"]
+        for name in SERIES:
+            row = stats[name]
+            if name == "onset":
+                # Early and late onsets are both jitter
+                values = sorted(abs(v) for v in self.series[name])
+                row = dict(row, **{f"p{p}": percentile(values, p) for p in PERCENTILES}, max=values[-1] if values else 0.0)
+            lines.append(
+                f"{name:10s} {row['p50'] * 1e3:7.2f} {row['p95'] * 1e3:7.2f} {row['p99'] * 1e3:7.2f} {row['max'] * 1e3:7.2f}"
+            )
+        counters = stats["counters"]
+        lines.append(
+            f"callbacks {counters['callbacks']}  underruns {counters['underruns']}"
+            f"  overruns {counters['overruns']}  late {counters['late_blocks']}"
+        )
+        if "block_ms" in self.info:
+            lines.append(f"block period {self.info['block_ms']:.2f} ms")
+        return "\n".join(lines)
+
+    def write_csv(self, path):
+        """Write every sample as (metric, index, value) rows; timings in milliseconds."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["metric", "index", "value"])
+            for name in SERIES:
+                for i, seconds in enumerate(list(self.series[name])):
+                    writer.writerow([f"{name}_ms", i, f"{seconds * 1e3:.4f}"])
+            for name, value in self.counters.items():
+                writer.writerow([name, "", value])
+            for name, value in self.info.items():
+                writer.writerow([name, "", value])
+
+
+# Shared by the audio engine, the playback loop and the UI
+telemetry = Telemetry()
@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_export
+
+
+def export(tmp_path, *records):
+    lines = [json.dumps(record) for record in records]
+    return batch_export.run(lines, str(tmp_path), workers=1)
+
+
+def test_exports_valid_progression(tmp_path):
+    written, errors, _ = export(tmp_path, {"name": "ii_V_I", "key": "Bb", "mode": "Dorian", "chords": [{"roman": "ii"}, {"roman": "V"}, {"roman": "I"}]})
+    assert (written, errors) == (1, [])
+    assert (tmp_path / "ii_V_I.mid").exists()
+
+
+def test_misspelled_mode_is_reported(tmp_path):
+    written, errors, _ = export(
+        tmp_path,
+        {"name": "ok", "chords": [{"roman": "I"}]},
+        {"name": "typo", "key": "A", "mode": "minor", "chords": [{"roman": "I"}]},
+    )
+    assert written == 1
+    assert errors == [(2, "ValueError: unknown mode 'minor'")]
+    assert not (tmp_path / "typo.mid").exists()
+
+
+def test_unknown_key_is_reported(tmp_path):
+    written, errors, _ = export(tmp_path, {"name": "h", "key": "H", "chords": [{"roman": "I"}]})
+    assert written == 0
+    assert errors == [(1, "ValueError: unknown key 'H'")]
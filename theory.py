@@ -0,0 +1,230 @@
+"""Chord theory tables shared by playback, chord preview and export.
+
+Everything here is plain Python so it can be imported without Qt or an
+audio backend.  Chords are resolved once per unique argument tuple and
+memoized, so repeated lookups during playback are a single dict hit.
+
+A chord is placed in real octaves as MIDI notes: the tonic sits around
+middle C, voices stack upwards from the chord root, and the Open and
+Drop 2 voicings move a voice by an octave.  Frequencies come from a
+tuning's 128-entry table (see the tuning module), gathered for a whole
+chord_table() at once; they are cached per tuning, so only a new tuning,
+reference pitch or key builds new tables.
+"""
+from collections import namedtuple
+
+from tuning import EQUAL_TEMPERAMENT, TONIC_MIDI
+
+# Define MODES here so the UI and headless tools share one list
+MODES = [
+    {"label": "Major (Ionian)"},
+    {"label": "Dorian"},
+    {"label": "Phrygian"},
+    {"label": "Lydian"},
+    {"label": "Mixolydian"},
+    {"label": "Minor (Aeolian)"},
+    {"label": "Locrian"},
+    {"label": "Gypsy Minor"},
+    {"label": "Harmonic Minor"},
+    {"label": "Minor Pentatonic"},
+    {"label": "Whole Tone"},
+    {"label": "Tonic 2nds"},
+    {"label": "Tonic 3rds"},
+    {"label": "Tonic 4ths"},
+    {"label": "Tonic 6ths"},
+]
+
+NOTE_NAMES_SHARP = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+NOTE_NAMES_FLAT = ("C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B")
+# Pitch class of every spelling we accept for a key
+KEY_INDEX = {n: i for i, n in enumerate(NOTE_NAMES_SHARP)}
+KEY_INDEX.update({n: i for i, n in enumerate(NOTE_NAMES_FLAT)})
+
+# Mode intervals (in semitones from root)
+MODE_INTERVALS = {
+    "Major (Ionian)":      (0, 2, 4, 5, 7, 9, 11),
+    "Dorian":              (0, 2, 3, 5, 7, 9, 10),
+    "Phrygian":            (0, 1, 3, 5, 7, 8, 10),
+    "Lydian":              (0, 2, 4, 6, 7, 9, 11),
+    "Mixolydian":          (0, 2, 4, 5, 7, 9, 10),
+    "Minor (Aeolian)":     (0, 2, 3, 5, 7, 8, 10),
+    "Locrian":             (0, 1, 3, 5, 6, 8, 10),
+    "Gypsy Minor":         (0, 2, 3, 6, 7, 8, 11),
+    "Harmonic Minor":      (0, 2, 3, 5, 7, 8, 11),
+    "Minor Pentatonic":    (0, 3, 5, 7, 10),
+    "Whole Tone":          (0, 2, 4, 6, 8, 10),
+    "Tonic 2nds":          (0, 2),
+    "Tonic 3rds":          (0, 4),
+    "Tonic 4ths":          (0, 5),
+    "Tonic 6ths":          (0, 9),
+}
+DEFAULT_MODE = "Major (Ionian)"
+
+ROMAN_NUMERALS = ("I", "ii", "iii", "IV", "V", "vi", "vii°")
+# Chord degree to scale degree index
+ROMAN_TO_DEGREE = {r: i for i, r in enumerate(ROMAN_NUMERALS)}
+
+EXTENSIONS = ("+6th", "+7th", "+9th", "sus2", "sus4")
+INVERSIONS = ("Root", "1st", "2nd")
+VOICINGS = ("Root", "Open", "Drop 2", "Custom")
+
+# Extra scale steps above the chord root added by each extension
+_ADDED_STEP = {"+6th": 5, "+7th": 6, "+9th": 1}
+# Scale step that replaces the third for suspended chords
+_SUS_STEP = {"sus2": 1, "sus4": 3}
+
+Chord = namedtuple("Chord", ["freqs", "midi"])
+
+# MIDI notes of every chord per (key, mode), whatever the tuning
+_note_tables = {}
+# The same as (chords, voices) arrays for the tuning gather, padded with each bass note
+_padded_notes = {}
+# Tuning -> (chord cache, chord tables); only the last tuning used is kept
+_tuned_caches = {}
+
+# Integer codes for chord fields, as stored by progression.Progression.
+# Code 0 of each modifier means "not set" (None); the others index the
+# tuples above, shifted by one.
+ROMAN_CODES = {r: i for i, r in enumerate(ROMAN_NUMERALS)}
+EXTENSION_CODES = {e: i for i, e in enumerate((None,) + EXTENSIONS)}
+INVERSION_CODES = {v: i for i, v in enumerate((None,) + INVERSIONS)}
+VOICING_CODES = {v: i for i, v in enumerate((None,) + VOICINGS)}
+# Size of each field, outermost first; chord_code() packs them mixed-radix
+CODE_SHAPE = (len(ROMAN_CODES), len(EXTENSION_CODES), len(INVERSION_CODES), len(VOICING_CODES))
+CODE_COUNT = CODE_SHAPE[0] * CODE_SHAPE[1] * CODE_SHAPE[2] * CODE_SHAPE[3]
+
+
+def chord_steps(extension=None, inversion=None):
+    """Scale steps of a chord's notes above its degree, lowest voice first."""
+    steps = [0, 2, 4]
+    if extension in _ADDED_STEP:
+        steps.append(_ADDED_STEP[extension])
+    elif extension in _SUS_STEP:
+        steps[1] = _SUS_STEP[extension]
+    if inversion == "1st":
+        steps = steps[1:] + steps[:1]
+    elif inversion == "2nd":
+        steps = steps[2:] + steps[:2]
+    return tuple(steps)
+
+
+def voice(notes, voicing=None):
+    """Spread close-position MIDI notes (lowest first) across octaves for a voicing."""
+    notes = list(notes)
+    if len(notes) < 3:
+        return tuple(notes)
+    if voicing == "Open":
+        # Lift the voice above the bass an octave: C E G -> C G E'
+        notes[1] += 12
+    elif voicing == "Drop 2":
+        # Drop the second voice from the top an octave: C E G -> E, C G
+        notes[-2] -= 12
+    # "Custom" voicing is not implemented and leaves the notes untouched
+    return tuple(sorted(notes))
+
+
+def _build_notes(roman, extension, inversion, voicing, key, mode):
+    tonic = TONIC_MIDI[KEY_INDEX.get(key, 0)]
+    intervals = MODE_INTERVALS.get(mode, MODE_INTERVALS[DEFAULT_MODE])
+    size = len(intervals)
+    degree = ROMAN_TO_DEGREE.get(roman, 0)
+    # Degrees beyond the end of a short scale fall back to the tonic triad
+    if degree >= size:
+        degree = 0
+    notes = []
+    for step in chord_steps(extension, inversion):
+        note = tonic + intervals[(degree + step) % size]
+        # Close position: each voice is the nearest one above the voice below
+        while notes and note <= notes[-1]:
+            note += 12
+        notes.append(note)
+    return voice(notes, voicing)
+
+
+def chord_notes(key="C", mode=DEFAULT_MODE):
+    """MIDI notes of every chord of a key and mode, indexed by chord_code().
+
+    These don't depend on the tuning and are built once per (key, mode).
+    """
+    notes = _note_tables.get((key, mode))
+    if notes is None:
+        notes = _note_tables[(key, mode)] = [
+            _build_notes(roman, extension, inversion, voicing, key, mode)
+            for roman in ROMAN_NUMERALS
+            for extension in EXTENSION_CODES
+            for inversion in INVERSION_CODES
+            for voicing in VOICING_CODES
+        ]
+    return notes
+
+
+def _tuned(tuning):
+    global _tuned_caches
+    caches = _tuned_caches.get(tuning)
+    if caches is None:
+        # A new tuning or reference pitch: chords resolved under the old one go
+        caches = ({}, {})
+        _tuned_caches = {tuning: caches}
+    return caches
+
+
+def _named_code(roman, extension, inversion, voicing):
+    # Unknown names resolve like None (or I), as they always have
+    return chord_code(
+        ROMAN_CODES.get(roman, 0), EXTENSION_CODES.get(extension, 0),
+        INVERSION_CODES.get(inversion, 0), VOICING_CODES.get(voicing, 0),
+    )
+
+
+def chord_lookup(roman, extension=None, inversion=None, voicing=None, key="C", mode=DEFAULT_MODE, tuning=None):
+    """Return the memoized Chord (frequency and MIDI-number tuples) for the arguments."""
+    tuning = EQUAL_TEMPERAMENT if tuning is None else tuning
+    cache, _ = _tuned(tuning)
+    args = (roman, extension, inversion, voicing, key, mode)
+    chord = cache.get(args)
+    if chord is None:
+        chord = cache[args] = chord_table(key, mode, tuning)[_named_code(roman, extension, inversion, voicing)]
+    return chord
+
+
+def chord_frequencies(roman, extension=None, inversion=None, voicing=None, key="C", mode=DEFAULT_MODE, tuning=None):
+    return chord_lookup(roman, extension, inversion, voicing, key, mode, tuning).freqs
+
+
+def chord_midi(roman, extension=None, inversion=None, voicing=None, key="C", mode=DEFAULT_MODE):
+    return chord_notes(key, mode)[_named_code(roman, extension, inversion, voicing)]
+
+
+def clear_cache():
+    global _tuned_caches
+    _note_tables.clear()
+    _padded_notes.clear()
+    _tuned_caches = {}
+
+
+def chord_code(roman, extension, inversion, voicing):
+    """Pack four field codes into one index into chord_table()."""
+    return ((roman * CODE_SHAPE[1] + extension) * CODE_SHAPE[2] + inversion) * CODE_SHAPE[3] + voicing
+
+
+def chord_table(key="C", mode=DEFAULT_MODE, tuning=None):
+    """Every chord of a key and mode as a list indexed by chord_code().
+
+    Built once per (key, mode) and tuning, so resolving a coded chord is a
+    list index with no string handling at all.  The frequencies of all
+    the chords are one gather from the tuning's table.
+    """
+    tuning = EQUAL_TEMPERAMENT if tuning is None else tuning
+    _, tables = _tuned(tuning)
+    table = tables.get((key, mode))
+    if table is None:
+        notes = chord_notes(key, mode)
+        padded = _padded_notes.get((key, mode))
+        if padded is None:
+            import numpy as np
+            width = max(map(len, notes))
+            # Short chords are padded with their own bass note, then trimmed
+            padded = _padded_notes[(key, mode)] = np.array([chord + chord[:1] * (width - len(chord)) for chord in notes])
+        freqs = tuning.table(KEY_INDEX.get(key, 0))[padded].tolist()
+        table = tables[(key, mode)] = [Chord(tuple(f[:len(chord)]), chord) for f, chord in zip(freqs, notes)]
+    return table
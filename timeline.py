@@ -0,0 +1,88 @@
+"""Beat timelines for playback and the record of how accurately they were hit.
+
+Every onset is computed from an absolute origin (the first beat) plus the
+beat lengths so far, never by sleeping "one beat" after the previous
+chord, so overhead and late wake-ups do not accumulate as drift.  The
+audio scheduler keeps its timeline on the stream's sample clock;
+MonotonicTimeline is the fallback on ``time.monotonic()`` for when no
+output stream can be opened.
+"""
+import time
+from collections import deque
+
+from telemetry import telemetry
+
+ONSET_HISTORY = 4096
+
+
+def grid_frames(position, beat):
+    """Frames in the beat that starts ``position`` frames after the first one.
+
+    Onsets are the fractional grid positions rounded to whole frames, so
+    consecutive beats tile the grid exactly however the tempo divides.
+    """
+    return round(position + beat) - round(position)
+
+
+class OnsetLog:
+    """Ideal and actual times, in seconds from the first beat, of recent onsets."""
+
+    def __init__(self, maxlen=ONSET_HISTORY):
+        self._onsets = deque(maxlen=maxlen)
+
+    def record(self, ideal, actual):
+        self._onsets.append((ideal, actual))
+        telemetry.record("onset", actual - ideal)
+
+    def clear(self):
+        self._onsets.clear()
+
+    def __len__(self):
+        return len(self._onsets)
+
+    def onsets(self):
+        return list(self._onsets)
+
+    def deviations(self):
+        """Actual minus ideal time of each onset, in seconds (positive: late)."""
+        return [actual - ideal for ideal, actual in list(self._onsets)]
+
+    def summary(self):
+        deviations = self.deviations()
+        if not deviations:
+            return {"count": 0, "mean": 0.0, "max_late": 0.0, "max_early": 0.0}
+        return {
+            "count": len(deviations),
+            "mean": sum(deviations) / len(deviations),
+            "max_late": max(max(deviations), 0.0),
+            "max_early": min(min(deviations), 0.0),
+        }
+
+
+class MonotonicTimeline:
+    """Beat onsets on time.monotonic(), for playback without an audio stream."""
+
+    def __init__(self, log=None):
+        self.log = log if log is not None else OnsetLog()
+        self._origin = None
+        self._next = None
+
+    def wait(self, keep_going=lambda: True):
+        """Sleep until the next onset; returns False if keep_going() turned false first."""
+        if self._next is None:
+            self._origin = self._next = time.monotonic()
+            return True
+        while True:
+            remaining = self._next - time.monotonic()
+            if remaining <= 0:
+                return True
+            if not keep_going():
+                return False
+            time.sleep(min(remaining, 0.05))
+
+    def beat(self, seconds):
+        """Mark the onset just waited for and place the next one ``seconds`` after it."""
+        actual = time.monotonic()
+        self.log.record(self._next - self._origin, actual - self._origin)
+        # Advance from the ideal onset, not from when we woke up
+        self._next += seconds
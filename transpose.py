@@ -0,0 +1,166 @@
+"""Transpose a progression into every key and mode at once, and export the pack.
+
+note_tensor() resolves a progression in all 12 keys and every mode with
+one NumPy gather from NOTE_TABLE, the MIDI notes of every chord code in
+C for each mode; another key only moves every note by the distance
+between the two tonics.  The result is a (keys, modes, chords, voices)
+array of MIDI notes, padded with -1 where a chord has fewer voices than
+the widest one.  It matches theory.chord_notes() note for note, so a pack
+sounds exactly like playback in each key and mode.
+
+export_pack() writes one MIDI and/or audio file per (key, mode) variant,
+spreading the variants over a process pool.  Audio is tuned with one
+gather per variant from the tuning's table for that key.
+
+    python transpose.py I vi IV V -o pack/ --audio .wav
+    python transpose.py I vi IV V -o pack/ --audio .wav --tuning just --a4 432
+    python transpose.py --input progression.jsonl -o pack/ --modes Dorian "Minor (Aeolian)"
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from export import write_audio, write_midi_notes
+from progression import Progression
+from theory import (
+    CODE_SHAPE,
+    KEY_INDEX,
+    MODES,
+    NOTE_NAMES_FLAT,
+    NOTE_NAMES_SHARP,
+    TONIC_MIDI,
+    chord_notes,
+)
+from tuning import EQUAL_TEMPERAMENT, JUST_INTONATION, EqualTemperament, load_scala
+
+MODE_LABELS = tuple(mode["label"] for mode in MODES)
+
+# MIDI notes of every chord code in C, per mode: (modes, codes, voices),
+# -1 padding short chords
+_C_NOTES = [chord_notes("C", label) for label in MODE_LABELS]
+VOICES = max(len(chord) for table in _C_NOTES for chord in table)
+NOTE_TABLE = np.full((len(MODE_LABELS), len(_C_NOTES[0]), VOICES), -1, dtype=np.int16)
+for _m, _table in enumerate(_C_NOTES):
+    for _code, _chord in enumerate(_table):
+        NOTE_TABLE[_m, _code, :len(_chord)] = _chord
+
+
+def note_tensor(chords, keys=NOTE_NAMES_SHARP, modes=MODE_LABELS):
+    """MIDI notes of a progression in every key and mode: int16 (keys, modes, chords, voices), -1 padded."""
+    prog = chords if isinstance(chords, Progression) else Progression(chords)
+    # Each key moves the notes of C by the distance between the two tonics
+    shift = np.array([TONIC_MIDI[KEY_INDEX[key]] - TONIC_MIDI[0] for key in keys], dtype=np.int16)
+    mode_index = np.array([MODE_LABELS.index(mode) for mode in modes], dtype=np.int64)
+    # theory.chord_code() of every chord
+    codes = np.zeros(len(prog), dtype=np.int64)
+    for column, size in zip(prog.columns, CODE_SHAPE):
+        codes = codes * size + np.frombuffer(column, dtype=np.uint8)
+    notes = NOTE_TABLE[mode_index[:, None], codes[None, :]]          # (modes, chords, voices)
+    return np.where(notes >= 0, notes[None] + shift[:, None, None, None], -1).astype(np.int16)
+
+
+def variant_name(key, mode):
+    """File-name stem of a variant, e.g. "F#_minor_aeolian"."""
+    return f"{key}_{re.sub(r'[^a-z0-9]+', '_', mode.lower()).strip('_')}"
+
+
+def _write_variants(jobs):
+    """Worker: write the files of a list of (path stem, notes, options) jobs."""
+    written = 0
+    for stem, notes, midi, audio, tempo, waveform, fs, tuning, tonic in jobs:
+        voices = notes >= 0
+        if midi:
+            with open(stem + ".mid", "wb") as f:
+                write_midi_notes(f, [tuple(row[keep].tolist()) for row, keep in zip(notes, voices)], tempo)
+            written += 1
+        if audio:
+            # One gather for the whole variant; padding reads note 0 and is dropped
+            freqs = tuning.table(tonic)[np.where(voices, notes, 0)]
+            write_audio([tuple(row[keep].tolist()) for row, keep in zip(freqs, voices)], stem + audio, tempo, fs, waveform=waveform)
+            written += 1
+    return written
+
+
+def export_pack(chords, out_dir, keys=NOTE_NAMES_SHARP, modes=MODE_LABELS, midi=True, audio=None,
+                tempo=100, waveform="sine", fs=None, workers=None, prefix="progression", tuning=None):
+    """Write a progression in every key and mode to ``out_dir``; returns (files written, seconds).
+
+    One file per variant and format, named like "progression_F#_dorian.mid";
+    ``audio`` is None or an extension from export.AUDIO_FORMATS, tuned with
+    ``tuning`` (default 12-TET at 440 Hz).  Variants with audio are split
+    over ``workers`` processes (default: CPU count); MIDI-only packs, or
+    one worker, are written in this process.
+    """
+    tuning = EQUAL_TEMPERAMENT if tuning is None else tuning
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    notes = note_tensor(chords, keys, modes)
+    jobs = [
+        (os.path.join(out_dir, f"{prefix}_{variant_name(key, mode)}"), notes[k, m], midi, audio, tempo, waveform, fs, tuning, KEY_INDEX[key])
+        for k, key in enumerate(keys)
+        for m, mode in enumerate(modes)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    # MIDI files take well under a millisecond each, less than starting a worker
+    if workers <= 1 or not audio:
+        written = _write_variants(jobs)
+    else:
+        # Spawned, not forked: the UI calls this with Qt and audio threads running
+        chunks = [jobs[i::workers * 2] for i in range(workers * 2)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            written = sum(pool.map(_write_variants, chunks))
+    return written, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a progression in every key and mode.")
+    parser.add_argument("chords", nargs="*", help="the progression as numerals, e.g. I vi IV V")
+    parser.add_argument("--input", help="take the progression (with modifiers) from the first line of a batch-export JSONL file")
+    parser.add_argument("-o", "--out-dir", default="pack", help="directory for the files (default: pack)")
+    parser.add_argument("--modes", nargs="+", default=MODE_LABELS, choices=MODE_LABELS, metavar="MODE", help="modes to include (default: all)")
+    parser.add_argument("--flats", action="store_true", help="name keys with flats (Db, Eb, ...)")
+    parser.add_argument("--no-midi", dest="midi", action="store_false", help="skip the MIDI files")
+    parser.add_argument("--audio", choices=(".wav", ".flac"), default=None, help="also render audio in this format")
+    parser.add_argument("--tempo", type=int, default=100, help="tempo in BPM (default 100)")
+    parser.add_argument("--waveform", default="sine", help="oscillator waveform for audio (default sine)")
+    parser.add_argument("--tuning", choices=("equal", "just"), default="equal", help="tuning for audio: 12-TET or just intonation in each key (default equal)")
+    parser.add_argument("--scala", metavar="FILE", help="tune audio with a Scala .scl scale instead, anchored on each key's tonic")
+    parser.add_argument("--a4", type=float, default=440.0, help="reference pitch of A4 in Hz (default 440)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            record = json.loads(f.readline())
+        prog = Progression(record["chords"])
+        prefix = os.path.basename(str(record.get("name") or "progression"))
+    else:
+        prog = Progression({"roman": roman} for roman in args.chords)
+        prefix = "progression"
+    if not len(prog):
+        parser.error("no chords given")
+    if args.scala:
+        try:
+            tuning = load_scala(args.scala, args.a4)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    else:
+        tuning = JUST_INTONATION.with_reference(args.a4) if args.tuning == "just" else EqualTemperament(args.a4)
+    keys = NOTE_NAMES_FLAT if args.flats else NOTE_NAMES_SHARP
+    written, elapsed = export_pack(
+        prog, args.out_dir, keys, args.modes, args.midi, args.audio, args.tempo, args.waveform,
+        workers=args.workers, prefix=prefix, tuning=tuning,
+    )
+    print(f"Wrote {written} files for {len(keys) * len(args.modes)} variants to {args.out_dir} in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
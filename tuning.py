@@ -0,0 +1,192 @@
+"""Tunings: the frequency of every MIDI note, as one 128-entry table.
+
+Chords are resolved to MIDI note numbers by theory, then to frequencies
+with a single NumPy gather, ``tuning.table(tonic)[notes]``.  Tunings are
+immutable values: a different tuning or reference pitch is a different
+object, with tables of its own, built on first use and cached on it.
+
+- EqualTemperament: 12-TET with A4 at a configurable pitch (440 Hz by
+  default).  One table serves every key.
+- ScaleTuning: a scale of ratios or cents repeating every period,
+  anchored on the key's tonic (at TONIC_MIDI, where theory places it),
+  which keeps its equal-tempered pitch.
+  MIDI notes step through the scale one degree per note, so a 12-note
+  scale lines up with the keyboard.  It builds one table per key.
+  JUST_INTONATION is the 5-limit scale; Scala (.scl) files load with
+  load_scala().
+
+Tunings compare equal by value and pickle, so they can travel with the
+playback settings to the render process.
+"""
+import math
+import os
+
+A4 = 440.0
+A4_MIDI = 69
+MIDI_NOTES = 128
+# MIDI note of the tonic for each key's pitch class: C4 to F4, then F#3 to
+# B3, so every key keeps its chords around middle C
+TONIC_MIDI = tuple(60 + pc if pc < 6 else 48 + pc for pc in range(12))
+# Range offered for the reference pitch
+MIN_A4 = 380.0
+MAX_A4 = 500.0
+
+# 5-limit just ratios of the twelve semitones above the tonic, then the octave
+JUST_RATIOS = ((16, 15), (9, 8), (6, 5), (5, 4), (4, 3), (45, 32), (3, 2), (8, 5), (5, 3), (9, 5), (15, 8), (2, 1))
+
+
+def ratio_cents(numerator, denominator=1):
+    return 1200.0 * math.log2(numerator / denominator)
+
+
+def equal_frequency(note, reference=A4):
+    """Frequency of a MIDI note in 12-TET."""
+    return reference * 2.0 ** ((note - A4_MIDI) / 12.0)
+
+
+class EqualTemperament:
+    """Twelve equal semitones per octave, with A4 at ``reference`` Hz."""
+
+    __slots__ = ("reference", "_table")
+    key_relative = False
+
+    def __init__(self, reference=A4):
+        self.reference = float(reference)
+        self._table = None
+
+    @property
+    def name(self):
+        return "12-TET" if self.reference == A4 else f"12-TET, A4 = {self.reference:g} Hz"
+
+    def with_reference(self, reference):
+        return EqualTemperament(reference)
+
+    def table(self, tonic=0):
+        """Frequencies of MIDI notes 0-127 (the same in every key)."""
+        if self._table is None:
+            import numpy as np
+            self._table = self.reference * 2.0 ** ((np.arange(MIDI_NOTES) - A4_MIDI) / 12.0)
+        return self._table
+
+    def _value(self):
+        return (self.reference,)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other._value() == self._value()
+
+    def __hash__(self):
+        return hash((type(self).__name__,) + self._value())
+
+    def __getstate__(self):
+        return self.reference
+
+    def __setstate__(self, state):
+        self.reference = state
+        self._table = None
+
+    def __repr__(self):
+        return f"EqualTemperament({self.reference:g})"
+
+
+class ScaleTuning:
+    """A scale repeating every period, anchored on the tonic of the key.
+
+    ``cents`` lists the degrees above the tonic in ascending order and
+    ends with the period, as a Scala file does (so a 12-note scale has 12
+    entries, the last usually 1200).  The tonic sounds at its 12-TET
+    pitch for A4 = ``reference``.
+    """
+
+    __slots__ = ("name", "cents", "reference", "_tables")
+    key_relative = True
+
+    def __init__(self, name, cents, reference=A4):
+        cents = tuple(float(c) for c in cents)
+        if not cents:
+            raise ValueError("A scale needs at least one degree")
+        if cents[-1] <= 0:
+            raise ValueError("The period of a scale must be above the tonic")
+        self.name = name
+        self.cents = cents
+        self.reference = float(reference)
+        self._tables = {}
+
+    def with_reference(self, reference):
+        return ScaleTuning(self.name, self.cents, reference)
+
+    def table(self, tonic=0):
+        """Frequencies of MIDI notes 0-127 with the tonic of pitch class ``tonic`` as degree 0."""
+        table = self._tables.get(tonic)
+        if table is None:
+            import numpy as np
+            # Anchored where theory places the tonic, so a scale that does not
+            # repeat every 12 notes still starts on it in every key
+            anchor = TONIC_MIDI[tonic]
+            size = len(self.cents)
+            degrees = np.array((0.0,) + self.cents[:-1])
+            periods, degree = np.divmod(np.arange(MIDI_NOTES) - anchor, size)
+            cents = periods * self.cents[-1] + degrees[degree]
+            table = self._tables[tonic] = equal_frequency(anchor, self.reference) * 2.0 ** (cents / 1200.0)
+        return table
+
+    def _value(self):
+        return (self.name, self.cents, self.reference)
+
+    __eq__ = EqualTemperament.__eq__
+    __hash__ = EqualTemperament.__hash__
+
+    def __getstate__(self):
+        return self._value()
+
+    def __setstate__(self, state):
+        self.name, self.cents, self.reference = state
+        self._tables = {}
+
+    def __repr__(self):
+        return f"ScaleTuning({self.name!r}, {len(self.cents)} degrees, {self.reference:g})"
+
+
+EQUAL_TEMPERAMENT = EqualTemperament()
+JUST_INTONATION = ScaleTuning("Just intonation", [ratio_cents(n, d) for n, d in JUST_RATIOS])
+
+
+def _scala_pitch(text, line_number, path):
+    # A pitch is cents if it has a period, otherwise a ratio "n/d" or an integer "n"
+    token = text.split()[0] if text.split() else ""
+    try:
+        if "." in token:
+            return float(token)
+        numerator, _, denominator = token.partition("/")
+        numerator, denominator = int(numerator), int(denominator or 1)
+    except ValueError:
+        raise ValueError(f"{path}:{line_number}: not a pitch: {text.strip()!r}") from None
+    if numerator <= 0 or denominator <= 0:
+        raise ValueError(f"{path}:{line_number}: ratios must be positive: {token}")
+    return ratio_cents(numerator, denominator)
+
+
+def parse_scala(text, path="<scala>", reference=A4):
+    """A ScaleTuning from the contents of a Scala .scl file."""
+    lines = [(n, line) for n, line in enumerate(text.splitlines(), 1) if not line.startswith("!")]
+    if len(lines) < 2:
+        raise ValueError(f"{path}: not a Scala scale file")
+    description = lines[0][1].strip()
+    number, count = lines[1]
+    try:
+        count = int(count.split()[0])
+    except (ValueError, IndexError):
+        raise ValueError(f"{path}:{number}: expected the number of notes") from None
+    pitches = [_scala_pitch(line, n, path) for n, line in lines[2:2 + count]]
+    if len(pitches) < count:
+        raise ValueError(f"{path}: {count} notes declared, {len(pitches)} found")
+    if count == 0:
+        # A scale of only its period, which Scala takes as the octave
+        pitches = [1200.0]
+    name = description or os.path.splitext(os.path.basename(path))[0]
+    return ScaleTuning(name, pitches, reference)
+
+
+def load_scala(path, reference=A4):
+    """Read a Scala .scl file into a ScaleTuning."""
+    with open(path, encoding="latin-1") as f:
+        return parse_scala(f.read(), path, reference)